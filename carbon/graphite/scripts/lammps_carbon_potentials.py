@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Potential presets for the carbon lattice generators (graphite, graphene and nanotubes), and the writer of
+# the lammps data files, shared by lammps_gen_graphite, lammps_gen_graphene and lammps_gen_nanotube.
+
+# Each preset gives the lattice constants and the atom style needed by the potential:
+#   label      , name of the potential (printed to the screen)
+#   a_const    , the 'a' lattice constant of each geometry (optimised at zero K with the potential), a geometry
+#                not listed uses the nearest one, nanotube -> graphene -> graphite
+#   c_const    , the 'c' lattice constant (the layer separation is c), None if the potential has no value
+#   atom_style , atomic, charge (q = 0, ReaxFF) or molecular (the DRIP codes)
+#   mol_id     , None, or 'layer', the molecule id of each atom is its graphene layer (or nanotube wall)
+# New potentials only need a new preset.
+
+# imported modules
+import sys
+import numpy as np
+from lammps_data_file import open_data_file, write_atoms
+
+
+# potential presets, see the lammps_optimise_* scripts for the optimisation of a and c
+carbon_potentials = {
+    'airebo': {'label': 'AIREBO', 'atom_style': 'atomic', 'mol_id': None, 'c_const': 3.358,
+               'a_const': {'graphite': 2.4175, 'graphene': 2.4175, 'nanotube': 2.42, 'zigzag': 2.419}},
+    'reaxff': {'label': 'ReaxFF 2016', 'atom_style': 'charge', 'mol_id': None, 'c_const': 3.2567,
+               'a_const': {'graphite': 2.4334, 'graphene': 2.43479986}},
+    # https://openkim.org/id/hNN_WenTadmor_2019Grx_C__MO_421038499185_001
+    'hnn': {'label': 'hNN', 'atom_style': 'atomic', 'mol_id': None, 'c_const': None,
+            'a_const': {'graphene': 2.4636}},
+    'drip_airebo': {'label': 'DRIP-AIREBO', 'atom_style': 'molecular', 'mol_id': 'layer', 'c_const': 3.42424712,
+                    'a_const': {'graphite': 2.4195913}},
+    'drip_rebo': {'label': 'DRIP-REBO', 'atom_style': 'molecular', 'mol_id': 'layer', 'c_const': 3.41615256,
+                  'a_const': {'graphite': 2.45893461}},
+    'gap': {'label': 'GAP-20', 'atom_style': 'atomic', 'mol_id': None, 'c_const': 3.353,
+            'a_const': {'graphite': 2.46523}},
+}
+
+# geometries of the generators, and the order in which the a_const of the presets is looked up
+preset_geometries = {'graphite': ['graphite', 'graphene'],
+                     'graphene': ['graphene', 'graphite'],
+                     'nanotube': ['nanotube', 'graphene', 'graphite'],
+                     'armchair': ['armchair', 'nanotube', 'graphene', 'graphite'],
+                     'zigzag': ['zigzag', 'nanotube', 'graphene', 'graphite']}
+
+
+# function returns the preset of a potential for a geometry, with a single a_const
+def carbon_potential(potential, geometry):
+    if potential not in carbon_potentials:
+        print(">>> ERROR  <<< Unknown potential " + str(potential) + ", expected one of: " +
+              ", ".join(carbon_potentials))
+        sys.exit()
+    preset = dict(carbon_potentials[potential])
+    a_const = preset['a_const']
+    preset['a_const'] = [a_const[g] for g in preset_geometries[geometry] if g in a_const][0]
+    return preset
+
+
+# function returns the molecule id of each atom, from the layer (or wall) of each atom and the mol_id of a preset
+def molecule_ids(preset, layer):
+    if preset['mol_id'] == 'layer':
+        return np.asarray(layer) + 1
+    return 1
+
+
+# function writes a lammps data file of carbon atoms, in the atom style of a potential preset
+# box = [box_x, box_y, box_z], mol = molecule id of each atom ((N,) array or a single value for all atoms)
+def write_carbon_lattice(filename, generator, comment, box, positions, atom_style, mol=1, verbose=False):
+    file = open_data_file(filename, 'w')
+    if verbose:
+        print("Opened file: " + str(file.name))
+
+    # Write header info
+    file.write("Lammps data file generated by " + str(generator) + "\n")
+    file.write("# " + str(comment) + "\n")
+    file.write(str(len(positions)) + " atoms\n\n")
+    file.write("1 atom types # C\n\n")
+    file.write("0.0 " + str(box[0]) + " xlo xhi\n")
+    file.write("0.0 " + str(box[1]) + " ylo yhi\n")
+    file.write("0.0 " + str(box[2]) + " zlo zhi\n\n")
+    file.write("Masses\n\n")
+    file.write("1 12.011\n\n")
+    file.write("Atoms # " + str(atom_style) + "\n\n")
+
+    # ID type x y z, with the charge (q = 0) or molecule id if the atom style has them
+    write_atoms(file, atom_style, np.arange(1, len(positions) + 1), 1, positions, mol=mol, q=0, sep="  ")
+    file.close()
+
+    if verbose:
+        print("file closed: " + str(file.name))
+        print("COMPLETED lattice.dat output !!")
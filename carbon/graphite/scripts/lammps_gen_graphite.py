@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+# This function generates a graphite lattice for any of the carbon potentials in lammps_carbon_potentials.py.
+# The lattice constants, atom style and molecule ids come from the preset of the potential, e.g.
+# airebo and gap (atomic), reaxff (charge), drip_airebo and drip_rebo (molecular, the molecule id is the layer).
+
+# Keyword arguments:
+# verbose = True   , prints some comments to the screen.
+# forced  = True   , will overwrite the existing file (if it exists).
+# forced  = False  , if file exists, will ask the user if the existing file should be overwritten.
+# potential = 'airebo' , the potential preset: airebo, reaxff, hnn, drip_airebo, drip_rebo or gap
+# a_const = None   , the 'a' lattice constant, if not given the value of the potential preset
+# c_const = None   , the 'c' lattice constant, if not given the value of the potential preset
+# atom_style = None , atomic, charge, molecular or full, if not given the atom style of the potential preset
+# filename = lammps.lattice.dat  , the output filename
+# stacking = 'ab'  , stacking order of the graphene planes
+# cells = [x,y,z]  , No. unit cells to generate for each direction.
+
+import sys
+import os
+import math
+from lammps_graphite_lattice import graphite_lattice
+from lammps_carbon_potentials import carbon_potentials, carbon_potential, molecule_ids, write_carbon_lattice
+
+
+def lammps_gen_graphite(**kwargs):
+
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)
+    forced = kwargs.get('forced', False)
+    potential = kwargs.get('potential', 'airebo')
+    preset = carbon_potential(potential, 'graphite')
+    a_const = kwargs.get('a_const', preset['a_const'])
+    c_const = kwargs.get('c_const', preset['c_const'])
+    atom_style = kwargs.get('atom_style', preset['atom_style'])
+    stacking = kwargs.get('stacking', 'ab')
+    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    cells = kwargs.get('cells', [1, 1, 1])
+
+    if c_const is None:
+        print(">>> ERROR  <<< The " + str(potential) + " preset has no 'c' lattice constant, give c_const")
+        sys.exit()
+
+    # box size and atom total
+    box_x = math.sqrt(3) * a_const * cells[0]
+    box_y = a_const * cells[1]
+    box_z = c_const * cells[2] * len(stacking)
+    tot_atoms = int(4 * len(stacking) * cells[0] * cells[1] * cells[2])
+
+    # Welcome
+    if verbose:
+        print("  +------------------------------------------+")
+        print("  |         Lattice generator script         |")
+        print("  |             Graphite lattice             |")
+        print("  |" + preset['label'].center(42) + "|")
+        print("  +------------------------------------------+")
+        print("   ")
+
+        print(">  Echoing back the user supplied data")
+        print("     Potential preset: " + str(potential) + " (" + str(atom_style) + " format)")
+        print("     Lattice constant a   [Ang]: " + str(a_const))
+        print("     Layer separation c/2 [Ang]: " + str(c_const))
+        print(">  Graphite lattice with unit cell repeats:")
+        print("     cells_x: " + str(cells[0]))
+        print("     cells_y: " + str(cells[1]))
+        print("     cells_z: " + str(cells[2]))
+        print(">  Graphite lattice cell dimensions [Ang]:")
+        print("     box_x: " + str(box_x))
+        print("     box_y: " + str(box_y))
+        print("     box_z: " + str(box_z))
+        print(">  Stacking: " + str(stacking))
+        print(">  Total number of atoms: " + str(tot_atoms))
+
+    # Check if the file already exists
+    if not forced:
+        if os.path.isfile(filename):
+            print("> Existing file " + str(filename) + " detected.")
+            print("> lammps_gen_graphite function wants to overwrite this file")
+
+            # Ask user if file should be overwritten
+            user_choice = input('Do you wish to overwrite the existing file? (y/n): ').lower()
+
+            if (user_choice == 'yes') or (user_choice == 'y') or (user_choice == 'yea'):
+                print(" > Overwriting existing file ... ")
+            else:
+                print("File not overwritten, exiting function")
+                return
+
+    # create lattice file, the molecule id (if needed) is the graphene layer
+    positions, layer = graphite_lattice(a_const, c_const, cells, stacking, order='cell')
+    write_carbon_lattice(filename, "lammps_gen_graphite_" + str(potential),
+                         "Graphite " + str(cells[0]) + "x" + str(cells[1]) + "x" + str(cells[2]) +
+                         " Unit cells, with " + str(stacking) + " stacking.  a_param = " + str(a_const) +
+                         " , c_param = " + str(c_const),
+                         [box_x, box_y, box_z], positions, atom_style, mol=molecule_ids(preset, layer),
+                         verbose=verbose)
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the potential, number of lattice cells and (optionally) the stacking from the command-line
+    if len(sys.argv) in [5, 6] and sys.argv[1] in carbon_potentials:
+        my_cells = [int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])]
+        my_stacking = str(sys.argv[5]) if len(sys.argv) == 6 else 'ab'
+        # check stacking contains only a b c chars
+        if len(my_stacking) < 1 or any(char not in 'abc' for char in my_stacking):
+            print(">>> ERROR  <<< stacking order can contain only the letters: a,b,c")
+            sys.exit()
+    else:
+        print(">>> ERROR  <<<")
+        print("  User must pass 4 or 5 command-line arguments")
+        print("   4 params = potential, box_x, box_y, box_z  (integers)")
+        print("   5 params = potential, box_x, box_y, box_z  (integers), stacking (string e.g.: ab,abc)")
+        print("   potentials: " + ", ".join(carbon_potentials))
+        print("    examples")
+        print("   lammps_gen_graphite.py airebo 3 5 7")
+        print("   lammps_gen_graphite.py drip_rebo 3 5 7 abc")
+        sys.exit()
+
+    # call the graphite generator function
+    lammps_gen_graphite(verbose=True, forced=True, potential=sys.argv[1], cells=my_cells, stacking=my_stacking)
@@ -29,6 +29,8 @@
 import sys
 import os
 import math
+import numpy as np
+from lammps_data_file import open_data_file, write_atoms
 
 
 # Function create
@@ -345,7 +347,7 @@ def lammps_gen_graphite_aa_intercalate_mc8(**kwargs):
 
     # create lattice file
     if gen_file:
-        file = open(filename, 'w+')
+        file = open_data_file(filename, 'w')
         if verbose:
             print(f"Opened file: {file.name}")
 
@@ -375,41 +377,27 @@ def lammps_gen_graphite_aa_intercalate_mc8(**kwargs):
 
         file.write("Atoms # atomic\n\n")
 
-        # ID mol charge x y z
-        count = 1
-        for x in range(0, cells[0]):
-            x_shift = x * math.sqrt(3) * a_const
-            for y in range(0, cells[1]):
-                y_shift = y * a_const
-                for z in range(0, cells[2]):
-                    z_shift = z * c_const
-                    file.write(f'{count}  1  {x_shift:.12f} {y_shift:.12f} {z_shift:.12f}\n')
-                    file.write(f'{count + 1}  1  {x_shift + a_const * 2.0 / math.sqrt(3):.12f} ' +
-                               f'{y_shift:.12f} {z_shift:.12f}\n')
-                    file.write(f'{count + 2}  1  {x_shift + a_const * math.sqrt(3) / 6.0:.12f} ' +
-                               f'{y_shift + a_const / 2.0:.12f} {z_shift:.12f}\n')
-                    file.write(f'{count + 3}  1  {x_shift + a_const * math.sqrt(3) / 2.0:.12f} ' +
-                               f'{y_shift + a_const / 2.0:.12f} {z_shift:.12f}\n')
-                    count += 4
+        # ID type x y z
+        # carbon atoms, 4 atom basis in each unit cell
+        cell_x, cell_y, cell_z = [c.ravel() for c in np.meshgrid(np.arange(cells[0]), np.arange(cells[1]),
+                                                                  np.arange(cells[2]), indexing='ij')]
+        cell_shift = np.column_stack([cell_x * math.sqrt(3) * a_const, cell_y * a_const, cell_z * c_const])
+        basis = np.array([[0.0, 0.0, 0.0],
+                          [a_const * 2.0 / math.sqrt(3), 0.0, 0.0],
+                          [a_const * math.sqrt(3) / 6.0, a_const / 2.0, 0.0],
+                          [a_const * math.sqrt(3) / 2.0, a_const / 2.0, 0.0]])
+        carbon_positions = (cell_shift[:, np.newaxis, :] + basis).reshape(-1, 3)
 
         # intercalated elements
-        for x in range(0, cells[0]):
-            x_shift = x * math.sqrt(3) * a_const
-            for y in range(0, cells[1]):
-                y_shift = y * a_const
-                for z in range(0, cells[2]):
-                    z_shift = z * c_const + 0.5 * c_const
-                    # for even y row
-                    if y % 2 == 0:
-                        if x % 2 == 0:
-                            file.write(f'{count}  2  {x_shift + a_const / math.sqrt(3):.12f} ' +
-                                       f'{y_shift:.12f} {z_shift:.12f}\n')
-                            count += 1
-                    else:
-                        if x % 2 == 1:
-                            file.write(f'{count}  2  {x_shift + a_const / math.sqrt(3):.12f} ' +
-                                       f'{y_shift:.12f} {z_shift:.12f}\n')
-                            count += 1
+        # even x on even y rows, odd x on odd y rows
+        sites = (cell_x + cell_y) % 2 == 0
+        int_positions = cell_shift[sites] + [a_const / math.sqrt(3), 0.0, 0.5 * c_const]
+
+        positions = np.concatenate([carbon_positions, int_positions])
+        types = np.repeat([1, 2], [len(carbon_positions), len(int_positions)])
+        write_atoms(file, 'atomic', np.arange(1, len(positions) + 1), types, positions, sep="  ",
+                    float_format='%.12f')
+
         file.close()
 
         if verbose:
@@ -2,6 +2,7 @@
 
 # This function simply generates a graphite lattice for the AIREBO forcefield.
 # The output is a lammps data file in atomic format (this is the required format for the AIREBO code).
+# The lattice is built by lammps_gen_graphite.py with the airebo potential preset.
 
 # Keyword arguments:
 # verbose = True   , prints some comments to the screen.
@@ -16,16 +17,12 @@
 # Kenny Jolley, Dec 2018
 
 import sys
-import os
-import math
+from lammps_gen_graphite import lammps_gen_graphite
 
 
 def lammps_gen_graphite_airebo(**kwargs):
 
-    # Default keyword args
-    verbose = kwargs.get('verbose', False)
-    forced = kwargs.get('forced', False)
-    # Default constants for the AIREBO  Potential
+    # Default constants for the AIREBO Potential (the airebo preset in lammps_carbon_potentials.py)
     # 48, 83, 30, ab  cell: 2.41753712, 3.357841      20 nm -7149312.767421 eV
     # 12, 21,  8, ab  cell: 2.41751194, 3.35802329     5 nm  -120590.817501 eV
     #  7, 12,  5, ab  cell: 2.41751181, 3.35798678     3 nm   -25123.086978 eV
@@ -38,155 +35,7 @@ def lammps_gen_graphite_airebo(**kwargs):
     #  7, 12,  3, abc cell: 2.41751085, 3.35804799     3 nm   -22610.784848 eV
     #  5,  8,  2, abc cell: 2.41751194, 3.3580575      2 nm    -7178.026936 eV
 
-    a_const = kwargs.get('a_const', 2.4175)
-    c_const = kwargs.get('c_const', 3.358)
-    stacking = kwargs.get('stacking', 'ab')
-    filename = kwargs.get('filename', 'lammps.lattice.dat')
-    cells = kwargs.get('cells', [1, 1, 1])
-    
-    # box size and atom total
-    box_x = math.sqrt(3) * a_const * cells[0]
-    box_y = a_const * cells[1]
-    box_z = c_const * cells[2] * len(stacking)
-    tot_atoms = int(4 * len(stacking) * cells[0] * cells[1] * cells[2])
-    
-    # Welcome
-    if verbose:
-        print("  +------------------------------------------+")
-        print("  |         Lattice generator script         |")
-        print("  |             Graphite lattice             |")
-        print("  |                  AIREBO                  |")
-        print("  |               Kenny Jolley               |")
-        print("  |                 Dec 2018                 |")
-        print("  |          kenny.jolley@gmail.com          |")
-        print("  +------------------------------------------+")
-        print("   ")
-
-        print(">  Echoing back the user supplied data")
-        print("     Lattice constant a   [Ang]: " + str(a_const))
-        print("     Layer seperation c/2 [Ang]: " + str(c_const))
-        print(">  Graphite lattice with unit cell repeats:")
-        print("     cells_x: " + str(cells[0]))
-        print("     cells_y: " + str(cells[1]))
-        print("     cells_z: " + str(cells[2]))
-        print(">  Graphite lattice cell dimensions [Ang]:")
-        print("     box_x: " + str(box_x))
-        print("     box_y: " + str(box_y))
-        print("     box_z: " + str(box_z))
-        print(">  Stacking: " + str(stacking))
-        print(">  Total number of atoms: " + str(tot_atoms))
-
-    # Set generate file flag to true
-    gen_file = True
-    
-    # Check if the file already exists
-    if not forced:
-        if os.path.isfile(filename):
-            print("> Existing file " + str(filename) + " detected.")
-            print("> lammps_gen_graphite_airebo function wants to overwrite this file")
-        
-            # Ask user if file should be overwritten
-            user_choice = input('Do you wish to overwrite the existing file? (y/n): ')
-            user_choice = user_choice.lower()
-            
-            if (user_choice == 'yes') or (user_choice == 'y') or (user_choice == 'yea'):
-                print(" > Overwriting existing file ... ")
-                gen_file = True
-            else:
-                print("File not overwritten, exiting function")
-                gen_file = False
-
-    # create lattice file
-    if gen_file:
-        file = open(filename, 'w+')
-        if verbose:
-            print("Opened file: " + str(file.name))
-        
-        # Write header info
-        file.write("Lammps data file generated by lammps_gen_graphite_airebo\n")
-        file.write("# Graphite " + str(cells[0]) + "x" + str(cells[1]) + "x" + str(cells[2]) +
-                   " Unit cells, with " + str(stacking) + " stacking.  a_param = " + str(a_const) +
-                   " , c_param = " + str(c_const) + "\n")
-        file.write(str(tot_atoms) + " atoms\n\n")
-        file.write("1 atom types # C\n\n")
-        file.write("0.0 " + str(box_x) + " xlo xhi\n")
-        file.write("0.0 " + str(box_y) + " ylo yhi\n")
-        file.write("0.0 " + str(box_z) + " zlo zhi\n\n")
-        file.write("Masses\n\n")
-        file.write("1 12.011\n\n")
-        file.write("Atoms # atomic\n\n")
-
-        # ID mol charge x y z
-        count = 1
-        for x in range(0, cells[0]):
-            x_shift = x * math.sqrt(3) * a_const
-            for y in range(0, cells[1]):
-                y_shift = y * a_const
-                for z in range(0, cells[2]):
-                    for sp in range(0, len(stacking)):
-                        z_shift = (len(stacking)*z+sp)*c_const
-                        # stacking position a
-                        if stacking[sp] == 'a':
-                            file.write(str(count) + "  1  " +
-                                       str(x_shift) + "  " +
-                                       str(y_shift) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+1) + "  1  " +
-                                       str(x_shift + a_const * 2.0/math.sqrt(3)) + "  " +
-                                       str(y_shift) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+2) + "  1  " +
-                                       str(x_shift + a_const * math.sqrt(3)/6.0) + "  " +
-                                       str(y_shift + a_const / 2.0) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+3) + "  1  " +
-                                       str(x_shift + a_const * math.sqrt(3)/2.0) + "  " +
-                                       str(y_shift + a_const / 2.0) + "  " +
-                                       str(z_shift) + "\n")
-                            count = count + 4
-                        # stacking position b
-                        elif stacking[sp] == 'b':
-                            file.write(str(count) + "  1  " +
-                                       str(x_shift) + "  " +
-                                       str(y_shift) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+1) + "  1  " +
-                                       str(x_shift + a_const / math.sqrt(3)) + "  " +
-                                       str(y_shift) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+2) + "  1  " +
-                                       str(x_shift + a_const * math.sqrt(3)/2.0) + "  " +
-                                       str(y_shift + a_const / 2.0) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+3) + "  1  " +
-                                       str(x_shift + a_const * math.sqrt(3)*5.0/6.0) + "  " +
-                                       str(y_shift + a_const / 2.0) + "  " +
-                                       str(z_shift) + "\n")
-                            count = count + 4
-                        # stacking position c
-                        elif stacking[sp] == 'c':
-                            file.write(str(count) + "  1  " +
-                                       str(x_shift + a_const / math.sqrt(3)) + "  " +
-                                       str(y_shift) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+1) + "  1  " +
-                                       str(x_shift + a_const * 2.0/math.sqrt(3)) + "  " +
-                                       str(y_shift) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+2) + "  1  " +
-                                       str(x_shift + a_const * math.sqrt(3)/6.0) + "  " +
-                                       str(y_shift + a_const / 2.0) + "  " +
-                                       str(z_shift) + "\n")
-                            file.write(str(count+3) + "  1  " +
-                                       str(x_shift + a_const * math.sqrt(3)*5.0/6.0) + "  " +
-                                       str(y_shift + a_const / 2.0) + "  " +
-                                       str(z_shift) + "\n")
-                            count = count + 4
-        file.close()
-
-        if verbose:
-            print("file closed: " + str(file.name))
-            print("COMPLETED lattice.dat output !!")
+    lammps_gen_graphite(potential='airebo', **kwargs)
 
 
 # If we are running this script interactively, call the function safely
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+# This function generates an ensemble of graphite lattices with randomly distributed point defects,
+# one lammps data file for each random realisation of the same lattice (for defect statistics).
+# The pristine lattice and its neighbour tables are built once, and cached on disk keyed by
+# (a, c, cells, stacking), so later ensembles of the same lattice do not build them again.
+# The realisations are generated in parallel by a pool of worker processes.
+
+# Realisation i uses the seed [seed, i], which is written to the header of its data file.  The same
+# file (header and atoms) is generated by lammps_gen_graphite_general_defects.py with the same lattice,
+# defects, lattice_model, output_format and seed=[seed, i].
+
+# Keyword arguments:
+# verbose = True   , prints some comments to the screen.
+# forced  = True   , will overwrite existing files.
+# forced  = False  , stops if any of the output files already exist.
+# a_const = 2.4334 , the 'a' lattice constant
+# c_const = 3.2567 , the 'c' lattice constant
+# filename = lammps.lattice.dat  , the output filename, the realisation number is added before the extension
+#                                  (lammps.lattice.0000.dat, lammps.lattice.0001.dat, ...)
+# stacking = 'ab'  , stacking order of the graphene planes
+# cells = [x,y,z]  , No. unit cells to generate for each direction.
+# defects = {'monovac': [1.0, 1.0, 1.0, 1.0]}
+#                  , percentage of each defect type in each layer (see lammps_gen_graphite_general_defects.py)
+# n_realisations = 10 , number of data files to generate
+# seed = None      , random seed of the ensemble, if not given a new seed is generated
+# processes = 1    , number of worker processes (each process generates whole realisations)
+# cache_dir = 'lattice_cache' , directory of the cached lattices and neighbour tables
+# lattice_model = 'ReaxFF' , name of the model, written to the file header
+# output_format = 'charge' , atomic, charge or molecular
+
+import sys
+import os
+import multiprocessing
+from lammps_graphite_defects import cached_defect_lattice, place_defects, write_defect_lattice, defect_lattice_comment
+from lammps_graphite_defects import defects_per_layer, defect_layer_functions, new_seed
+from lammps_data_file import open_data_file
+
+
+# lattice shared by the realisations generated in this process
+_ensemble_lattice = {}
+
+
+# function loads the lattice of the ensemble (worker initialiser, the lattice is read from the cache)
+def _load_ensemble_lattice(a_const, c_const, cells, stacking, cache_dir):
+    _ensemble_lattice.update(cached_defect_lattice(a_const, c_const, cells, stacking, cache_dir))
+
+
+# worker, generates and writes one realisation
+def _write_ensemble_member(args):
+    filename, defect_counts, seed, output_format, lattice_model = args
+    positions, deleted, new_atoms, new_atoms_layer = place_defects(_ensemble_lattice, defect_counts, seed)
+    file = open_data_file(filename, 'w')
+    write_defect_lattice(file, _ensemble_lattice, positions, deleted, new_atoms, new_atoms_layer, output_format,
+                         defect_lattice_comment(_ensemble_lattice, lattice_model, defect_counts, seed))
+    file.close()
+    return filename
+
+
+def lammps_gen_graphite_defect_ensemble(**kwargs):
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)  # verbose output
+    forced = kwargs.get('forced', False)  # force overwriting of existing files
+    # Default constants for the ReaxFF May Potl
+    a_const = kwargs.get('a_const', 2.4334)
+    c_const = kwargs.get('c_const', 3.2567)
+    stacking = kwargs.get('stacking', 'ab')
+    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    cells = kwargs.get('cells', [12, 20, 2])
+    defects = kwargs.get('defects', {'monovac': [1.0, 1.0, 1.0, 1.0]})
+    n_realisations = int(kwargs.get('n_realisations', 10))
+    seed = kwargs.get('seed', None)  # random seed of the ensemble
+    processes = kwargs.get('processes', 1)  # worker processes
+    cache_dir = kwargs.get('cache_dir', 'lattice_cache')
+    lattice_model = kwargs.get('lattice_model', 'ReaxFF')
+    output_format = kwargs.get('output_format', 'charge')
+
+    # Welcome
+    if verbose:
+        print("  +--------------------------------------------+")
+        print("  |         Lattice generator function         |")
+        print("  |     Ensemble of defected graphite lattices |")
+        print("  +--------------------------------------------+")
+        print("   ")
+
+    # build (or read) the lattice and neighbour tables once, the workers read them from the cache
+    lattice = cached_defect_lattice(a_const, c_const, cells, stacking, cache_dir, verbose)
+    atoms_per_layer = lattice['atoms_per_layer']
+    n_layers = lattice['n_layers']
+
+    # number of defects of each type in each layer
+    if isinstance(defects, dict):
+        defects = list(defects.items())
+    defect_counts = []
+    for defect, concs in defects:
+        if defect not in defect_layer_functions:
+            print(">>> ERROR  <<< Unknown defect type: " + str(defect))
+            sys.exit()
+        if len(concs) < n_layers:
+            print(">>> ERROR  <<< " + str(defect) + " needs a concentration for each of the " +
+                  str(n_layers) + " layers, got " + str(len(concs)))
+            sys.exit()
+        defect_counts.append([defect, defects_per_layer(concs[:n_layers], atoms_per_layer)])
+
+    if seed is None:
+        seed = new_seed()
+
+    # output filenames
+    root, ext = os.path.splitext(filename)
+    filenames = [root + "." + str(i).zfill(4) + ext for i in range(n_realisations)]
+    if not forced:
+        for name in filenames:
+            if os.path.isfile(name):
+                print(">>> ERROR  <<< Existing file " + str(name) + " detected, use forced=True to overwrite")
+                sys.exit()
+
+    if verbose:
+        print(">  Echoing back the user supplied data")
+        print("     Lattice Model       : " + str(lattice_model))
+        print("     Lattice output type : " + str(output_format))
+        print("     Lattice constant a   [Ang]: " + str(a_const))
+        print("     Layer separation c/2 [Ang]: " + str(c_const))
+        print(">  Graphite lattice with unit cell repeats: " + str(cells))
+        print(">  Stacking: " + str(stacking))
+        print(">  Total number of atoms (perfect lattice): " + str(len(lattice['positions'])))
+        for defect, counts in defect_counts:
+            print(">  " + str(defect) + " defects in each layer: \n" + str(counts))
+        print(">  Number of realisations: " + str(n_realisations))
+        print(">  Random seed of the ensemble: " + str(seed))
+        print(">  Worker processes: " + str(processes))
+
+    jobs = [(filenames[i], defect_counts, [seed, i], output_format, lattice_model)
+            for i in range(n_realisations)]
+    if processes == 1:
+        _ensemble_lattice.update(lattice)
+        written = [_write_ensemble_member(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(processes=processes, initializer=_load_ensemble_lattice,
+                                    initargs=(a_const, c_const, cells, stacking, cache_dir))
+        try:
+            written = pool.map(_write_ensemble_member, jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+    if verbose:
+        for name in written:
+            print("Written: " + str(name))
+        print("COMPLETED ensemble output !!")
+    return written
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the lattice, defects and ensemble size from the command-line, e.g.
+    # lammps_gen_graphite_defect_ensemble.py 12 20 2 ab 100 4 monovac=1.0
+    # generates 100 realisations with 4 worker processes, the percentage of each defect type is the same for every layer
+    if len(sys.argv) < 8:
+        print("Usage: lammps_gen_graphite_defect_ensemble.py cells_x cells_y cells_z stacking "
+              "n_realisations processes defect=percent ...")
+        print("  defect types: " + ", ".join(defect_layer_functions))
+        sys.exit()
+
+    my_cells = [int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])]
+    my_stacking = sys.argv[4]
+    my_n_realisations = int(sys.argv[5])
+    my_processes = int(sys.argv[6])
+    my_defects = {}
+    for arg in sys.argv[7:]:
+        try:
+            name, conc = arg.split('=')
+            my_defects[name] = [float(conc)] * (my_cells[2] * len(my_stacking))
+        except ValueError:
+            print(">>> ERROR  <<< Could not read the defect " + str(arg) + " (expected defect=percent)")
+            sys.exit()
+
+    # call the ensemble generator function
+    lammps_gen_graphite_defect_ensemble(verbose=True,
+                                        forced=True,
+                                        stacking=my_stacking,
+                                        cells=my_cells,
+                                        defects=my_defects,
+                                        n_realisations=my_n_realisations,
+                                        processes=my_processes,
+                                        filename='lammps.lattice.dat'
+                                        )
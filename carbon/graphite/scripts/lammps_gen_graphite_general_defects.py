@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+
+# This function generates a graphite lattice with any mix of randomly distributed point defects
+# (mono-vacancies, Stone-Wales defects, split, spiro and grafted interstitials).
+# The lattice and its neighbour tables are built once, and all of the defect types are placed into
+# the same structure.  Defects of every type are kept apart from each other, as for a single type.
+
+# The function can be called by other scripts or this file can be run from the commandline.
+
+# Keyword arguments:
+# verbose = True   , prints some comments to the screen.
+# forced  = True   , will overwrite the existing file (if it exists).
+# forced  = False  , if file exists, a new filename is generated based on the date.
+# a_const = 2.4334 , the 'a' lattice constant
+# c_const = 3.2567 , the 'c' lattice constant
+# filename = lammps.lattice.dat  , the output filename
+# stacking = 'ab'  , stacking order of the graphene planes
+# cells = [x,y,z]  , No. unit cells to generate for each direction.
+# defects = {'monovac': [1.0, 1.0, 1.0, 1.0], 'stone_wales': [0.5, 0.5, 0.5, 0.5]}
+#                  , percentage of each defect type in each layer, the types are placed in the order given
+#                    defect types: monovac, stone_wales, split_interstitial, spiro_interstitial, grafted_interstitial
+# check_neighbours = False , check the neighbour table against a distance based search (slower, for debugging)
+# seed = None      , random seed, if not given a new seed is generated (and written to the file header)
+# processes = 1    , number of worker processes used to place the defects (the layers are done in parallel)
+# lattice_model = 'ReaxFF' , name of the model, written to the file header
+# output_format = 'charge' , atomic, charge or molecular
+# generator = 'lammps_graphite_defects.py' , name of the generator script, written to the file header
+
+import sys
+import os
+import datetime
+from lammps_graphite_defects import new_defect_lattice, place_defects, write_defect_lattice, defect_lattice_comment
+from lammps_graphite_defects import defects_per_layer, defect_layer_functions, new_seed
+from lammps_data_file import open_data_file
+
+
+def lammps_gen_graphite_general_defects(**kwargs):
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)  # verbose output
+    forced = kwargs.get('forced', False)  # force overwriting of given file
+    # Default constants for the ReaxFF May Potl
+    a_const = kwargs.get('a_const', 2.4334)
+    c_const = kwargs.get('c_const', 3.2567)
+    stacking = kwargs.get('stacking', 'ab')
+    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    cells = kwargs.get('cells', [12, 20, 2])
+    defects = kwargs.get('defects', {'monovac': [1.0, 1.0, 1.0, 1.0]})
+    check_neighbours = kwargs.get('check_neighbours', False)  # check neighbour table with a distance search
+    seed = kwargs.get('seed', None)  # random seed
+    processes = kwargs.get('processes', 1)  # worker processes for placing the defects
+    lattice_model = kwargs.get('lattice_model', 'ReaxFF')
+    output_format = kwargs.get('output_format', 'charge')
+    generator = kwargs.get('generator', 'lammps_graphite_defects.py')
+
+    # build the lattice and neighbour tables once
+    lattice = new_defect_lattice(a_const, c_const, cells, stacking, check_neighbours)
+    tot_atoms = len(lattice['positions'])
+    atoms_per_layer = lattice['atoms_per_layer']
+    n_layers = lattice['n_layers']
+
+    # number of defects of each type in each layer
+    if isinstance(defects, dict):
+        defects = list(defects.items())
+    defect_counts = []
+    for defect, concs in defects:
+        if len(concs) < n_layers:
+            print(">>> ERROR  <<< " + str(defect) + " needs a concentration for each of the " +
+                  str(n_layers) + " layers, got " + str(len(concs)))
+            sys.exit()
+        defect_counts.append([defect, defects_per_layer(concs[:n_layers], atoms_per_layer)])
+
+    # random seed, written to the file header so the same lattice can be generated again
+    if seed is None:
+        seed = new_seed()
+
+    # Welcome
+    if verbose:
+        print("  +--------------------------------------------+")
+        print("  |         Lattice generator function         |")
+        print("  |              Graphite lattice              |")
+        print("  |        with mixed random point defects     |")
+        print("  +--------------------------------------------+")
+        print("   ")
+
+        print(">  Echoing back the user supplied data")
+        print("     Lattice Model       : " + str(lattice_model))
+        print("     Lattice output type : " + str(output_format))
+        print("     Lattice constant a   [Ang]: " + str(a_const))
+        print("     Layer separation c/2 [Ang]: " + str(c_const))
+        print(">  Graphite lattice with unit cell repeats:")
+        print("     cells_x: " + str(cells[0]))
+        print("     cells_y: " + str(cells[1]))
+        print("     cells_z: " + str(cells[2]))
+        print(">  Graphite lattice cell dimensions [Ang]:")
+        print("     box_x: " + str(lattice['box'][0]))
+        print("     box_y: " + str(lattice['box'][1]))
+        print("     box_z: " + str(lattice['box'][2]))
+        print(">  Stacking: " + str(stacking))
+        print(">  Total number of atoms (perfect lattice): " + str(tot_atoms))
+        print(">  Number of atoms in each pristine layer: " + str(atoms_per_layer))
+        for defect, counts in defect_counts:
+            print(">  " + str(defect) + " defects in each layer: \n" + str(counts))
+            print(">  Actual percentage of " + str(defect) + " defects in each layer:\n" +
+                  str([100.0 * count / atoms_per_layer for count in counts]))
+            print(">  Overall percentage of " + str(defect) + " defects: " + str(100.0 * sum(counts) / tot_atoms))
+        print(">  Random seed: " + str(seed))
+
+    # Check if the output file already exists
+    # if it does and we are not allowed to overwrite, generate new filename based on the date and try again.
+    if not forced:
+        while True:
+            if os.path.isfile(filename):
+                print("> Existing file " + str(filename) + " detected.")
+                print("> Generating new filename:")
+
+                x = datetime.datetime.now()
+                # Set pre-factor for output filename
+                output_filename_prefac = (x.strftime("%Y") + x.strftime("%m") +
+                                          x.strftime("%d") + x.strftime("%H") +
+                                          x.strftime("%M") + x.strftime("%S") +
+                                          "_")
+                filename = os.path.join(output_filename_prefac + filename)
+                print(filename)
+            else:
+                break
+
+    # place all of the defects
+    if verbose:
+        print("> Creating and reconstructing the defects")
+    positions, deleted, new_atoms, new_atoms_layer = place_defects(lattice, defect_counts, seed, processes)
+
+    # Generate output file
+    file = open_data_file(filename, 'w')
+    if verbose:
+        print("Opened file: " + str(file.name))
+
+    write_defect_lattice(file, lattice, positions, deleted, new_atoms, new_atoms_layer, output_format,
+                         defect_lattice_comment(lattice, lattice_model, defect_counts, seed), generator)
+
+    # Close file and exit function
+    file.close()
+
+    if verbose:
+        print("file closed: " + str(file.name))
+        print("COMPLETED lattice.dat output !!")
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the lattice and defects from the command-line, e.g.
+    # lammps_gen_graphite_general_defects.py 12 20 2 ab monovac=1.0 stone_wales=0.5
+    # the percentage of each defect type is the same for every layer
+    if len(sys.argv) < 6:
+        print("Usage: lammps_gen_graphite_general_defects.py cells_x cells_y cells_z stacking defect=percent ...")
+        print("  defect types: " + ", ".join(defect_layer_functions))
+        sys.exit()
+
+    my_cells = [int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])]
+    my_stacking = sys.argv[4]
+    my_defects = {}
+    for arg in sys.argv[5:]:
+        try:
+            name, conc = arg.split('=')
+            my_defects[name] = [float(conc)] * (my_cells[2] * len(my_stacking))
+        except ValueError:
+            print(">>> ERROR  <<< Could not read the defect " + str(arg) + " (expected defect=percent)")
+            sys.exit()
+
+    # call the graphite generator function
+    lammps_gen_graphite_general_defects(verbose=True,
+                                        forced=True,
+                                        stacking=my_stacking,
+                                        cells=my_cells,
+                                        defects=my_defects,
+                                        filename='lammps.lattice.dat'
+                                        )
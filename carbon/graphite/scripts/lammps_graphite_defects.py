@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+
+# Functions for placing random point defects in the layers of a graphite lattice, shared by the
+# graphite defect generators.
+
+# Each defect type has a function that places the defects in a single graphene layer:
+#   monovac_layer               , reconstructed mono-vacancies (5-9 rings)
+#   stone_wales_layer           , Stone-Wales defects (C=C bond rotated by 90 degrees)
+#   split_interstitial_layer    , split interstitials (atom replaced by a pair above and below the plane)
+#   spiro_interstitial_layer    , spiro interstitials (extra atom bridging a raised C=C bond)
+#   grafted_interstitial_layer  , grafted interstitials (extra atom above the centre of a C=C bond)
+# The layer functions are passed the positions of the atoms of the layer and the neighbour lists in
+# local ids (0 for the first atom of the layer).  They return the new positions, a flag for each
+# deleted atom and an array of any new (interstitial) atoms.
+
+# new_defect_lattice() builds the pristine lattice and its neighbour tables once.  place_defects() then
+# places any mix of defect types into it, e.g.
+#   place_defects(lattice, [['monovac', [10, 10]], ['stone_wales', [5, 5]]], seed)
+# Within a layer all defect types share one pool of valid sites, so defects of different types are
+# kept apart in the same way as defects of one type.  The lattice can be reused for many seeds.
+# write_defect_lattice() writes the result as a lammps data file.  cached_defect_lattice() saves the
+# pristine lattice and neighbour tables to a cache directory, so they are only built once for each
+# set of lattice parameters (a, c, cells, stacking).
+
+# populate_layers() places the defects in every layer.  The random numbers come from a numpy
+# Generator, with an independent stream for each layer spawned from a single seed, so the lattice
+# is the same for a given seed however many worker processes are used.  The layers can be
+# populated in parallel with a process pool.  If no seed is given, new_seed() returns one from the
+# operating system, which should be recorded so the lattice can be generated again.
+
+# imported modules
+import sys
+import os
+import multiprocessing
+import numpy as np
+from lammps_site_pool import new_site_pool, site_pool_remove, site_pool_random
+from lammps_neighbour_list import next_nearest_neighbours
+from lammps_data_file import write_atoms
+from lammps_graphite_lattice import graphite_lattice, graphite_box, graphite_neighbours, check_graphite_neighbours
+
+
+# function wraps a position back into the periodic box, for the given dimensions
+def wrap_position(position, box, dims):
+    for d in dims:
+        if position[d] < 0:
+            position[d] += box[d]
+        if position[d] > box[d]:
+            position[d] -= box[d]
+
+
+# function moves atom1 through the periodic boundary (x and y) if it is on the other side of the box to atom2
+def unwrap_pair(positions, atom1, atom2, a_const, box):
+    dist = (positions[atom1] - positions[atom2])
+    # x
+    if dist[0] > a_const * 2:
+        positions[atom1][0] -= box[0]
+    if dist[0] < -a_const * 2:
+        positions[atom1][0] += box[0]
+    # y
+    if dist[1] > a_const * 2:
+        positions[atom1][1] -= box[1]
+    if dist[1] < -a_const * 2:
+        positions[atom1][1] += box[1]
+
+
+# function returns the shift of each atom1 through the periodic boundary (x and y) that brings it next to
+# atom2, for arrays of atom pairs (the array form of unwrap_pair)
+def unwrap_shifts(positions, atoms1, atoms2, a_const, box):
+    dist = positions[atoms1, 0:2] - positions[atoms2, 0:2]
+    box_xy = np.asarray(box[0:2], dtype=float)
+    return np.where(dist > a_const * 2, -box_xy, np.where(dist < -a_const * 2, box_xy, 0.0))
+
+
+# function wraps an (N, 3) array of positions back into the periodic box, for the given dimensions
+# (the array form of wrap_position)
+def wrap_positions(positions, box, dims):
+    for d in dims:
+        positions[:, d] = np.where(positions[:, d] < 0, positions[:, d] + box[d], positions[:, d])
+        positions[:, d] = np.where(positions[:, d] > box[d], positions[:, d] - box[d], positions[:, d])
+    return positions
+
+
+# Mono-vacancies, the atom is deleted and two of its three neighbours are pinched together
+# the vacancies are chosen one at a time (each one changes the valid sites), then reconstructed together
+def monovac_layer(positions, atoms_NN, atoms_NNN, n_defects, rng, a_const, box, valid_sites=None):
+    deleted = np.zeros(len(positions), dtype=bool)
+    if valid_sites is None:
+        valid_sites = new_site_pool(range(len(positions)), len(positions))
+
+    # choose all of the vacancies first, and the two neighbours of each vacancy that are pinched together
+    vac_nn = np.zeros((n_defects, 2), dtype=int)
+    for vac in range(n_defects):
+        # get a random valid site, delete atom and flag it
+        deleted_atom = site_pool_random(valid_sites, rng)
+        deleted[deleted_atom] = True
+
+        # remove this site, its NN's, NNN's and the NN's of the NNN's from the valid sites
+        site_pool_remove(valid_sites, np.concatenate([[deleted_atom], atoms_NN[deleted_atom], atoms_NNN[deleted_atom],
+                                                      atoms_NN[atoms_NNN[deleted_atom]].ravel()]))
+
+        # select two random neighbours
+        vac_nn[vac] = np.delete(atoms_NN[deleted_atom], rng.integers(3))
+
+    # reconstruct all of the defects at once (the pinched atoms of different vacancies are never shared)
+    atoms1 = vac_nn[:, 0]
+    atoms2 = vac_nn[:, 1]
+
+    # move atoms through boundary if required
+    positions[atoms1, 0:2] += unwrap_shifts(positions, atoms1, atoms2, a_const, box)
+
+    # get unit vectors between the two atoms to be reconstructed
+    dist = positions[atoms1] - positions[atoms2]
+    norm = np.linalg.norm(dist, axis=1)[:, np.newaxis]
+    dist = np.where(norm < a_const * 1.1, dist / norm, -dist / norm)
+
+    # pinch atoms
+    positions[atoms1] -= dist * a_const * 0.2
+    positions[atoms2] += dist * a_const * 0.2
+
+    # wrap atoms that are now outside the boundary
+    positions[atoms1] = wrap_positions(positions[atoms1], box, [0, 1])
+    positions[atoms2] = wrap_positions(positions[atoms2], box, [0, 1])
+
+    return positions, deleted, np.zeros((0, 3))
+
+
+# Stone-Wales defects, a C=C bond is rotated by 90 degrees about its centre
+def stone_wales_layer(positions, atoms_NN, atoms_NNN, n_defects, rng, a_const, box, valid_sites=None):
+    if valid_sites is None:
+        valid_sites = new_site_pool(range(len(positions)), len(positions))
+
+    # rotation matrix ( 90 degrees about Z)
+    rotm = np.asarray([[0.0, -1.0, 0.0],
+                       [1.0, 0.0, 0.0],
+                       [0.0, 0.0, 1.0]])
+
+    for swd in range(n_defects):
+        # get a random valid site, atom2 is one of the nearest neighbours
+        atom1 = site_pool_random(valid_sites, rng)
+        atom2 = atoms_NN[atom1][rng.integers(3)]
+
+        # remove atom1,atom2 and all NN's and NNN's from the valid sites
+        site_pool_remove(valid_sites, [atom1])
+        site_pool_remove(valid_sites, atoms_NN[atom1])
+        site_pool_remove(valid_sites, atoms_NN[atom2])
+        site_pool_remove(valid_sites, atoms_NNN[atom1])
+        site_pool_remove(valid_sites, atoms_NNN[atom2])
+
+        # move atoms through boundary if required, and find the centre point
+        unwrap_pair(positions, atom1, atom2, a_const, box)
+        cp = (positions[atom1] + positions[atom2]) / 2.0
+
+        # rotate atoms about the centre point
+        positions[atom1] = rotm.dot(positions[atom1] - cp) + cp
+        positions[atom2] = rotm.dot(positions[atom2] - cp) + cp
+
+        # wrap atoms that are now outside the boundary
+        wrap_position(positions[atom1], box, [0, 1])
+        wrap_position(positions[atom2], box, [0, 1])
+
+    return positions, np.zeros(len(positions), dtype=bool), np.zeros((0, 3))
+
+
+# Split interstitials, the atom is duplicated and the pair is split by a bond length along z
+def split_interstitial_layer(positions, atoms_NN, atoms_NNN, n_defects, rng, a_const, box, valid_sites=None):
+    cc_len = a_const / np.sqrt(3.0)
+    if valid_sites is None:
+        valid_sites = new_site_pool(range(len(positions)), len(positions))
+    new_atoms = np.zeros((n_defects, 3))
+
+    for si in range(n_defects):
+        # get a random valid site
+        si_atom = site_pool_random(valid_sites, rng)
+
+        # remove si_atom and all NN's and NNN's from the valid sites
+        site_pool_remove(valid_sites, [si_atom])
+        site_pool_remove(valid_sites, atoms_NN[si_atom])
+        site_pool_remove(valid_sites, atoms_NNN[si_atom])
+
+        # duplicate atom to create the interstitial, and reconstruct the defect
+        new_atoms[si] = positions[si_atom]
+        positions[si_atom][2] -= cc_len / 2.0
+        new_atoms[si][2] += cc_len / 2.0
+
+        # wrap atoms that are now outside the boundary
+        wrap_position(positions[si_atom], box, [2])
+        wrap_position(new_atoms[si], box, [2])
+
+    return positions, np.zeros(len(positions), dtype=bool), new_atoms
+
+
+# Spiro interstitials, a new atom bridges a C=C bond, the bond and new atom are raised out of the plane
+def spiro_interstitial_layer(positions, atoms_NN, atoms_NNN, n_defects, rng, a_const, box, valid_sites=None):
+    cc_len = a_const / np.sqrt(3.0)
+    if valid_sites is None:
+        valid_sites = new_site_pool(range(len(positions)), len(positions))
+    new_atoms = np.zeros((n_defects, 3))
+
+    for si in range(n_defects):
+        # get a random valid site, atom2 is one of the nearest neighbours
+        atom1 = site_pool_random(valid_sites, rng)
+        atom2 = atoms_NN[atom1][rng.integers(3)]
+
+        # remove atom1,atom2 and all NN's and NNN's from the valid sites
+        site_pool_remove(valid_sites, [atom1])
+        site_pool_remove(valid_sites, atoms_NN[atom1])
+        site_pool_remove(valid_sites, atoms_NN[atom2])
+        site_pool_remove(valid_sites, atoms_NNN[atom1])
+        site_pool_remove(valid_sites, atoms_NNN[atom2])
+
+        # move atoms through boundary if required, and find the centre point
+        unwrap_pair(positions, atom1, atom2, a_const, box)
+        cp = (positions[atom1] + positions[atom2]) / 2.0
+
+        # unit vector between the two atoms, and the in-plane perpendicular vector
+        dist = (positions[atom1] - positions[atom2])
+        dist = dist / np.linalg.norm(dist)
+        dist_perp = np.zeros(3)
+        dist_perp[0] = -dist[1]
+        dist_perp[1] = dist[0]
+
+        # new atom at the spiro position, 0.4 bond length along the perpendicular
+        new_atoms[si] = cp
+        new_atoms[si][2] += cc_len
+        new_atoms[si] += dist_perp * 0.4 * cc_len
+
+        # move spiro and atom1 and atom2 up by .4 bond length
+        new_atoms[si][2] += cc_len * 0.4
+        positions[atom1][2] += cc_len * 0.4
+        positions[atom2][2] += cc_len * 0.4
+
+        # wrap atoms that are now outside the boundary
+        wrap_position(positions[atom1], box, [0, 1])
+        wrap_position(new_atoms[si], box, [0, 1, 2])
+
+    return positions, np.zeros(len(positions), dtype=bool), new_atoms
+
+
+# Grafted interstitials, a new atom sits above the centre of a C=C bond
+def grafted_interstitial_layer(positions, atoms_NN, atoms_NNN, n_defects, rng, a_const, box, valid_sites=None):
+    cc_len = a_const / np.sqrt(3.0)
+    if valid_sites is None:
+        valid_sites = new_site_pool(range(len(positions)), len(positions))
+    new_atoms = np.zeros((n_defects, 3))
+
+    for gi in range(n_defects):
+        # get a random valid site, atom2 is one of the nearest neighbours
+        atom1 = site_pool_random(valid_sites, rng)
+        atom2 = atoms_NN[atom1][rng.integers(3)]
+
+        # remove atom1,atom2 and all NN's and NNN's from the valid sites
+        site_pool_remove(valid_sites, [atom1])
+        site_pool_remove(valid_sites, atoms_NN[atom1])
+        site_pool_remove(valid_sites, atoms_NN[atom2])
+        site_pool_remove(valid_sites, atoms_NNN[atom1])
+        site_pool_remove(valid_sites, atoms_NNN[atom2])
+
+        # move atoms through boundary if required, and find the centre point
+        unwrap_pair(positions, atom1, atom2, a_const, box)
+        cp = (positions[atom1] + positions[atom2]) / 2.0
+
+        # new atom at the grafted position
+        new_atoms[gi] = cp
+        new_atoms[gi][2] += cc_len * 1.05
+
+        # wrap atoms that are now outside the boundary
+        wrap_position(positions[atom1], box, [0, 1])
+        wrap_position(new_atoms[gi], box, [0, 1, 2])
+
+    return positions, np.zeros(len(positions), dtype=bool), new_atoms
+
+
+# Layer functions for each defect type
+defect_layer_functions = {
+    'monovac': monovac_layer,
+    'stone_wales': stone_wales_layer,
+    'split_interstitial': split_interstitial_layer,
+    'spiro_interstitial': spiro_interstitial_layer,
+    'grafted_interstitial': grafted_interstitial_layer,
+}
+
+
+# function returns a new random seed, taken from the operating system
+def new_seed():
+    return np.random.SeedSequence().entropy
+
+
+# function returns one independent random stream (SeedSequence) per layer, spawned from the seed
+def layer_seeds(seed, n_layers):
+    return np.random.SeedSequence(seed).spawn(n_layers)
+
+
+# function returns the number of defects in each layer for a list of percentage concentrations (one per layer)
+def defects_per_layer(concs, atoms_per_layer):
+    return [int(conc * atoms_per_layer / 100.0 + 0.5) for conc in concs]
+
+
+# function builds the pristine lattice (order='layer') and its neighbour tables, so that any number
+# of defects can be placed into it.  Returns a dict:
+#   lattice['positions'], lattice['layer']  , atom positions and layer index of each atom
+#   lattice['atoms_NN'], lattice['atoms_NNN'] , nearest and next nearest neighbour ids
+#   lattice['box']                          , [box_x, box_y, box_z]
+#   lattice['atoms_per_layer'], lattice['n_layers'], lattice['a_const'], lattice['c_const'],
+#   lattice['cells'], lattice['stacking']
+def new_defect_lattice(a_const, c_const, cells, stacking, check_neighbours=False):
+    positions, layer = graphite_lattice(a_const, c_const, cells, stacking, order='layer')
+    atoms_NN = graphite_neighbours(cells, stacking, order='layer')
+    if check_neighbours:
+        if not check_graphite_neighbours(atoms_NN, positions, layer, a_const, cells, stacking):
+            print(">>> ERROR  <<< Nearest neighbour table does not match the distance based neighbour search")
+            sys.exit()
+    return {'positions': positions,
+            'layer': layer,
+            'atoms_NN': atoms_NN,
+            'atoms_NNN': next_nearest_neighbours(atoms_NN),
+            'box': graphite_box(a_const, c_const, cells, stacking),
+            'atoms_per_layer': 4 * cells[0] * cells[1],
+            'n_layers': cells[2] * len(stacking),
+            'a_const': a_const,
+            'c_const': c_const,
+            'cells': list(cells),
+            'stacking': stacking}
+
+
+# worker, places the defects in one layer (must be defined at module level so it can be pickled)
+# all defect types share one pool of valid sites, so no defect is placed next to another
+def _populate_layer(args):
+    defects, positions, atoms_NN, atoms_NNN, seed_seq, a_const, box = args
+    rng = np.random.default_rng(seed_seq)
+    valid_sites = new_site_pool(range(len(positions)), len(positions))
+    deleted = np.zeros(len(positions), dtype=bool)
+    new_atoms = [np.zeros((0, 3))]
+    for defect, n_defects in defects:
+        positions, defect_deleted, defect_atoms = defect_layer_functions[defect](positions, atoms_NN, atoms_NNN,
+                                                                                 n_defects, rng, a_const, box,
+                                                                                 valid_sites)
+        deleted |= defect_deleted
+        new_atoms.append(defect_atoms)
+    return positions, deleted, np.concatenate(new_atoms)
+
+
+# function places several defect types into the layers of a graphite lattice built with order='layer'
+# defects = [[defect type, [number of defects in each layer]], ...], placed in the order given
+# returns the new positions, the deleted flag of each atom, and the new atoms (in layer order) with their layer index
+def populate_layers_mixed(defects, atoms_array, atoms_per_layer, atoms_NN, atoms_NNN, seed, a_const, box,
+                          processes=1):
+    for defect, counts in defects:
+        if defect not in defect_layer_functions:
+            print(">>> ERROR  <<< Unknown defect type: " + str(defect))
+            print("  (must be one of: " + ", ".join(defect_layer_functions) + ")")
+            sys.exit()
+
+    n_layers = len(atoms_array) // atoms_per_layer
+    for defect, counts in defects:
+        if len(counts) < n_layers:
+            print(">>> ERROR  <<< " + str(defect) + " needs the number of defects for each of the " +
+                  str(n_layers) + " layers, got " + str(len(counts)))
+            sys.exit()
+    seeds = layer_seeds(seed, n_layers)
+
+    # the job for each layer uses local atom ids
+    jobs = []
+    for la in range(n_layers):
+        id_lo = la * atoms_per_layer
+        id_hi = (la + 1) * atoms_per_layer
+        jobs.append(([[defect, int(counts[la])] for defect, counts in defects], atoms_array[id_lo:id_hi].copy(),
+                     atoms_NN[id_lo:id_hi] - id_lo, atoms_NNN[id_lo:id_hi] - id_lo, seeds[la], a_const, box))
+
+    if processes == 1 or n_layers == 1:
+        results = [_populate_layer(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(processes=processes)
+        try:
+            results = pool.map(_populate_layer, jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+    positions = np.concatenate([r[0] for r in results])
+    deleted = np.concatenate([r[1] for r in results])
+    new_atoms = np.concatenate([r[2] for r in results])
+    new_atoms_layer = np.repeat(np.arange(n_layers), [len(r[2]) for r in results])
+    return positions, deleted, new_atoms, new_atoms_layer
+
+
+# function places defects of one type in every layer of a graphite lattice built with order='layer'
+# defects_per_layer is the number of defects in each layer
+def populate_layers(defect, atoms_array, atoms_per_layer, atoms_NN, atoms_NNN, defects_per_layer,
+                    seed, a_const, box, processes=1):
+    return populate_layers_mixed([[defect, defects_per_layer]], atoms_array, atoms_per_layer, atoms_NN, atoms_NNN,
+                                 seed, a_const, box, processes)
+
+
+# function places several defect types into a lattice built by new_defect_lattice(), the lattice is not changed
+# defects = [[defect type, [number of defects in each layer]], ...]
+def place_defects(lattice, defects, seed, processes=1):
+    return populate_layers_mixed(defects, lattice['positions'], lattice['atoms_per_layer'], lattice['atoms_NN'],
+                                 lattice['atoms_NNN'], seed, lattice['a_const'], lattice['box'], processes)
+
+
+# function returns the header comment of a defected lattice data file, the lattice parameters, the defects
+# in each layer (and their overall percentage of the pristine lattice) and the seed
+def defect_lattice_comment(lattice, lattice_model, defect_counts, seed):
+    cells = lattice['cells']
+    tot_atoms = len(lattice['positions'])
+    comment = ("Graphite " + str(cells[0]) + "x" + str(cells[1]) + "x" + str(cells[2]) +
+               " Unit cells, with " + str(lattice['stacking']) +
+               " stacking, model = " + str(lattice_model) +
+               ", a_param = " + str(lattice['a_const']) +
+               ", c_param = " + str(lattice['c_const']))
+    for defect, counts in defect_counts:
+        comment += (",  " + str(defect) + " defects in each layer: " + str(counts) +
+                    ",  Overall percentage of " + str(defect) + " defects: " + str(100.0 * sum(counts) / tot_atoms) +
+                    " %")
+    return comment + ",  seed = " + str(seed)
+
+
+# function writes a defected lattice to an open lammps data file (header and Atoms section)
+# deleted atoms are left out, new atoms are written after the lattice atoms
+# output_format is atomic, charge (q = 0) or molecular (molecule id = layer + 1)
+# generator is the name of the script written to the first line of the file
+def write_defect_lattice(file, lattice, positions, deleted, new_atoms, new_atoms_layer, output_format, comment,
+                         generator='lammps_graphite_defects.py'):
+    kept = np.nonzero(~deleted)[0]
+    coords = np.concatenate([positions[kept], new_atoms])
+    n_atoms = len(coords)
+    box = lattice['box']
+
+    file.write("Lammps data file generated by " + str(generator) + "\n")
+    file.write("# " + comment + "\n")
+    file.write(str(n_atoms) + " atoms\n\n")
+    file.write("1 atom types # C\n\n")
+    file.write("0.0 " + str(box[0]) + " xlo xhi\n")
+    file.write("0.0 " + str(box[1]) + " ylo yhi\n")
+    file.write("0.0 " + str(box[2]) + " zlo zhi\n\n")
+    file.write("Masses\n\n")
+    file.write("1 12.011\n\n")
+    file.write("Atoms # " + str(output_format) + "\n\n")
+
+    if output_format not in ['atomic', 'charge', 'molecular']:
+        print(">>> ERROR  <<< Output type not supported: " + str(output_format))
+        sys.exit()
+    write_atoms(file, output_format, np.arange(1, n_atoms + 1), 1, coords,
+                mol=np.concatenate([lattice['layer'][kept], new_atoms_layer]) + 1, q=0)
+
+
+# function returns the name of the cache file of a pristine lattice, from the lattice parameters
+def defect_lattice_cache_file(a_const, c_const, cells, stacking, cache_dir):
+    return os.path.join(cache_dir, "graphite_lattice_a" + repr(float(a_const)) + "_c" + repr(float(c_const)) + "_" +
+                        str(cells[0]) + "x" + str(cells[1]) + "x" + str(cells[2]) + "_" + str(stacking) + ".npz")
+
+
+# function returns the lattice of new_defect_lattice(), from the cache directory if it has been built before,
+# otherwise the lattice is built and saved to the cache directory
+def cached_defect_lattice(a_const, c_const, cells, stacking, cache_dir, verbose=False):
+    cache_file = defect_lattice_cache_file(a_const, c_const, cells, stacking, cache_dir)
+    if os.path.isfile(cache_file):
+        if verbose:
+            print("> Reading lattice and neighbour tables from cache: " + str(cache_file))
+        arrays = np.load(cache_file)
+        lattice = {'positions': arrays['positions'],
+                   'layer': arrays['layer'],
+                   'atoms_NN': arrays['atoms_NN'],
+                   'atoms_NNN': arrays['atoms_NNN'],
+                   'box': graphite_box(a_const, c_const, cells, stacking),
+                   'atoms_per_layer': 4 * cells[0] * cells[1],
+                   'n_layers': cells[2] * len(stacking),
+                   'a_const': a_const,
+                   'c_const': c_const,
+                   'cells': list(cells),
+                   'stacking': stacking}
+        if len(lattice['positions']) != lattice['atoms_per_layer'] * lattice['n_layers']:
+            print(">>> ERROR  <<< Cache file does not match the lattice: " + str(cache_file))
+            sys.exit()
+        return lattice
+
+    if verbose:
+        print("> Building lattice and neighbour tables, saving to cache: " + str(cache_file))
+    lattice = new_defect_lattice(a_const, c_const, cells, stacking)
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temporary file first, so other processes never read a partly written cache
+    tmp_file = cache_file + "." + str(os.getpid()) + ".tmp.npz"
+    np.savez(tmp_file, positions=lattice['positions'], layer=lattice['layer'],
+             atoms_NN=lattice['atoms_NN'], atoms_NNN=lattice['atoms_NNN'])
+    os.replace(tmp_file, cache_file)
+    return lattice
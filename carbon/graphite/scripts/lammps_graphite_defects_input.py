@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+
+# Interactive input for the graphite defect generators (lammps_gen_graphite_general_*.py).
+# ask_defect_lattice() asks the user for the lattice cells, the stacking, the lattice model (a and c parameters
+# and output format) and the percentage of the defects in each layer (pressing enter gives the defaults).
+
+# imported modules
+import sys
+
+
+# function asks the user for the settings of a graphite lattice with defects
+# defects = name of the defects, e.g. 'vacancies', defect = name of the distribution, e.g. 'vacancy'
+# drip = False leaves out the DRIP model and the molecular output format
+# returns [cells, stacking, lattice model, a, c, output format, percentage of the defects in each layer]
+def ask_defect_lattice(defects, defect, drip=True):
+
+    # Determine the lattice supercell size, ask user for lattice cell dimensions
+    my_cells = [-1, -1, -1]  # Default cell
+    # X
+    while True:
+        try:
+            my_cells[0] = input('Enter number of unit cells in the (armchair) X direction [default 12]: ')
+            if my_cells[0] == "":
+                my_cells[0] = 12
+                break
+            else:
+                my_cells[0] = int(my_cells[0])
+                if my_cells[0] > 0:
+                    break
+                else:
+                    print(">ERROR:  Integer must be greater than 0.  Try again...")
+        except ValueError:
+            print("ERROR:  That was not a valid integer.  Try again...")
+
+    # Y
+    while True:
+        try:
+            my_cells[1] = input('Enter number of unit cells in the (zigzag)   Y direction [default 21]: ')
+            if my_cells[1] == "":
+                my_cells[1] = 21
+                break
+            else:
+                my_cells[1] = int(my_cells[1])
+                if my_cells[1] > 0:
+                    break
+                else:
+                    print(">ERROR:  Integer must be greater than 0.  Try again...")
+        except ValueError:
+            print("ERROR:  That was not a valid integer.  Try again...")
+
+    # Z
+    while True:
+        try:
+            my_cells[2] = input('Enter number of unit cells in the (c, perp)  Z direction [default  8]: ')
+            if my_cells[2] == "":
+                my_cells[2] = 8
+                break
+            else:
+                my_cells[2] = int(my_cells[2])
+                if my_cells[2] > 0:
+                    break
+                else:
+                    print(">ERROR:  Integer must be greater than 0.  Try again...")
+        except ValueError:
+            print("ERROR:  That was not a valid integer.  Try again...")
+
+    print("")
+    # Determine the stacking pattern of the graphene planes
+    # stacking
+    while True:
+        my_stacking = str(input('Enter the graphene stacking pattern  (a, ab, abc, abba) [default: ab]: '))
+        # if zero length, return default
+        if len(my_stacking) == 0:
+            my_stacking = "ab"
+            break
+
+        stacking_error = False
+        for char in my_stacking:
+            if (char != 'a') and (char != 'b') and (char != 'c'):
+                print(">>> ERROR  <<< stacking order can contain only the letters: a,b,c")
+                stacking_error = True
+                break
+
+        if not stacking_error:
+            break
+
+    # Determine lattice parameters a and c for the cell and output format
+    # Choose from airebo, reaxff, hnn or custom
+    print("\nNow we need to determine lattice parameters (a and c) for the cell and output format")
+    print("Choose from pre-programmed models or input a custom type")
+    models = ["a", "r", "d", "h", "c"] if drip else ["a", "r", "h", "c"]
+    ot = ""
+    while ot not in models:
+        ot = input("a = AIREBO\n"
+                   "r = ReaxFF\n" +
+                   ("d = DRIP\n" if drip else "") +
+                   "h = hNN\n"
+                   "c = Custom\n"
+                   "Enter lattice format type [default AIREBO]: ").lower()
+        if ot == "":
+            ot = "a"
+
+    # Set appropriate cell parameters
+    if ot == "a":  # AIREBO
+        lat_a = 2.4175  # C-C = 1.395744276
+        lat_c = 3.358
+        lat_format = "atomic"
+        ot = "AIREBO"
+    elif ot == "d":  # DRIP
+        lat_a = 2.4195913  # C-C = 1.396951688
+        lat_c = 3.42424712
+        lat_format = "molecular"
+        ot = "DRIP"
+    elif ot == "r":  # ReaxFF
+        lat_a = 2.4334  # C-C = 1.404924145
+        lat_c = 3.2567
+        lat_format = "charge"
+        ot = "ReaxFF"
+    elif ot == "h":  # hNN
+        lat_a = 2.4636  # not correct
+        lat_c = 3.2567  # not correct
+        lat_format = "atomic"
+        ot = "hNN"
+    elif ot == "c":  # Custom
+        ot = "Custom"
+        # Need to ask the user for lattice options
+        print("\nSince you chosen the custom option,")
+        print("we need to determine lattice parameters (a and c) for the cell and output format\n")
+
+        # A parameter
+        while True:
+            try:
+                lat_a = input('Enter the lattice "a" parameter [default  2.4175]: ')
+                if lat_a == "":
+                    lat_a = 2.4175
+                    break
+                else:
+                    lat_a = float(lat_a)
+                    if lat_a > 0:
+                        break
+                    else:
+                        print(">ERROR:  Number must be greater than 0.  Try again...")
+            except ValueError:
+                print("ERROR:  That was not a valid number.  Try again...")
+
+        # C parameter
+        while True:
+            try:
+                lat_c = input('Enter the lattice "c" parameter [default  3.358]: ')
+                if lat_c == "":
+                    lat_c = 3.358
+                    break
+                else:
+                    lat_c = float(lat_c)
+                    if lat_c > 0:
+                        break
+                    else:
+                        print(">ERROR:  Number must be greater than 0.  Try again...")
+            except ValueError:
+                print("ERROR:  That was not a valid number.  Try again...")
+
+        print()
+        # output type
+        while True:
+            lat_format = input('a = atomic\n'
+                               'c = charge\n' +
+                               ('m = molecular\n' if drip else '') +
+                               'Enter output lattice format [default atomic]: ').lower()
+            if lat_format == "":
+                lat_format = "atomic"
+                break
+            else:
+                if lat_format == "a" or lat_format == "atomic":
+                    lat_format = "atomic"
+                    break
+                elif lat_format == "c" or lat_format == "charge":
+                    lat_format = "charge"
+                    break
+                elif drip and (lat_format == "m" or lat_format == "molecular"):
+                    lat_format = "molecular"
+                    break
+                else:
+                    print(">ERROR:  Output type not implemented  Try again...")
+    else:
+        # Not implemented, should not get here
+        sys.exit()
+
+    # Finally the defect distribution
+    print("\nFinally determine the distribution of the " + defects)
+
+    # uniform or custom distribution
+    while True:
+        dist = input('c = custom\n'
+                     'n = none\n'
+                     'r = ramp\n'
+                     'u = uniform\n'
+                     'Enter ' + defect + ' distribution in the lattice [default uniform]: ').lower()
+        # set default
+        if dist == "":
+            dist = "uniform"
+
+        # handle options
+        if dist == "c" or dist == "custom":
+            dist = "custom"
+            print("\nUser to choose the concentration of " + defects + " for each layer")
+            layers = len(my_stacking) * my_cells[2]
+            layer_conc = []
+
+            for i in range(layers):
+                while True:
+                    try:
+                        pc = input('Enter the percentage of ' + defects + ' for layer ' + str(i) + ' [default  1.0]: ')
+                        if pc == "":
+                            pc = 1.0
+                            break
+                        else:
+                            pc = float(pc)
+                            if pc >= 0:
+                                break
+                            else:
+                                print(">ERROR:  Number must not be negative.  Try again...")
+                    except ValueError:
+                        print("ERROR:  That was not a valid number.  Try again...")
+                layer_conc.append(pc)
+            break
+        elif dist == "n" or dist == "none":
+            dist = "none"
+            # array remains at default zero value
+            layer_conc = [0.0 for i in range(len(my_stacking) * my_cells[2])]
+            break
+        elif dist == "r" or dist == "ramp":
+            dist = "ramp"
+            print("\nPercentage of " + defects + " varies linearly from p1 at the edges to p2 at the centre")
+            while True:
+                try:
+                    pc1 = input('Enter the percentage of ' + defects + ' on layer 1 [default  0.0]: ')
+                    if pc1 == "":
+                        pc1 = 0.0
+                        break
+                    else:
+                        pc1 = float(pc1)
+                        if pc1 >= 0:
+                            break
+                        else:
+                            print(">ERROR:  Number must not be negative.  Try again...")
+                except ValueError:
+                    print("ERROR:  That was not a valid number.  Try again...")
+
+            while True:
+                try:
+                    pc2 = input('Enter the percentage of ' + defects + ' at the centre [default  0.0]: ')
+                    if pc2 == "":
+                        pc2 = 0.0
+                        break
+                    else:
+                        pc2 = float(pc2)
+                        if pc2 >= 0:
+                            break
+                        else:
+                            print(">ERROR:  Number must not be negative.  Try again...")
+                except ValueError:
+                    print("ERROR:  That was not a valid number.  Try again...")
+
+            # set values
+            layers = len(my_stacking) * my_cells[2]
+            layers2 = int(layers / 2)
+            m = (pc2 - pc1) / layers2
+            layer_conc = []
+            for i in range(layers):
+                if i <= layers2:
+                    layer_conc.append(pc1 + m * i)
+                else:
+                    layer_conc.append(pc2 - m * (i - layers2))
+            break
+        elif dist == "u" or dist == "uniform":
+            dist = "uniform"
+            # set conc equal for all layers
+            print("Percentage of " + defects + " will be equal for all layers")
+            while True:
+                try:
+                    pc = input('Enter the percentage of ' + defects + ' [default  1.0]: ')
+                    if pc == "":
+                        pc = 1.0
+                        break
+                    else:
+                        pc = float(pc)
+                        if pc >= 0:
+                            break
+                        else:
+                            print(">ERROR:  Number must not be negative.  Try again...")
+                except ValueError:
+                    print("ERROR:  That was not a valid number.  Try again...")
+            layer_conc = [pc for i in range(len(my_stacking) * my_cells[2])]
+            break
+        else:
+            print(">ERROR:  Output type not implemented  Try again...")
+
+    return [my_cells, my_stacking, ot, lat_a, lat_c, lat_format, layer_conc]
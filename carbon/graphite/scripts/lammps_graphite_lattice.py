@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+# Functions for building perfect graphite lattices, shared by the graphite generators.
+
+# The orthogonal graphite unit cell is sqrt(3)*a x a in the plane, and each graphene plane in the
+# stacking sequence adds 4 atoms to the cell.  The in-plane positions of the 4 atoms depend on the
+# stacking letter (a, b or c) of the plane.  The planes are separated by c_const.
+
+# graphite_lattice() builds every atom position at once, by broadcasting the 4 atom basis of each
+# stacking letter over the integer mesh of unit cells.  Two atom orderings are supported:
+# order = 'layer' , atoms ordered by z cell, stacking plane, x cell, y cell, basis atom
+#                   (each graphene layer is a contiguous block, used by the defect generators)
+# order = 'cell'  , atoms ordered by x cell, y cell, z cell, stacking plane, basis atom
+#                   (used by the perfect lattice generators for each potential)
+
+# graphite_neighbours() returns the three nearest neighbours of every atom directly from the (x cell,
+# y cell, layer, basis atom) indices of the atom, with periodic wrap in x and y, so no distances are
+# computed.  The neighbour offsets of each basis atom are found once from the basis geometry.
+# check_graphite_neighbours() compares this table with a distance based neighbour search, and is
+# only needed for validation and debugging.
+
+# imported modules
+import sys
+import math
+import numpy as np
+from lammps_neighbour_list import periodic_neighbours
+
+
+# function returns the in-plane offsets [[dx, dy], ...] of the 4 atom basis for a stacking letter
+def graphite_basis(a_const, letter):
+    # stacking position a
+    if letter == 'a':
+        return [[0.0, 0.0],
+                [a_const * 2.0 / math.sqrt(3), 0.0],
+                [a_const * math.sqrt(3) / 6.0, a_const / 2.0],
+                [a_const * math.sqrt(3) / 2.0, a_const / 2.0]]
+    # stacking position b
+    elif letter == 'b':
+        return [[0.0, 0.0],
+                [a_const / math.sqrt(3), 0.0],
+                [a_const * math.sqrt(3) / 2.0, a_const / 2.0],
+                [a_const * math.sqrt(3) * 5.0 / 6.0, a_const / 2.0]]
+    # stacking position c
+    elif letter == 'c':
+        return [[a_const / math.sqrt(3), 0.0],
+                [a_const * 2.0 / math.sqrt(3), 0.0],
+                [a_const * math.sqrt(3) / 6.0, a_const / 2.0],
+                [a_const * math.sqrt(3) * 5.0 / 6.0, a_const / 2.0]]
+    print(">>> ERROR  <<< stacking order can contain only the letters: a,b,c")
+    sys.exit()
+
+
+# function returns the box lengths [box_x, box_y, box_z] of the graphite lattice
+def graphite_box(a_const, c_const, cells, stacking):
+    return [math.sqrt(3) * a_const * cells[0],
+            a_const * cells[1],
+            c_const * cells[2] * len(stacking)]
+
+
+# function returns the (x cell, y cell, z cell, stacking plane, basis atom) indices of every atom,
+# as flat integer arrays in the order the atoms are listed
+def lattice_indices(cells, n_stack, order):
+    if order == 'layer':
+        iz, s, ix, iy, b = np.meshgrid(np.arange(cells[2]), np.arange(n_stack), np.arange(cells[0]),
+                                       np.arange(cells[1]), np.arange(4), indexing='ij')
+    elif order == 'cell':
+        ix, iy, iz, s, b = np.meshgrid(np.arange(cells[0]), np.arange(cells[1]), np.arange(cells[2]),
+                                       np.arange(n_stack), np.arange(4), indexing='ij')
+    else:
+        print(">>> ERROR  <<< Unknown atom order: " + str(order) + " (must be 'layer' or 'cell')")
+        sys.exit()
+    return ix.ravel(), iy.ravel(), iz.ravel(), s.ravel(), b.ravel()
+
+
+# function returns the id (0 based) of the atom with the given indices
+def atom_index(ix, iy, iz, s, b, cells, n_stack, order):
+    if order == 'layer':
+        return (((iz * n_stack + s) * cells[0] + ix) * cells[1] + iy) * 4 + b
+    return (((ix * cells[1] + iy) * cells[2] + iz) * n_stack + s) * 4 + b
+
+
+# function returns the three nearest neighbours of each basis atom for a stacking letter,
+# as a (4, 3, 3) array of [x cell offset, y cell offset, basis atom]
+def basis_neighbours(letter):
+    basis = np.array(graphite_basis(1.0, letter))
+    cc_len_buf = 1.1 / math.sqrt(3.0)
+    table = []
+    for b in range(4):
+        nebs = []
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                for b2 in range(4):
+                    d = basis[b2] + [dx * math.sqrt(3), dy] - basis[b]
+                    if 0.0 < math.sqrt(d[0] * d[0] + d[1] * d[1]) < cc_len_buf:
+                        nebs.append([dx, dy, b2])
+        table.append(nebs)
+    return np.array(table)
+
+
+# function returns the (N, 3) array of the ids of the three nearest neighbours of every atom of the
+# lattice built by graphite_lattice(), in ascending order.  Neighbours are in the same graphene layer,
+# and wrap around the periodic boundaries in x and y.
+def graphite_neighbours(cells, stacking, order='layer'):
+    n_stack = len(stacking)
+    table = np.array([basis_neighbours(letter) for letter in stacking])   # (n_stack, 4, 3, 3)
+
+    ix, iy, iz, s, b = lattice_indices(cells, n_stack, order)
+    atoms_NN = np.empty((len(ix), 3), dtype=int)
+    for k in range(3):
+        offset = table[s, b, k]
+        atoms_NN[:, k] = atom_index((ix + offset[:, 0]) % cells[0], (iy + offset[:, 1]) % cells[1],
+                                    iz, s, offset[:, 2], cells, n_stack, order)
+    return np.sort(atoms_NN, axis=1)
+
+
+# function checks the analytic neighbour table against a distance based neighbour search
+# returns True if they agree
+def check_graphite_neighbours(atoms_NN, positions, layer, a_const, cells, stacking):
+    box = graphite_box(a_const, 1.0, cells, stacking)
+    cc_len_buf = a_const / math.sqrt(3.0) * 1.1
+    search_NN = periodic_neighbours(positions[:, 0:2], box[0:2], cc_len_buf, 3, groups=layer)
+    return np.array_equal(search_NN, atoms_NN)
+
+
+# function returns the (N, 3) array of atom positions of a perfect graphite lattice, and the
+# (N,) array of the layer index of each atom (0 for the bottom plane)
+def graphite_lattice(a_const, c_const, cells, stacking, order='layer'):
+    n_stack = len(stacking)
+    basis = np.array([graphite_basis(a_const, letter) for letter in stacking])   # (n_stack, 4, 2)
+
+    ix, iy, iz, s, b = lattice_indices(cells, n_stack, order)
+
+    layer = n_stack * iz + s
+    positions = np.empty((len(layer), 3))
+    positions[:, 0] = ix * math.sqrt(3) * a_const + basis[s, b, 0]
+    positions[:, 1] = iy * a_const + basis[s, b, 1]
+    positions[:, 2] = layer * c_const
+    return positions, layer
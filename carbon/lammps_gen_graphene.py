@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+# This function generates a graphene lattice for any of the carbon potentials in lammps_carbon_potentials.py.
+# The lattice constant and atom style come from the preset of the potential, e.g. airebo (atomic) or reaxff (charge).
+# The graphene layer is at the centre of the box in z.
+
+# Keyword arguments:
+# verbose = True   , prints some comments to the screen.
+# forced  = True   , will overwrite the existing file (if it exists).
+# forced  = False  , if file exists, will ask the user if the existing file should be overwritten.
+# potential = 'airebo' , the potential preset: airebo, reaxff, hnn, drip_airebo, drip_rebo or gap
+# a_const = None   , the 'a' lattice constant, if not given the value of the potential preset
+# atom_style = None , atomic, charge, molecular or full, if not given the atom style of the potential preset
+# z_height = 20.0  , the height of the box in z
+# filename = lammps.lattice.dat  , the output filename
+# cells = [x,y]  , No. unit cells to generate for each direction.
+
+import sys
+import os
+import math
+from lammps_graphite_lattice import graphite_lattice
+from lammps_carbon_potentials import carbon_potentials, carbon_potential, molecule_ids, write_carbon_lattice
+
+
+def lammps_gen_graphene(**kwargs):
+
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)
+    forced = kwargs.get('forced', False)
+    potential = kwargs.get('potential', 'airebo')
+    preset = carbon_potential(potential, 'graphene')
+    a_const = kwargs.get('a_const', preset['a_const'])
+    atom_style = kwargs.get('atom_style', preset['atom_style'])
+    z_height = kwargs.get('z_height', 20.0)
+    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    cells = kwargs.get('cells', [1, 1])
+
+    # box size and atom total
+    box_x = math.sqrt(3) * a_const * cells[0]
+    box_y = a_const * cells[1]
+    box_z = z_height
+    tot_atoms = int(4 * cells[0] * cells[1])
+
+    # Welcome
+    if verbose:
+        print("  +------------------------------------------+")
+        print("  |         Lattice generator script         |")
+        print("  |             Graphene lattice             |")
+        print("  |" + preset['label'].center(42) + "|")
+        print("  +------------------------------------------+")
+        print("   ")
+
+        print(">  Echoing back the user supplied data")
+        print("     Potential preset: " + str(potential) + " (" + str(atom_style) + " format)")
+        print("     Lattice constant a [Ang]: " + str(a_const))
+        print("     Box Z height       [Ang]: " + str(z_height))
+        print(">  Graphene lattice with unit cell repeats:")
+        print("     cells_x: " + str(cells[0]))
+        print("     cells_y: " + str(cells[1]))
+        print(">  Graphene lattice cell dimensions [Ang]:")
+        print("     box_x: " + str(box_x))
+        print("     box_y: " + str(box_y))
+        print("     box_z: " + str(box_z))
+        print(">  Total number of atoms: " + str(tot_atoms))
+
+    # Check if the file already exists
+    if not forced:
+        if os.path.isfile(filename):
+            print("> Existing file " + str(filename) + " detected.")
+            print("> lammps_gen_graphene function wants to overwrite this file")
+
+            # Ask user if file should be overwritten
+            user_choice = input('Do you wish to overwrite the existing file? (y/n): ').lower()
+
+            if (user_choice == 'yes') or (user_choice == 'y') or (user_choice == 'yea'):
+                print(" > Overwriting existing file ... ")
+            else:
+                print("File not overwritten, exiting function")
+                return
+
+    # create lattice file, a single 'a' graphene layer at the centre of the box in z
+    positions, layer = graphite_lattice(a_const, 0.0, [cells[0], cells[1], 1], 'a', order='cell')
+    positions[:, 2] = z_height / 2.0
+    write_carbon_lattice(filename, "lammps_gen_graphene_" + str(potential),
+                         "Graphene " + str(cells[0]) + "x" + str(cells[1]) +
+                         " Unit cells, with a_param = " + str(a_const),
+                         [box_x, box_y, box_z], positions, atom_style, mol=molecule_ids(preset, layer),
+                         verbose=verbose)
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the potential and number of lattice cells from the command-line
+    if len(sys.argv) == 4 and sys.argv[1] in carbon_potentials:
+        my_cells = [int(sys.argv[2]), int(sys.argv[3])]
+    else:
+        print(">>> ERROR  <<<")
+        print("  User must pass 3 command-line arguments")
+        print("   3 params = potential, box_x, box_y  (integers)")
+        print("   potentials: " + ", ".join(carbon_potentials))
+        print("    examples")
+        print("   lammps_gen_graphene.py airebo 10 21")
+        print("   lammps_gen_graphene.py reaxff 10 21")
+        sys.exit()
+
+    # call the graphene generator function
+    lammps_gen_graphene(verbose=True, forced=True, potential=sys.argv[1], cells=my_cells)
@@ -2,6 +2,7 @@
 
 # This function simply generates a graphene lattice for the AIREBO forcefield.
 # The output is a lammps data file in atomic format (this is the required format for the AIREBO code).
+# The lattice is built by lammps_gen_graphene.py with the airebo potential preset.
 
 # Keyword arguments:
 # verbose = True   , prints some comments to the screen.
@@ -14,120 +15,13 @@
 # Kenny Jolley, August 2020
 
 import sys
-import os
-import math
+from lammps_gen_graphene import lammps_gen_graphene
 
 
 def lammps_gen_graphene_airebo(**kwargs):
 
-    # Default keyword args
-    verbose = kwargs.get('verbose', False)
-    forced = kwargs.get('forced', False)
-    # Default constants for the AIREBO Potl
-    a_const = kwargs.get('a_const', 2.4175)
-    z_height = kwargs.get('z_height', 20.0)
-    filename = kwargs.get('filename', 'lammps.lattice.dat')
-    cells = kwargs.get('cells', [1, 1])
-
-    # box size and atom total
-    box_x = math.sqrt(3) * a_const * cells[0]
-    box_y = a_const * cells[1]
-    box_z = z_height
-    tot_atoms = int(4 * cells[0] * cells[1])
-
-    # Welcome
-    if verbose:
-        print("  +------------------------------------------+")
-        print("  |         Lattice generator script         |")
-        print("  |             Graphene lattice             |")
-        print("  |                  AIREBO                  |")
-        print("  |               Kenny Jolley               |")
-        print("  |                August 2020               |")
-        print("  |          kenny.jolley@gmail.com          |")
-        print("  +------------------------------------------+")
-        print("   ")
-
-        print(">  Echoing back the user supplied data")
-        print("     Lattice constant a [Ang]: " + str(a_const))
-        print("     Box Z height       [Ang]: " + str(z_height))
-        print(">  Graphite lattice with unit cell repeats:")
-        print("     cells_x: " + str(cells[0]))
-        print("     cells_y: " + str(cells[1]))
-        print(">  Graphite lattice cell dimensions [Ang]:")
-        print("     box_x: " + str(box_x))
-        print("     box_y: " + str(box_y))
-        print("     box_z: " + str(box_z))
-        print(">  Total number of atoms: " + str(tot_atoms))
-
-    # Set generate file flag to true
-    gen_file = True
-
-    # Check if the file already exists
-    if not forced:
-        if os.path.isfile(filename):
-            print("> Existing file " + str(filename) + " detected.")
-            print("> lammps_gen_graphite_reaxff function wants to overwrite this file")
-
-            # Ask user if file should be overwritten
-            user_choice = input('Do you wish to overwrite the existing file? (y/n): ').lower()
-
-            if (user_choice == 'yes') or (user_choice == 'y') or (user_choice == 'yea'):
-                print(" > Overwriting existing file ... ")
-                gen_file = True
-            else:
-                print("File not overwritten, exiting function")
-                gen_file = False
-
-    # create lattice file
-    if gen_file:
-        file = open(filename, 'w+')
-        if verbose:
-            print("Opened file: " + str(file.name))
-
-        # Write header info
-        file.write("Lammps data file generated by lammps_gen_graphene_airebo.py\n")
-        file.write("# Graphene " + str(cells[0]) + "x" + str(cells[1]) +
-                   " Unit cells, with a_param = " + str(a_const) + "\n")
-        file.write(str(tot_atoms) + " atoms\n\n")
-        file.write("1 atom types # C\n\n")
-        file.write("0.0 " + str(box_x) + " xlo xhi\n")
-        file.write("0.0 " + str(box_y) + " ylo yhi\n")
-        file.write("0.0 " + str(box_z) + " zlo zhi\n\n")
-        file.write("Masses\n\n")
-        file.write("1 12.011\n\n")
-        file.write("Atoms # atomic\n\n")
-
-        # ID mol x y z
-        count = 1
-        for x in range(0, cells[0]):
-            x_shift = x * math.sqrt(3) * a_const
-            for y in range(0, cells[1]):
-                y_shift = y * a_const
-                z_shift = z_height / 2.0
-
-                file.write(str(count) + "  1  " +
-                           str(x_shift) + "  " +
-                           str(y_shift) + "  " +
-                           str(z_shift) + "\n")
-                file.write(str(count + 1) + "  1  " +
-                           str(x_shift + a_const * 2.0 / math.sqrt(3)) + "  " +
-                           str(y_shift) + "  " +
-                           str(z_shift) + "\n")
-                file.write(str(count + 2) + "  1  " +
-                           str(x_shift + a_const * math.sqrt(3) / 6.0) + "  " +
-                           str(y_shift + a_const / 2.0) + "  " +
-                           str(z_shift) + "\n")
-                file.write(str(count + 3) + "  1  " +
-                           str(x_shift + a_const * math.sqrt(3) / 2.0) + "  " +
-                           str(y_shift + a_const / 2.0) + "  " +
-                           str(z_shift) + "\n")
-                count = count + 4
-
-        file.close()
-
-        if verbose:
-            print("file closed: " + str(file.name))
-            print("COMPLETED lattice.dat output !!")
+    # Default constants for the AIREBO Potl (the airebo preset in lammps_carbon_potentials.py)
+    lammps_gen_graphene(potential='airebo', **kwargs)
 
 
 # If we are running this script interactively, call the function safely
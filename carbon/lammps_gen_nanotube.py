@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+# This function generates a nanotube of any chirality (n, m) centred in a periodic box, for any of the carbon
+# potentials in lammps_carbon_potentials.py.  The nanotube is periodic along x, its length is a whole number of
+# unit cells of the tube.  The lattice constant and atom style come from the preset of the potential,
+# e.g. airebo and hnn (atomic) or reaxff (charge).
+
+# The nanotube can also be assembled from concentric walls (a multi-walled tube), and into a bundle of tubes on a
+# triangular lattice, either a hexagonal bundle of any number of tubes surrounded by vacuum, or a periodic lattice
+# of tubes filling the box in y and z.  The atoms of every wall and tube are placed at once with numpy, and the
+# atoms of different walls or tubes are checked for overlaps (closer than min_sep) with a periodic cell list.
+# The molecule id of the molecular atom style (DRIP) is the wall of each atom, counted over all tubes.
+
+# Keyword arguments:
+# verbose = True   , prints some comments to the screen.
+# forced  = True   , will overwrite the existing file (if it exists).
+# forced  = False  , if file exists, will ask the user if the existing file should be overwritten.
+# potential = 'airebo' , the potential preset: airebo, reaxff, hnn, drip_airebo, drip_rebo or gap
+# a_const = None   , the 'a' lattice constant, if not given the value of the potential preset
+# atom_style = None , atomic, charge, molecular or full, if not given the atom style of the potential preset
+# filename = lammps.lattice.dat  , the output filename
+# chirality = [n,m] , chiral indices of the nanotube (the inner wall), [n,n] is armchair and [n,0] is zigzag
+# cells = 1        , No. unit cells of the nanotube (the inner wall) along its length
+# vacuum = 20.0    , space between the nanotube (or bundle) and its periodic images in y and z [Ang]
+# box_yz = None    , size of the box in y and z [Ang], if given it is used instead of the vacuum
+# walls = 1        , No. concentric walls, with the chiral angle of the inner wall, or a list of the chiral
+#                    indices of each wall from the inside out, e.g. [[5, 5], [10, 10], [15, 15]]
+#                    (a wall with a different unit cell length is stretched along the axis to fit the length)
+# wall_spacing = None , spacing between the walls [Ang], if not given c_const of the potential preset (or 3.4)
+# tubes = 1        , No. tubes in a hexagonal bundle (a full hexagon for 7, 19, 37, ... tubes)
+# periodic_bundle = None , [ny, nz] tubes along y and rows of tubes along z (nz even) of a periodic bundle that
+#                    fills the box in y and z, used instead of tubes
+# tube_gap = None  , gap between the outer walls of neighbouring tubes [Ang], if not given the wall spacing
+# min_sep = 2.0    , atoms of different walls or tubes closer than min_sep [Ang] are reported as an error
+
+import sys
+import os
+import math
+import numpy as np
+from lammps_carbon_potentials import carbon_potentials, carbon_potential, molecule_ids, write_carbon_lattice
+from lammps_nanotube import chiral_length, multiwall_chiralities, multiwall_tube, hexagonal_bundle, periodic_bundle
+from lammps_neighbour_list import cell_list_pairs
+
+
+def lammps_gen_nanotube(**kwargs):
+
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)
+    forced = kwargs.get('forced', False)
+    potential = kwargs.get('potential', 'airebo')
+    walls = kwargs.get('walls', 1)
+    chirality = walls[0] if isinstance(walls, (list, tuple)) else kwargs.get('chirality', [10, 10])
+    n, m = int(chirality[0]), int(chirality[1])
+    geometry = 'armchair' if n == m else 'zigzag' if m == 0 else 'nanotube'
+    preset = carbon_potential(potential, geometry)
+    a_const = kwargs.get('a_const', preset['a_const'])
+    atom_style = kwargs.get('atom_style', preset['atom_style'])
+    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    cells = int(kwargs.get('cells', 1))
+    vacuum = kwargs.get('vacuum', 20.0)
+    box_yz = kwargs.get('box_yz', None)
+    wall_spacing = kwargs.get('wall_spacing', preset['c_const'] or 3.4)
+    tubes = int(kwargs.get('tubes', 1))
+    bundle_cells = kwargs.get('periodic_bundle', None)
+    tube_gap = kwargs.get('tube_gap', wall_spacing)
+    min_sep = kwargs.get('min_sep', 2.0)
+
+    # the chiral indices of each wall
+    if isinstance(walls, (list, tuple)):
+        chiralities = [[int(w[0]), int(w[1])] for w in walls]
+    else:
+        chiralities = multiwall_chiralities(a_const, n, m, int(walls), wall_spacing)
+
+    # the atoms of one (multi-walled) tube, centred on y = z = 0, the nanotube length is along x
+    box_x = chiral_length(a_const, n, m) * cells
+    tube_positions, tube_wall, wall_radius, wall_strain = multiwall_tube(a_const, chiralities, box_x)
+    nanotube_radius = wall_radius[-1]
+    nanotube_circumference = 2.0 * math.pi * wall_radius[0]
+
+    # centres (y, z) of the tubes and the box size, the tubes are the outer diameter + tube_gap apart
+    tube_spacing = 2.0 * nanotube_radius + tube_gap
+    if bundle_cells is not None:
+        centres, (box_y, box_z) = periodic_bundle(bundle_cells, tube_spacing)
+    else:
+        centres = hexagonal_bundle(tubes, tube_spacing)
+        extent = centres.max(axis=0) - centres.min(axis=0)
+        if box_yz is None:
+            box_y = extent[0] + 2.0 * nanotube_radius + vacuum
+            box_z = extent[1] + 2.0 * nanotube_radius + vacuum
+        else:
+            box_y = box_yz
+            box_z = box_yz
+        centres = centres + [box_y / 2.0, box_z / 2.0] - 0.5 * (centres.max(axis=0) + centres.min(axis=0))
+    n_tubes = len(centres)
+
+    # the atoms of every tube, tube by tube, and the wall of each atom counted over all tubes
+    # (wrapped into the periodic box, the tubes at the edge of a periodic bundle cross the box boundary)
+    positions = (tube_positions[np.newaxis, :, :] +
+                 np.column_stack([np.zeros(n_tubes), centres])[:, np.newaxis, :]).reshape(-1, 3)
+    positions = np.mod(positions, [box_x, box_y, box_z])
+    wall = (np.arange(n_tubes)[:, np.newaxis] * len(chiralities) + tube_wall[np.newaxis, :]).ravel()
+    tot_atoms = len(positions)
+
+    # Welcome
+    if verbose:
+        print("  +------------------------------------------------+")
+        print("  |             Lattice generator script           |")
+        print("  |             Chiral (n, m) Nanotube             |")
+        print("  |" + (preset['label'] + " force-field").center(48) + "|")
+        print("  +------------------------------------------------+")
+        print("   ")
+
+        print(">  Echoing back the user supplied data")
+        print("     Potential preset: " + str(potential) + " (" + str(atom_style) + " format)")
+        print("     Lattice constant a [Ang]: " + str(a_const))
+        print("     Chirality (n, m): (" + str(n) + ", " + str(m) + ")")
+        print(">    Nanotube length [Ang]: " + str(box_x))
+        print(">    Nanotube radius [Ang]: " + str(nanotube_radius))
+        print(">    Nanotube circumference [Ang]: " + str(nanotube_circumference))
+        print(">    Unit cell length [Ang]: " + str(chiral_length(a_const, n, m)))
+        print(">    Unit cells along the nanotube: " + str(cells))
+        if len(chiralities) > 1:
+            print(">    Walls (n, m), radius [Ang]:")
+            for (wall_n, wall_m), radius, strain in zip(chiralities, wall_radius, wall_strain):
+                print("       (" + str(wall_n) + ", " + str(wall_m) + ")  " + str(radius) +
+                      ("  axial strain " + str(strain) if strain != 0.0 else ""))
+        if n_tubes > 1:
+            print(">    Tubes in the bundle: " + str(n_tubes) + ("" if bundle_cells is None else
+                                                                 " (periodic " + str(bundle_cells) + ")"))
+            print(">    Tube spacing (axis to axis) [Ang]: " + str(tube_spacing))
+        print(">  Nanotube lattice cell dimensions [Ang]:")
+        print("     box_x: " + str(box_x))
+        print("     box_y: " + str(box_y))
+        print("     box_z: " + str(box_z))
+        print(">  Total number of atoms: " + str(tot_atoms))
+
+    for (wall_n, wall_m), strain in zip(chiralities, wall_strain):
+        if abs(strain) > 0.01:
+            print(">>> WARNING: the (" + str(wall_n) + ", " + str(wall_m) + ") wall is strained by " +
+                  str(round(100.0 * strain, 3)) + " % along the axis, to fit the length of the inner wall")
+
+    # Check for atoms of different walls or tubes closer than min_sep (including the periodic images)
+    if len(chiralities) > 1 or n_tubes > 1:
+        overlaps = cell_list_pairs(positions, [box_x, box_y, box_z], min_sep, groups=wall)
+        if len(overlaps) > 0:
+            print(">>> ERROR  <<< " + str(len(overlaps)) + " pairs of atoms of different walls or tubes are closer " +
+                  "than min_sep = " + str(min_sep) + " Ang, e.g. atoms " + str(overlaps[0][0] + 1) + " and " +
+                  str(overlaps[0][1] + 1))
+            print("  (increase wall_spacing, tube_gap or the box size)")
+            sys.exit()
+
+    # Check if the file already exists
+    if not forced:
+        if os.path.isfile(filename):
+            print("> Existing file " + str(filename) + " detected.")
+            print("> lammps_gen_nanotube function wants to overwrite this file")
+
+            # Ask user if file should be overwritten
+            user_choice = input('Do you wish to overwrite the existing file? (y/n): ').lower()
+
+            if (user_choice == 'yes') or (user_choice == 'y') or (user_choice == 'yea'):
+                print(" > Overwriting existing file ... ")
+            else:
+                print("File not overwritten, exiting function")
+                return
+
+    # create lattice file, the nanotube length is along x, the molecule id (if needed) is the wall
+    comment = "Nanotube " + " ".join("(" + str(w[0]) + ", " + str(w[1]) + ")" for w in chiralities)
+    if n_tubes > 1:
+        comment = "Bundle of " + str(n_tubes) + " tubes, " + comment
+    write_carbon_lattice(filename, "lammps_gen_nanotube_" + str(potential),
+                         comment + " with " + str(cells) + " Unit cells, with a_param = " + str(a_const),
+                         [box_x, box_y, box_z], positions, atom_style, mol=molecule_ids(preset, wall),
+                         verbose=verbose)
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the potential, the chiral indices and the number of unit cells from the command-line,
+    # and optionally the number of walls and of tubes in a hexagonal bundle
+    if 5 <= len(sys.argv) <= 7 and sys.argv[1] in carbon_potentials:
+        my_chirality = [int(sys.argv[2]), int(sys.argv[3])]
+        my_cells = int(sys.argv[4])
+        my_walls = int(sys.argv[5]) if len(sys.argv) > 5 else 1
+        my_tubes = int(sys.argv[6]) if len(sys.argv) > 6 else 1
+    else:
+        print(">>> ERROR  <<<")
+        print("  User must pass 4 to 6 command-line arguments")
+        print("   4 params = potential, n, m, unit cells along the nanotube  (integers)")
+        print("   5 params = potential, n, m, unit cells, walls")
+        print("   6 params = potential, n, m, unit cells, walls, tubes in a hexagonal bundle")
+        print("   potentials: " + ", ".join(carbon_potentials))
+        print("    examples")
+        print("   lammps_gen_nanotube.py airebo 10 10 20")
+        print("   lammps_gen_nanotube.py reaxff 10 5 4")
+        print("   lammps_gen_nanotube.py airebo 5 5 10 3 19")
+        sys.exit()
+
+    # call the nanotube generator function
+    lammps_gen_nanotube(verbose=True, forced=True, potential=sys.argv[1], chirality=my_chirality, cells=my_cells,
+                        walls=my_walls, tubes=my_tubes)
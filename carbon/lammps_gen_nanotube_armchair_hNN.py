@@ -3,6 +3,7 @@
 # This function simply generates a nanotube with an armchair end centred in a periodic box.
 # a_const defaults to the https://openkim.org/id/hNN_WenTadmor_2019Grx_C__MO_421038499185_001 force-field.
 # The output is a lammps data file in atomic format (this is the required format for the hNN code).
+# The lattice is built by lammps_gen_nanotube.py with the hnn potential preset.
 
 # Keyword arguments:
 # verbose = True   , prints some comments to the screen.
@@ -15,150 +16,25 @@
 # Kenny Jolley, Dec 2020
 
 import sys
-import os
-import math
+from lammps_carbon_potentials import carbon_potential
+from lammps_nanotube import nanotube_radius
+from lammps_gen_nanotube import lammps_gen_nanotube
 
 
 def lammps_gen_nanotube_armchair_hnn(**kwargs):
 
-    # Default keyword args
-    verbose = kwargs.get('verbose', False)
-    forced = kwargs.get('forced', False)
-    # Default constants for the hNN_WenTadmor_2019Grx_C__MO_421038499185_001 force-field.
-    a_const = kwargs.get('a_const', 2.4636)
-    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    # Default constants for the hNN force-field (the hnn preset in lammps_carbon_potentials.py)
+    a_const = kwargs.get('a_const', carbon_potential('hnn', 'armchair')['a_const'])
     cells = kwargs.get('cells', [1, 1])
 
-    # box size and atom total
-    nanotube_radius = 0.5 * math.sqrt(3) * a_const * cells[0] / math.pi
-    box_y = 2.0 * nanotube_radius + 20.0
-    box_z = 2.0 * nanotube_radius + 20.0
-    box_x = a_const * cells[1]
+    # cells = [n, unit cells along the nanotube], an (n, n) nanotube
+    n, m = cells[0], cells[0]
+    radius = nanotube_radius(a_const, n, m)
+    # box size in y and z, the nanotube diameter + 20 Ang
+    box_yz = 2.0 * radius + 20.0
 
-    tot_atoms = int(4 * cells[0] * cells[1])
-
-    # Welcome
-    if verbose:
-        print("  +------------------------------------------------+")
-        print("  |             Lattice generator script           |")
-        print("  |                Armchair Nanotube               |")
-        print("  |  hNN_WenTadmor_2019Grx_C__MO_421038499185_001  |")
-        print("  |                   Kenny Jolley                 |")
-        print("  |                     Dec 2020                   |")
-        print("  |               kenny.jolley@gmail.com           |")
-        print("  +------------------------------------------------+")
-        print("   ")
-
-        print(">  Echoing back the user supplied data")
-        print("     Lattice constant a [Ang]: " + str(a_const))
-        print(">    Nanotube length [Ang]: " + str(box_x))
-        print(">    Nanotube radius [Ang]: " + str(nanotube_radius))
-        print(">    Nanotube circumference [Ang]: " + str(math.sqrt(3) * a_const * cells[0]))
-        print(">  Nanotube lattice with unit cell repeats:")
-        print("     cells_x: " + str(cells[0]))
-        print("     cells_y: " + str(cells[1]))
-        print(">  Nanotube lattice cell dimensions [Ang]:")
-        print("     box_x: " + str(box_x))
-        print("     box_y: " + str(box_y))
-        print("     box_z: " + str(box_z))
-        print(">  Total number of atoms: " + str(tot_atoms))
-
-    # Set generate file flag to true
-    gen_file = True
-
-    # Check if the file already exists
-    if not forced:
-        if os.path.isfile(filename):
-            print("> Existing file " + str(filename) + " detected.")
-            print("> lammps_gen_nanotube_armchair_hnn function wants to overwrite this file")
-
-            # Ask user if file should be overwritten
-            user_choice = input('Do you wish to overwrite the existing file? (y/n): ').lower()
-
-            if (user_choice == 'yes') or (user_choice == 'y') or (user_choice == 'yea'):
-                print(" > Overwriting existing file ... ")
-                gen_file = True
-            else:
-                print("File not overwritten, exiting function")
-                gen_file = False
-
-    # create lattice file
-    if gen_file:
-        file = open(filename, 'w+')
-        if verbose:
-            print("Opened file: " + str(file.name))
-
-        # Write header info
-        file.write("Lammps data file generated by lammps_gen_nanotube_armchair_hnn\n")
-        file.write("# Nanotube " + str(cells[0]) + "x" + str(cells[1]) +
-                   " Unit cells, with a_param = " + str(a_const) + "\n")
-        file.write(str(tot_atoms) + " atoms\n\n")
-        file.write("1 atom types # C\n\n")
-        file.write("0.0 " + str(box_x) + " xlo xhi\n")
-        file.write("0.0 " + str(box_y) + " ylo yhi\n")
-        file.write("0.0 " + str(box_z) + " zlo zhi\n\n")
-        file.write("Masses\n\n")
-        file.write("1 12.011\n\n")
-        file.write("Atoms # atomic\n\n")
-
-        # setup arrays to hold atom coordinates
-        x = []
-        y = []
-        z = []
-
-        # compute coordinates of underlying graphene lattice
-        for i in range(0, cells[0]):
-            x_shift = i * math.sqrt(3) * a_const
-            for j in range(0, cells[1]):
-                y_shift = j * a_const
-
-                x.append(x_shift)
-                y.append(y_shift)
-                z.append(0.0)
-
-                x.append(x_shift + a_const * 2.0 / math.sqrt(3))
-                y.append(y_shift)
-                z.append(0.0)
-
-                x.append(x_shift + a_const * math.sqrt(3) / 6.0)
-                y.append(y_shift + a_const / 2.0)
-                z.append(0.0)
-
-                x.append(x_shift + a_const * math.sqrt(3) / 2.0)
-                y.append(y_shift + a_const / 2.0)
-                z.append(0.0)
-
-        # project points onto cylinder surface
-        x_new = []
-        y_new = []
-        z_new = []
-        for i in range(len(x)):
-            y_new.append(y[i])
-            x_new.append(nanotube_radius * math.sin(x[i] / nanotube_radius))
-            z_new.append(nanotube_radius * math.cos(x[i] / nanotube_radius))
-
-        # translate
-        for i in range(len(x)):
-            x_new[i] = x_new[i] + box_y / 2.0
-            z_new[i] = z_new[i] + box_z / 2.0
-
-        # switch x and y, since we wrap around y axis and want nanotube rotated so length is along x
-        temp_c = y_new.copy()
-        y_new = x_new
-        x_new = temp_c
-
-        # Output data:  ID type x y z
-        for i in range(len(x)):
-            file.write(str(i + 1) + "  1  " +
-                       str(x_new[i]) + "  " +
-                       str(y_new[i]) + "  " +
-                       str(z_new[i]) + "\n")
-
-        file.close()
-
-        if verbose:
-            print("file closed: " + str(file.name))
-            print("COMPLETED lattice.dat output !!")
+    lammps_gen_nanotube(**dict(kwargs, potential='hnn', a_const=a_const, chirality=[n, m],
+                               cells=cells[1], box_yz=box_yz))
 
 
 # If we are running this script interactively, call the function safely
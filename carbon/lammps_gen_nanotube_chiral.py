@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+# This function generates a nanotube of any chirality (n, m) centred in a periodic box.
+# The nanotube is periodic along x, its length is a whole number of unit cells of the tube.
+# a_const defaults to the optimised value at zero K for the AIREBO force-field.
+# The output is a lammps data file in atomic (AIREBO, hNN) or charge (ReaxFF) format.
+# The lattice is built by lammps_gen_nanotube.py with the airebo potential preset.
+
+# Keyword arguments:
+# verbose = True   , prints some comments to the screen.
+# forced  = True   , will overwrite the existing file (if it exists).
+# forced  = False  , if file exists, will ask the user if the existing file should be overwritten.
+# a_const = 2.42   , the 'a' lattice constant
+# filename = lammps.lattice.dat  , the output filename
+# chirality = [n,m] , chiral indices of the nanotube, [n,n] is armchair and [n,0] is zigzag
+# cells = 1        , No. unit cells of the nanotube along its length
+# vacuum = 20.0    , space between the nanotube and its periodic images in y and z [Ang]
+# output_format = 'atomic' , atomic or charge
+
+import sys
+from lammps_gen_nanotube import lammps_gen_nanotube
+
+
+def lammps_gen_nanotube_chiral(**kwargs):
+
+    # Default constants for the AIREBO force-field.
+    a_const = kwargs.get('a_const', 2.42)
+    output_format = kwargs.get('output_format', 'atomic')
+
+    if output_format not in ['atomic', 'charge']:
+        print(">>> ERROR  <<< output_format must be 'atomic' or 'charge', got " + str(output_format))
+        sys.exit()
+
+    # the airebo preset, with the atom style given by output_format (see lammps_gen_nanotube.py)
+    kwargs = {key: value for key, value in kwargs.items() if key != 'output_format'}
+    lammps_gen_nanotube(**dict(kwargs, potential='airebo', a_const=a_const, atom_style=output_format))
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the chiral indices and the number of unit cells from the command-line
+    if len(sys.argv) == 4:
+        my_chirality = [int(sys.argv[1]), int(sys.argv[2])]
+        my_cells = int(sys.argv[3])
+    else:
+        print(">>> ERROR  <<<")
+        print("  User must pass 3 command-line arguments")
+        print("   3 params = n, m, unit cells along the nanotube  (integers)")
+        print("    examples")
+        print("   lammps_gen_nanotube_chiral.py 10 10 20")
+        print("   lammps_gen_nanotube_chiral.py 10 5 4")
+        sys.exit()
+
+    # call the nanotube generator function
+    lammps_gen_nanotube_chiral(verbose=True, forced=True, chirality=my_chirality, cells=my_cells)
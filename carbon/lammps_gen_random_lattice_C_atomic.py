@@ -12,6 +12,14 @@
 # filename = lammps.lattice.dat  , the output filename
 # use_min_sep = True , Random placed atoms are checked such that they are not too close to others (defined by min_sep)
 # min_sep = 1.0      , Minimum separation distance between atoms in random lattice (if used).
+# seed = None        , random seed, if not given a new seed is generated
+# on_stall = 'fail'  , if the packing stalls (density too high) exit with a report, or
+# on_stall = 'relax' , reduce min_sep a little at a time until the atoms fit
+# progress = None    , csv file for the packing progress (atoms placed, acceptance rate, ...)
+# method = 'rsa'     , atoms placed one at a time at random, no closer than min_sep (random sequential addition)
+# method = 'poisson_disk' , atoms chosen from a Poisson-disk sample with the largest radius the density allows
+#                      (a more even spread of atoms, min_sep is the smallest radius allowed,
+#                      so use_min_sep must be True)
 
 
 #    Kenny Jolley, April 2019
@@ -20,7 +28,9 @@
 import sys
 import os
 import math
-import random
+import numpy as np
+from lammps_data_file import open_data_file, write_atoms
+from lammps_random_packing import random_packing, poisson_disk_packing
 
 
 # function generates a random lattice of carbon atoms, and saves the file to disk
@@ -33,7 +43,16 @@ def lammps_gen_random_lattice_c_atomic(**kwargs):
     filename = kwargs.get('filename', 'lammps.lattice.dat')
     use_min_sep = kwargs.get('use_min_sep', True)
     min_sep = kwargs.get('min_sep', 1.0)
-    min_sep2 = min_sep * min_sep
+    seed = kwargs.get('seed', None)  # random seed
+    on_stall = kwargs.get('on_stall', 'fail')  # if the packing stalls, 'fail' or 'relax' min_sep
+    progress = kwargs.get('progress', None)  # csv file of the packing progress
+    method = kwargs.get('method', 'rsa')  # 'rsa' or 'poisson_disk'
+
+    # the Poisson-disk radius is never below min_sep, so it can not be used without the min_sep check
+    if method == 'poisson_disk' and not use_min_sep:
+        print(">>> ERROR  <<< method 'poisson_disk' always keeps the atoms at least min_sep apart, "
+              "use_min_sep must be True")
+        sys.exit()
 
     # System Mass
     amu = 1.660538921E-27  # in kg
@@ -68,7 +87,6 @@ def lammps_gen_random_lattice_c_atomic(**kwargs):
         print("   ")
         if use_min_sep:
             print("  Checking atoms are not placed within:  " + str(min_sep) + " Ang")
-            print("  This is slow for large systems. ")
             print("   ")
 
     # Check if the file already exists
@@ -92,14 +110,34 @@ def lammps_gen_random_lattice_c_atomic(**kwargs):
 
     # Generate file
     if gen_file:
-        file = open(filename, 'w+')
+        # Generate the atom positions, no closer than min_sep if required
+        rng = np.random.default_rng(seed)
+        packing_stats = {}
+        if method == 'rsa':
+            positions = random_packing(num_atoms, [cube_size_ang] * 3, min_sep, rng, use_min_sep, verbose=verbose,
+                                       on_stall=on_stall, progress=progress, stats=packing_stats)
+        elif method == 'poisson_disk':
+            positions = poisson_disk_packing(num_atoms, [cube_size_ang] * 3, min_sep, rng, verbose=verbose,
+                                             on_stall=on_stall, stats=packing_stats)
+        else:
+            print(">>> ERROR  <<< Unknown method " + str(method) + ", expected 'rsa' or 'poisson_disk'")
+            sys.exit()
+
+        # note of the scaled min_sep for the header, if the packing had to reduce it
+        min_sep_note = ""
+        if packing_stats.get('min_sep_scale', 1.0) != 1.0:
+            min_sep_note = ", min_sep scaled by " + str(round(packing_stats['min_sep_scale'], 4))
+        if method == 'poisson_disk':
+            min_sep_note += ", Poisson-disk radius " + str(round(packing_stats['radius'], 4))
+
+        file = open_data_file(filename, 'w')
         if verbose:
             print("  Opened file: " + str(file.name))
 
         # Write header info
         file.write("Lammps data file generated by lammps_gen_random_lattice_C_atomic\n")
         file.write("#   Random lattice with " + str(num_atoms) +
-                   " carbon atoms, at a density of " + str(density) + " g/cm^3\n")
+                   " carbon atoms, at a density of " + str(density) + " g/cm^3" + min_sep_note + "\n")
         file.write(str(num_atoms) + " atoms\n\n")
         file.write("1 atom types # C\n\n")
         file.write("0.0 " + str(cube_size_ang) + " xlo xhi\n")
@@ -109,82 +147,9 @@ def lammps_gen_random_lattice_c_atomic(**kwargs):
         file.write("1 " + str(carbon_mass) + "\n\n")
         file.write("Atoms # atomic\n\n")
 
-        # Create atom arrays
-        atom_pos_x = [-1.0 for _ in range(num_atoms + 1)]
-        atom_pos_y = [-1.0 for _ in range(num_atoms + 1)]
-        atom_pos_z = [-1.0 for _ in range(num_atoms + 1)]
-
-        # Generate first position
-        atom_pos_x[0] = random.uniform(0, cube_size_ang)
-        atom_pos_y[0] = random.uniform(0, cube_size_ang)
-        atom_pos_z[0] = random.uniform(0, cube_size_ang)
-
-        for i in range(1, num_atoms + 1):
-            if verbose:
-                if (100 * float(i)) % num_atoms == 0:
-                    print(".", end='')
-                    sys.stdout.flush()
-                if (10 * float(i)) % num_atoms == 0:
-                    print(str(100 * float(i) / num_atoms) + " %")
-
-            # Generate position
-            while True:
-                # generate atom i
-                atom_pos_x[i] = random.uniform(0, cube_size_ang)
-                atom_pos_y[i] = random.uniform(0, cube_size_ang)
-                atom_pos_z[i] = random.uniform(0, cube_size_ang)
-
-                # check it is no closer than min_sep if required
-                if use_min_sep:
-                    sep_test = 1
-                    # loop over all atoms
-                    for j in range(0, i):
-                        # x coord
-                        # print i, j
-                        dx = atom_pos_x[i] - atom_pos_x[j]
-                        dx2 = abs(dx + cube_size_ang)
-                        dx3 = abs(dx - cube_size_ang)
-                        dx1 = abs(dx)
-                        # min x-sep
-                        dxm = min(dx1, dx2)
-                        dxm = min(dxm, dx3)
-
-                        # if within x dist, check other coordinates
-                        if dxm < min_sep:
-                            dy = atom_pos_y[i] - atom_pos_y[j]
-                            dy2 = abs(dy + cube_size_ang)
-                            dy3 = abs(dy - cube_size_ang)
-                            dy1 = abs(dy)
-                            # min y-sep
-                            dym = min(dy1, dy2)
-                            dym = min(dym, dy3)
-                            # if within y dist, check other coordinates
-                            if dym < min_sep:
-                                dz = atom_pos_z[i] - atom_pos_z[j]
-                                dz2 = abs(dz + cube_size_ang)
-                                dz3 = abs(dz - cube_size_ang)
-                                dz1 = abs(dz)
-                                # min z-sep
-                                dzm = min(dz1, dz2)
-                                dzm = min(dzm, dz3)
-
-                                # if within z dist, check other coordinates
-                                if dzm < min_sep:
-                                    # full calc
-                                    dr2 = dxm * dxm + dym * dym + dzm * dzm
-                                    if dr2 < min_sep2:
-                                        # print("too close")
-                                        sep_test = 0
-                else:
-                    break
-
-                # break if passed min separation test
-                if sep_test:
-                    break
-
-            # Output to file
-            file.write(
-                str(i) + "  1  " + str(atom_pos_x[i]) + "  " + str(atom_pos_y[i]) + "  " + str(atom_pos_z[i]) + "\n")
+        # Output to file
+        write_atoms(file, 'atomic', np.arange(1, num_atoms + 1), 1, positions, sep="  ")
+        file.close()
 
 
 # If we are running this script interactively, call the function safely
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+# Functions for building single walled carbon nanotubes, shared by the nanotube generators.
+
+# A nanotube is a graphene sheet rolled onto a cylinder.  The flat sheet is built with numpy, and each
+# atom is mapped onto the cylinder at once, the distance around the circumference becomes the angle
+# around the tube axis.  The tube axis is along x, and the tube is centred on y = z = 0.
+
+# armchair_sheet() and zigzag_sheet() build the sheet of the orthogonal graphite unit cell (sqrt(3)*a x a,
+# see lammps_graphite_lattice.py), wrapped along x for an (n, n) armchair tube or along y for an (n, 0)
+# zigzag tube.  chiral_sheet() builds the sheet of any (n, m) tube from the chiral vector
+# C = n*a1 + m*a2 and the translation vector T (the shortest lattice vector along the tube axis):
+#   a1 = a (sqrt(3)/2, 1/2), a2 = a (sqrt(3)/2, -1/2), the two atoms of the graphene cell at 0 and (a1 + a2)/3
+#   d_R = gcd(2m + n, 2n + m), T = ((2m + n) a1 - (2n + m) a2) / d_R
+#   the unit cell of the tube (C x T) holds 4 (n^2 + nm + m^2) / d_R atoms
+# The atoms of the unit cell are found with integer arithmetic on the lattice indices, so no atoms are
+# lost or doubled at the cell edges.  nanotube_sheet() returns the sheet of any (n, m) tube, using the orthogonal
+# cell for armchair and zigzag tubes.
+
+# Multi-walled tubes are built from concentric walls rolled around the same axis, and bundles of tubes by adding
+# the atoms of one tube to the centre (y, z) of every tube at once, on a triangular lattice of tubes.
+
+# imported modules
+import sys
+import math
+import numpy as np
+from lammps_graphite_lattice import graphite_lattice
+
+
+# function rolls a flat sheet onto a cylinder of the given radius, returns the (N, 3) positions
+# around = distance of each atom around the circumference, along = distance along the tube axis (x)
+def roll_sheet(around, along, radius):
+    positions = np.empty((len(around), 3))
+    positions[:, 0] = along
+    positions[:, 1] = radius * np.sin(around / radius)
+    positions[:, 2] = radius * np.cos(around / radius)
+    return positions
+
+
+# function returns the sheet of an (n, n) armchair tube, cells = [n, repeats along the axis]
+# returns the distance of each atom around the circumference and along the axis, and the circumference
+def armchair_sheet(a_const, cells):
+    sheet = graphite_lattice(a_const, 0.0, [cells[0], cells[1], 1], 'a', order='cell')[0]
+    return sheet[:, 0], sheet[:, 1], math.sqrt(3) * a_const * cells[0]
+
+
+# function returns the sheet of an (n, 0) zigzag tube, cells = [repeats along the axis, n]
+# returns the distance of each atom around the circumference and along the axis, and the circumference
+def zigzag_sheet(a_const, cells):
+    sheet = graphite_lattice(a_const, 0.0, [cells[0], cells[1], 1], 'a', order='cell')[0]
+    return sheet[:, 1], sheet[:, 0], a_const * cells[1]
+
+
+# function returns the translation vector (t1, t2) and the number of atoms in the unit cell of an (n, m) tube
+def chiral_unit_cell(n, m):
+    if n < 0 or m < 0 or n + m == 0:
+        print(">>> ERROR  <<< Chiral indices (n, m) must be >= 0 and not both zero, got " + str((n, m)))
+        sys.exit()
+    d_r = math.gcd(2 * m + n, 2 * n + m)
+    return (2 * m + n) // d_r, -(2 * n + m) // d_r, 4 * (n * n + n * m + m * m) // d_r
+
+
+# function returns the length of the unit cell of an (n, m) tube along its axis
+def chiral_length(a_const, n, m):
+    t1, t2, _ = chiral_unit_cell(n, m)
+    return a_const * math.sqrt(t1 * t1 + t1 * t2 + t2 * t2)
+
+
+# function returns the sheet of an (n, m) tube, with repeats unit cells along the axis
+# returns the distance of each atom around the circumference and along the axis, and the circumference
+# the atoms are ordered by unit cell, then along the axis and around the circumference
+def chiral_sheet(a_const, n, m, repeats=1):
+    t1, t2, n_atoms = chiral_unit_cell(n, m)
+
+    # lattice indices (i, j) of the graphene cells that can hold atoms of the unit cell
+    corners_i = [0, n, t1, n + t1]
+    corners_j = [0, m, t2, m + t2]
+    i, j = np.meshgrid(np.arange(min(corners_i) - 1, max(corners_i) + 2),
+                       np.arange(min(corners_j) - 1, max(corners_j) + 2), indexing='ij')
+
+    # fractions of C and T of the two atoms of each cell, as integers over the denominator 3 det
+    det = n * t2 - m * t1
+    i3 = np.concatenate([3 * i.ravel(), 3 * i.ravel() + 1])
+    j3 = np.concatenate([3 * j.ravel(), 3 * j.ravel() + 1])
+    frac_c = (i3 * t2 - j3 * t1) * np.sign(det)
+    frac_t = (n * j3 - m * i3) * np.sign(det)
+    denominator = 3 * abs(det)
+    inside = (frac_c >= 0) & (frac_c < denominator) & (frac_t >= 0) & (frac_t < denominator)
+    frac_c = frac_c[inside]
+    frac_t = frac_t[inside]
+    if len(frac_c) != n_atoms:
+        print(">>> ERROR  <<< Found " + str(len(frac_c)) + " atoms in the unit cell of the (" + str(n) + ", " +
+              str(m) + ") tube, expected " + str(n_atoms))
+        sys.exit()
+    order = np.lexsort((frac_c, frac_t))
+    frac_c = frac_c[order]
+    frac_t = frac_t[order]
+
+    # lengths of C and T, and the atoms of every unit cell along the axis
+    circumference = a_const * math.sqrt(n * n + n * m + m * m)
+    length = chiral_length(a_const, n, m)
+    cell = np.repeat(np.arange(repeats), n_atoms)
+    around = np.tile(frac_c / denominator * circumference, repeats)
+    along = (np.tile(frac_t / denominator, repeats) + cell) * length
+    return around, along, circumference
+
+
+# function returns the radius of an (n, m) tube, from the circumference of the sheet given by nanotube_sheet()
+def nanotube_radius(a_const, n, m):
+    if n == m:
+        circumference = math.sqrt(3) * a_const * n
+    elif m == 0:
+        circumference = a_const * n
+    else:
+        circumference = a_const * math.sqrt(n * n + n * m + m * m)
+    return 0.5 * circumference / math.pi
+
+
+# function returns the sheet of an (n, m) tube, with repeats unit cells along the axis
+# armchair (n, n) and zigzag (n, 0) tubes use the orthogonal graphite cell, all other tubes the chiral unit cell
+def nanotube_sheet(a_const, n, m, repeats=1):
+    chiral_unit_cell(n, m)
+    if n == m:
+        return armchair_sheet(a_const, [n, repeats])
+    if m == 0:
+        return zigzag_sheet(a_const, [repeats, n])
+    return chiral_sheet(a_const, n, m, repeats)
+
+
+# function returns the chiralities of the walls of a multi-walled tube, from the inner (n, m) wall outwards
+# all walls have the chiral angle of the inner wall (so the same unit cell length), the step in (n, m) between
+# walls is the one that gives the wall spacing closest to wall_spacing
+def multiwall_chiralities(a_const, n, m, walls, wall_spacing):
+    chiral_unit_cell(n, m)
+    g = math.gcd(n, m)
+    step = max(1, int(round(wall_spacing / nanotube_radius(a_const, n // g, m // g))))
+    return [[n + w * step * (n // g), m + w * step * (m // g)] for w in range(walls)]
+
+
+# function returns the atoms of a multi-walled tube along x, centred on y = z = 0, chiralities = (n, m) of each wall
+# each wall is a whole number of its unit cells, stretched (or compressed) along the axis to the length if needed
+# returns the (N, 3) positions, the wall of each atom, and the radius and axial strain of each wall
+def multiwall_tube(a_const, chiralities, length):
+    positions = []
+    wall = []
+    radius = []
+    strain = []
+    for w, (n, m) in enumerate(chiralities):
+        unit_length = chiral_length(a_const, n, m)
+        repeats = max(1, int(round(length / unit_length)))
+        around, along, circumference = nanotube_sheet(a_const, n, m, repeats)
+        scale = length / (unit_length * repeats)
+        radius.append(0.5 * circumference / math.pi)
+        strain.append(scale - 1.0)
+        positions.append(roll_sheet(around, along * scale, radius[-1]))
+        wall.append(np.full(len(around), w))
+    return np.concatenate(positions), np.concatenate(wall), radius, strain
+
+
+# function returns the (tubes, 2) centres (y, z) of a hexagonal bundle of tubes, spacing apart, centred on 0
+# the sites of a triangular lattice closest to the central tube are used, a full hexagon for 1, 7, 19, 37 ... tubes
+def hexagonal_bundle(tubes, spacing):
+    k = int(math.ceil(math.sqrt(tubes))) + 1
+    i, j = np.meshgrid(np.arange(-k, k + 1), np.arange(-k, k + 1), indexing='ij')
+    i = i.ravel()
+    j = j.ravel()
+    # squared distance from the centre in units of spacing (exact integers), then the angle around the centre
+    distance = i * i + i * j + j * j
+    angle = np.mod(np.arctan2(math.sqrt(3) * j, 2 * i + j), 2.0 * math.pi)
+    order = np.lexsort((angle, distance))[:tubes]
+    return np.column_stack([(i[order] + 0.5 * j[order]) * spacing, 0.5 * math.sqrt(3) * j[order] * spacing])
+
+
+# function returns the (ny * nz, 2) centres (y, z) of a periodic triangular lattice of tubes, spacing apart, and
+# the box [box_y, box_z], cells = [ny, nz] tubes along y and rows of tubes along z (nz must be even)
+def periodic_bundle(cells, spacing):
+    if cells[1] % 2 != 0 or min(cells) < 1:
+        print(">>> ERROR  <<< A periodic bundle needs an even number (> 0) of rows of tubes along z, got " +
+              str(cells))
+        sys.exit()
+    row, col = np.meshgrid(np.arange(cells[1]), np.arange(cells[0]), indexing='ij')
+    row = row.ravel()
+    col = col.ravel()
+    row_spacing = 0.5 * math.sqrt(3) * spacing
+    centres = np.column_stack([(col + 0.5 * (row % 2) + 0.25) * spacing, (row + 0.5) * row_spacing])
+    return centres, [cells[0] * spacing, cells[1] * row_spacing]
@@ -12,6 +12,13 @@
 # filename = lammps.lattice.dat  , the default output filename
 # use_min_sep = True             , Ensure atoms are no closer than min_sep
 # min_sep = 1.0                  , Minimum separation distance between atoms in random lattice (if used).
+# pair_min_sep = None            , Minimum separation of pairs of species, other pairs use min_sep
+#                                  e.g. {'Si-O': 1.4, 'B-O': 1.2, 'Na-O': 2.0, 'O-O': 2.2}
+# seed = None                    , random seed, if not given a new seed is generated
+# on_stall = 'fail'              , if the packing stalls (density too high) exit with a report, or
+# on_stall = 'relax'             , reduce min_sep a little at a time until the atoms fit
+# progress = None                , csv file for the packing progress (atoms placed, acceptance rate, ...)
+# shuffle_species = False        , place the atoms in a random order of species, rather than all Si atoms first
 # si_charge = 4                  , charge on Si atoms
 # o_charge = -2                  , charge on O atoms
 # b_charge = 3                   , charge on B atoms
@@ -23,7 +30,9 @@
 import sys
 import os
 import math
-import random
+import numpy as np
+from lammps_data_file import open_data_file, write_atoms
+from lammps_random_packing import random_packing, pair_min_sep_matrix
 
 
 # function generates a random lattice of SiO2 formula units, and saves the file to disk
@@ -42,7 +51,11 @@ def lammps_gen_random_SiO2_B2O3_Na2O_charge(**kwargs):
     filename = kwargs.get('filename', 'lammps.lattice.dat')
     use_min_sep = kwargs.get('use_min_sep', True)
     min_sep = kwargs.get('min_sep', 1.2)
-    min_sep2 = min_sep*min_sep
+    pair_min_sep = kwargs.get('pair_min_sep', None)  # minimum separation of each pair of species
+    seed = kwargs.get('seed', None)  # random seed
+    on_stall = kwargs.get('on_stall', 'fail')  # if the packing stalls, 'fail' or 'relax' min_sep
+    progress = kwargs.get('progress', None)  # csv file of the packing progress
+    shuffle_species = kwargs.get('shuffle_species', False)  # place the species in a random order
 
     # System Mass
     amu = 1.660538921E-27  # in kg
@@ -98,7 +111,8 @@ def lammps_gen_random_SiO2_B2O3_Na2O_charge(**kwargs):
         print("   ")
         if use_min_sep:
             print("  Checking atoms are not placed within:  " + str(min_sep) + " Ang")
-            print("  This is slow for large systems. ")
+            for pair, sep in (pair_min_sep or {}).items():
+                print("    " + str(pair) + " pairs within:  " + str(sep) + " Ang")
             print("   ")
 
     # Check if the file already exists
@@ -117,8 +131,29 @@ def lammps_gen_random_SiO2_B2O3_Na2O_charge(**kwargs):
                 print("File not overwritten, exiting function")
                 return
 
+    # Generate the atom positions (Si atoms, B atoms, O atoms, then Na atoms), no closer than the minimum separation
+    # of each pair of species if required
+    # (or in a random order of species if shuffle_species, the atoms are still written grouped by species)
+    species = ['Si', 'B', 'O', 'Na']
+    species_counts = [nsi, nb, no, nna]
+    rng = np.random.default_rng(seed)
+    types = np.repeat(np.arange(len(species)), species_counts)
+    if shuffle_species:
+        types = rng.permutation(types)
+    packing_stats = {}
+    positions = random_packing(total_atoms, [cube_size_ang] * 3, pair_min_sep_matrix(species, min_sep, pair_min_sep),
+                               rng, use_min_sep, verbose=verbose,
+                               on_stall=on_stall, progress=progress, stats=packing_stats,
+                               types=types)
+    positions = positions[np.argsort(types, kind='stable')]
+
+    # note of the scaled min_sep for the header, if the packing had to reduce it
+    min_sep_note = ""
+    if packing_stats.get('min_sep_scale', 1.0) != 1.0:
+        min_sep_note = ", min_sep scaled by " + str(round(packing_stats['min_sep_scale'], 4))
+
     # Generate file
-    file = open(filename, 'w+')
+    file = open_data_file(filename, 'w')
     if verbose:
         print("  Opened file: " + str(file.name))
 
@@ -129,7 +164,7 @@ def lammps_gen_random_SiO2_B2O3_Na2O_charge(**kwargs):
                str(nb) + " B atoms (charge = " + str(b_charge) + ") and " +
                str(nna) + " Na atoms (charge = " + str(na_charge) + ") and " +
                str(no) + " O atoms (charge = " + str(o_charge) +
-               "), at a density of " + str(density) + " kg/m^3\n")
+               "), at a density of " + str(density) + " kg/m^3" + min_sep_note + "\n")
     file.write(str(total_atoms) + " atoms\n\n")
     file.write("4 atom types # O Si B Na\n\n")
     file.write("0.0 " + str(cube_size_ang) + " xlo xhi\n")
@@ -142,113 +177,10 @@ def lammps_gen_random_SiO2_B2O3_Na2O_charge(**kwargs):
     file.write("4 " + str(na_mass) + "\n\n")
     file.write("Atoms # charge\n\n")
 
-    # Create atom arrays
-    atom_pos_x = [-1.0 for _ in range(total_atoms+1)]
-    atom_pos_y = [-1.0 for _ in range(total_atoms+1)]
-    atom_pos_z = [-1.0 for _ in range(total_atoms+1)]
-
-    # Generate first position
-    atom_pos_x[0] = random.uniform(0, cube_size_ang)
-    atom_pos_y[0] = random.uniform(0, cube_size_ang)
-    atom_pos_z[0] = random.uniform(0, cube_size_ang)
-
-    # Generate positions
-    for i in range(1, total_atoms + 1):
-        if verbose:
-            if (100 * float(i)) % total_atoms == 0:
-                print(".", end='')
-                sys.stdout.flush()
-            if (10 * float(i)) % total_atoms == 0:
-                print(str(100 * float(i) / total_atoms) + " %")
-
-        # Generate position
-        while True:
-            # generate atom i
-            atom_pos_x[i] = random.uniform(0, cube_size_ang)
-            atom_pos_y[i] = random.uniform(0, cube_size_ang)
-            atom_pos_z[i] = random.uniform(0, cube_size_ang)
-
-            # check it is no closer than min_sep if required
-            if use_min_sep:
-                sep_test = 1
-                # loop over all atoms generated so far
-                for j in range(0, i):
-                    # x coord
-                    # print i, j
-                    dx = atom_pos_x[i] - atom_pos_x[j]
-                    dx2 = abs(dx + cube_size_ang)
-                    dx3 = abs(dx - cube_size_ang)
-                    dx1 = abs(dx)
-                    # min x-sep
-                    dxm = min(dx1, dx2)
-                    dxm = min(dxm, dx3)
-
-                    # if within x dist, check other coords
-                    if dxm < min_sep:
-                        dy = atom_pos_y[i] - atom_pos_y[j]
-                        dy2 = abs(dy + cube_size_ang)
-                        dy3 = abs(dy - cube_size_ang)
-                        dy1 = abs(dy)
-                        # min y-sep
-                        dym = min(dy1, dy2)
-                        dym = min(dym, dy3)
-                        # if within y dist, check other coords
-                        if dym < min_sep:
-                            dz = atom_pos_z[i] - atom_pos_z[j]
-                            dz2 = abs(dz + cube_size_ang)
-                            dz3 = abs(dz - cube_size_ang)
-                            dz1 = abs(dz)
-                            # min z-sep
-                            dzm = min(dz1, dz2)
-                            dzm = min(dzm, dz3)
-
-                            # if within z dist, do the full calculation
-                            if dzm < min_sep:
-                                # full calc
-                                dr2 = dxm * dxm + dym * dym + dzm * dzm
-                                if dr2 < min_sep2:
-                                    # print("too close")
-                                    sep_test = 0
-            else:  # if we are not checking for min sep, we just break
-                break
-
-            # break if passed min separation test
-            if sep_test:
-                break
-
     # now we have an array of coords, we can write the rest of the file
-    # Si atoms
-    for i in range(1, nsi + 1):
-        # Output to file
-        file.write(str(i) + "  2  " +
-                   str(si_charge) + "  " +
-                   str(atom_pos_x[i]) + "  " +
-                   str(atom_pos_y[i]) + "  " +
-                   str(atom_pos_z[i]) + "\n")
-    # B atoms
-    for i in range(1 + nsi, 1 + nsi + nb):
-        # Output to file
-        file.write(str(i) + "  3  " +
-                   str(b_charge) + "  " +
-                   str(atom_pos_x[i]) + "  " +
-                   str(atom_pos_y[i]) + "  " +
-                   str(atom_pos_z[i]) + "\n")
-    # O atoms
-    for i in range(1 + nsi + nb, 1 + nsi + nb + no):
-        # Output to file
-        file.write(str(i) + "  1  " +
-                   str(o_charge) + "  " +
-                   str(atom_pos_x[i]) + "  " +
-                   str(atom_pos_y[i]) + "  " +
-                   str(atom_pos_z[i]) + "\n")
-    # Na atoms
-    for i in range(1 + nsi + nb + no, total_atoms + 1):
-        # Output to file
-        file.write(str(i) + "  4  " +
-                   str(na_charge) + "  " +
-                   str(atom_pos_x[i]) + "  " +
-                   str(atom_pos_y[i]) + "  " +
-                   str(atom_pos_z[i]) + "\n")
+    write_atoms(file, 'charge', np.arange(1, total_atoms + 1), np.repeat([2, 3, 1, 4], species_counts), positions,
+                q=np.repeat([si_charge, b_charge, o_charge, na_charge], species_counts), sep="  ")
+    file.close()
 
 
 # If we are running this script interactively, call the function safely
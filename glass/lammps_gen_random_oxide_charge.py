@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+# This function generates a random lattice of the atoms of any mix of oxide formula units (e.g. SiO2, B2O3, Na2O
+# and Al2O3), given as a composition.  The number of atoms and the mass of each element are worked out from the
+# formulas and the shared table of elements (lammps_elements.py), so a new composition needs no new script.
+# Output file is in lammps charge format, with O as atom type 1 and the other elements in the order given.
+
+# Keyword arguments:
+# verbose = True                 , prints some comments to the screen.
+# forced  = True                 , will overwrite the existing file (if it exists).
+# forced  = False                , if file exists, will ask the user if the existing file should be overwritten.
+# composition = {'SiO2': 700, 'B2O3': 300, 'Na2O': 100}
+#                                , the number of each formula unit in the lattice
+# charges = None                 , charge on the atoms of each element, e.g. {'Si': 1.89, 'O': -0.945}, elements
+#                                  not given have charge_scale times their formal charge (O is -2)
+# charge_scale = 0.4725          , scale of the formal charges (partial charges of the glass potentials)
+# filename = lammps.lattice.dat  , the default output filename
+# use_min_sep = True             , Ensure atoms are no closer than min_sep
+# min_sep = 1.2                  , Minimum separation distance between atoms in random lattice (if used).
+# pair_min_sep = None            , Minimum separation of pairs of species, other pairs use min_sep
+#                                  e.g. {'Si-O': 1.4, 'B-O': 1.2, 'Na-O': 2.0, 'Al-O': 1.5, 'O-O': 2.2}
+# seed = None                    , random seed, if not given a new seed is generated
+# on_stall = 'fail'              , if the packing stalls (density too high) exit with a report, or
+# on_stall = 'relax'             , reduce min_sep a little at a time until the atoms fit
+# progress = None                , csv file for the packing progress (atoms placed, acceptance rate, ...)
+# shuffle_species = False        , place the atoms in a random order of species, rather than one species at a time
+# density = 2000.0               , density in kg/m3
+
+# imported modules
+import sys
+import os
+import math
+import numpy as np
+from lammps_data_file import open_data_file, write_atoms
+from lammps_random_packing import random_packing, pair_min_sep_matrix
+from lammps_elements import atom_masses, parse_formula
+
+
+# function returns the formal charge of each element of the composition, from the oxide formulas (O is -2)
+def formal_charges(composition):
+    charges = {'O': -2.0}
+    for formula in composition:
+        elements = parse_formula(formula)
+        cations = [(element, number) for element, number in elements if element != 'O']
+        n_oxygen = sum(number for element, number in elements if element == 'O')
+        if len(cations) != 1:
+            continue
+        element, number = cations[0]
+        charge = 2.0 * n_oxygen / number
+        if charges.get(element, charge) != charge:
+            # different oxidation states in different formula units, e.g. FeO and Fe2O3
+            charges[element] = None
+        else:
+            charges[element] = charge
+    return charges
+
+
+# function generates a random lattice of oxide formula units, and saves the file to disk
+def lammps_gen_random_oxide_charge(**kwargs):
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)
+    forced = kwargs.get('forced', True)
+    composition = kwargs.get('composition', {'SiO2': 700, 'B2O3': 300, 'Na2O': 100})
+    charges = kwargs.get('charges', None)  # charge of each element
+    charge_scale = kwargs.get('charge_scale', 0.4725)  # scale of the formal charges
+    density = kwargs.get('density', 2000.0)
+    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    use_min_sep = kwargs.get('use_min_sep', True)
+    min_sep = kwargs.get('min_sep', 1.2)
+    pair_min_sep = kwargs.get('pair_min_sep', None)  # minimum separation of each pair of species
+    seed = kwargs.get('seed', None)  # random seed
+    on_stall = kwargs.get('on_stall', 'fail')  # if the packing stalls, 'fail' or 'relax' min_sep
+    progress = kwargs.get('progress', None)  # csv file of the packing progress
+    shuffle_species = kwargs.get('shuffle_species', False)  # place the species in a random order
+
+    # Number of atoms of each element, O first then the other elements in the order they appear
+    atom_counts = {'O': 0}
+    for formula, units in composition.items():
+        for element, number in parse_formula(formula):
+            atom_counts[element] = atom_counts.get(element, 0) + number * int(units)
+    if atom_counts['O'] == 0:
+        del atom_counts['O']
+    species = list(atom_counts)
+    species_counts = [atom_counts[element] for element in species]
+    total_atoms = sum(species_counts)
+    if total_atoms == 0:
+        print(">>> ERROR  <<< The composition has no atoms: " + str(composition))
+        sys.exit()
+
+    # Charge of each element, given or scaled formal charges
+    formal = formal_charges(composition)
+    species_charges = []
+    for element in species:
+        if charges is not None and element in charges:
+            species_charges.append(float(charges[element]))
+        elif formal.get(element) is not None:
+            species_charges.append(charge_scale * formal[element])
+        else:
+            print(">>> ERROR  <<< The formal charge of " + str(element) + " is not known from the composition, " +
+                  "give its charge with charges={'" + str(element) + "': ...}")
+            sys.exit()
+    total_charge = float(np.dot(species_counts, species_charges))
+
+    # System Mass
+    amu = 1.660538921E-27  # in kg
+    species_masses = [atom_masses[element] for element in species]
+    total_mass = float(np.dot(species_counts, species_masses)) * amu
+
+    # System volume
+    volume_m3 = total_mass / density
+
+    # cube side length
+    cube_size_m = math.pow(volume_m3, (1.0 / 3.0))
+    cube_size_ang = cube_size_m * 1e10
+
+    # Welcome
+    if verbose:
+        print("  +------------------------------------------+")
+        print("  |         Lattice generator script         |")
+        print("  |           Random oxide lattice           |")
+        print("  |     (composition of oxide formulas)      |")
+        print("  +------------------------------------------+")
+        print("   ")
+        print("  Generating a random distribution of oxide atoms")
+        for formula, units in composition.items():
+            print("  " + str(formula).ljust(6) + " formula units : " + str(units))
+        for element, count, charge in zip(species, species_counts, species_charges):
+            print("  " + str(element).ljust(2) + " atoms  : " + str(count) + " (charge = " + str(charge) + ")")
+        print("  Total atoms        : " + str(total_atoms))
+        print("  Total charge       : " + str(total_charge))
+        print("  Total mass  : " + str(total_mass) + " kg")
+        print("  Density     : " + str(density) + " kg/m^3")
+        print("  Total Vol   : " + str(volume_m3) + " m^3")
+        print("  Cube size   : " + str(cube_size_m) + " m")
+        print("  Cube size   : " + str(cube_size_ang) + " Angstrom")
+        print("  Writing file:  " + str(filename))
+        print("   ")
+        if use_min_sep:
+            print("  Checking atoms are not placed within:  " + str(min_sep) + " Ang")
+            for pair, sep in (pair_min_sep or {}).items():
+                print("    " + str(pair) + " pairs within:  " + str(sep) + " Ang")
+            print("   ")
+    if abs(total_charge) > 1e-6:
+        print(">>> WARNING: the lattice is not charge neutral, total charge = " + str(total_charge))
+
+    # Check if the file already exists
+    if not forced:
+        if os.path.isfile(filename):
+            print("> Existing file " + str(filename) + " detected.")
+            print("> lammps_gen_random_oxide_charge function wants to overwrite this file")
+
+            # Ask user if file should be overwritten
+            user_choice = input('Do you wish to overwrite the existing file? (y/n): ')
+            user_choice = user_choice.lower()
+
+            if (user_choice == 'yes') or (user_choice == 'y') or (user_choice == 'yea'):
+                print(" > Overwriting existing file ... ")
+            else:
+                print("File not overwritten, exiting function")
+                return
+
+    # Generate the atom positions (one species at a time, in the order of the atom types), no closer than the
+    # minimum separation of each pair of species if required
+    # (or in a random order of species if shuffle_species, the atoms are still written grouped by species)
+    rng = np.random.default_rng(seed)
+    types = np.repeat(np.arange(len(species)), species_counts)
+    if shuffle_species:
+        types = rng.permutation(types)
+    packing_stats = {}
+    positions = random_packing(total_atoms, [cube_size_ang] * 3, pair_min_sep_matrix(species, min_sep, pair_min_sep),
+                               rng, use_min_sep, verbose=verbose,
+                               on_stall=on_stall, progress=progress, stats=packing_stats,
+                               types=types)
+    positions = positions[np.argsort(types, kind='stable')]
+
+    # note of the scaled min_sep for the header, if the packing had to reduce it
+    min_sep_note = ""
+    if packing_stats.get('min_sep_scale', 1.0) != 1.0:
+        min_sep_note = ", min_sep scaled by " + str(round(packing_stats['min_sep_scale'], 4))
+
+    # Generate file
+    file = open_data_file(filename, 'w')
+    if verbose:
+        print("  Opened file: " + str(file.name))
+
+    # Write header info
+    file.write("Lammps data file generated by lammps_gen_random_oxide_charge\n")
+    file.write("#  Random lattice of " +
+               ", ".join(str(units) + " " + str(formula) for formula, units in composition.items()) +
+               " formula units with " +
+               " and ".join(str(count) + " " + str(element) + " atoms (charge = " + str(charge) + ")"
+                            for element, count, charge in zip(species, species_counts, species_charges)) +
+               ", at a density of " + str(density) + " kg/m^3" + min_sep_note + "\n")
+    file.write(str(total_atoms) + " atoms\n\n")
+    file.write(str(len(species)) + " atom types # " + " ".join(species) + "\n\n")
+    file.write("0.0 " + str(cube_size_ang) + " xlo xhi\n")
+    file.write("0.0 " + str(cube_size_ang) + " ylo yhi\n")
+    file.write("0.0 " + str(cube_size_ang) + " zlo zhi\n\n")
+    file.write("Masses\n\n")
+    for i, mass in enumerate(species_masses):
+        file.write(str(i + 1) + " " + str(mass) + "\n")
+    file.write("\n")
+    file.write("Atoms # charge\n\n")
+
+    # now we have an array of coords, we can write the rest of the file
+    write_atoms(file, 'charge', np.arange(1, total_atoms + 1), np.repeat(np.arange(1, len(species) + 1),
+                species_counts), positions, q=np.repeat(species_charges, species_counts), sep="  ")
+    file.close()
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the composition and density from the command-line, e.g.
+    # lammps_gen_random_oxide_charge.py SiO2=700 B2O3=300 Na2O=100 Al2O3=50 2100
+    if len(sys.argv) < 3:
+        print(">>> ERROR  <<<")
+        print("  User must pass the number of each formula unit (formula=number) and the density [kg/m^3]")
+        print("     example:")
+        print("  lammps_gen_random_oxide_charge.py SiO2=700 B2O3=300 Na2O=100 Al2O3=50 2100")
+        sys.exit()
+
+    _composition = {}
+    for arg in sys.argv[1:-1]:
+        try:
+            _formula, _units = arg.split('=')
+            _composition[_formula] = int(_units)
+        except ValueError:
+            print(">>> ERROR  <<< Could not read the formula units " + str(arg) + " (expected formula=number)")
+            sys.exit()
+    _density = float(sys.argv[-1])
+
+    # call the lattice generator function
+    lammps_gen_random_oxide_charge(verbose=True,
+                                   composition=_composition,
+                                   density=_density)  # ,use_min_sep=False)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+
+# This function generates a set of glass starting structures over a grid of compositions and densities,
+# one lammps data file for each point of the grid, in its own directory.
+# The jobs are generated in parallel by a pool of worker processes, and a manifest (csv) of every job is
+# written with the density and atom counts read back from its data file and the time taken.
+
+# The grid is read from a csv or yaml file.  In a csv file each row is a job, and each column is a keyword
+# of the generator (e.g. density, min_sep, seed), except for columns named by an oxide formula (SiO2, B2O3,
+# Al2O3, ...), which give the number of formula units of the composition (the composition of the oxide
+# generator, or num_SiO2, num_B2O3, ... of the other generators), e.g.
+#   name,SiO2,B2O3,Na2O,density
+#   nbs_1,700,300,100,2100
+#   nbs_2,600,300,200,2200
+# A yaml file is either a list of jobs in the same form, or a dict of lists of values, in which case a job is
+# generated for every combination of the values (e.g. {'SiO2': [700, 800], 'B2O3': [300], 'density': [2100, 2200]}).
+# The grid can also be given as a list of dicts.  An empty csv cell uses the generator default.
+# The optional columns name (directory name of the job) and generator choose the output directory and the
+# generator of each job.  A formula or keyword that the generator of a job does not take is an error, so a job
+# never falls back to the generator defaults.
+
+# Job i uses the seed [seed, i], written to the manifest, unless the grid gives its own seed.
+
+# Keyword arguments:
+# verbose = True     , prints some comments to the screen.
+# grid = 'sweep.csv' , csv or yaml file of the jobs (or a list of dicts)
+# generator = 'oxide' , generator used for jobs that do not name one:
+#                      oxide, SiO2, SiO2_B2O3 or SiO2_B2O3_Na2O (the lammps_gen_random_*_charge scripts)
+# output_dir = 'sweep' , the data file of each job is written to output_dir/name/filename
+# filename = lammps.lattice.dat  , the filename of the data file of each job
+# seed = None        , random seed of the sweep, if not given a new seed is generated
+# processes = 1      , number of worker processes
+# manifest = 'manifest.csv' , the manifest file, written to output_dir
+
+# imported modules
+import sys
+import os
+import csv
+import time
+import itertools
+import multiprocessing
+import numpy as np
+from lammps_data_file import read_lammps_data
+from lammps_gen_random_oxide_charge import lammps_gen_random_oxide_charge
+from lammps_gen_random_SiO2_charge import lammps_gen_random_SiO2_charge
+from lammps_gen_random_SiO2_B2O3_charge import lammps_gen_random_SiO2_B2O3_charge
+from lammps_gen_random_SiO2_B2O3_Na2O_charge import lammps_gen_random_SiO2_B2O3_Na2O_charge
+
+
+# generators that can be used in a sweep
+sweep_generators = {'oxide': lammps_gen_random_oxide_charge,
+                    'SiO2': lammps_gen_random_SiO2_charge,
+                    'SiO2_B2O3': lammps_gen_random_SiO2_B2O3_charge,
+                    'SiO2_B2O3_Na2O': lammps_gen_random_SiO2_B2O3_Na2O_charge}
+
+# keywords of each generator that a job can set (filename and forced are set by the sweep)
+common_keywords = ['verbose', 'density', 'use_min_sep', 'min_sep', 'pair_min_sep', 'seed', 'on_stall', 'progress',
+                   'shuffle_species']
+sweep_keywords = {'oxide': common_keywords + ['composition', 'charges', 'charge_scale'],
+                  'SiO2': common_keywords + ['num_SiO2', 'si_charge', 'o_charge'],
+                  'SiO2_B2O3': common_keywords + ['num_SiO2', 'num_B2O3', 'si_charge', 'o_charge', 'b_charge'],
+                  'SiO2_B2O3_Na2O': common_keywords + ['num_SiO2', 'num_B2O3', 'num_Na2O', 'si_charge', 'o_charge',
+                                                       'b_charge', 'na_charge']}
+
+# columns of the manifest
+manifest_columns = ['job', 'name', 'status', 'generator', 'filename', 'seed', 'parameters', 'atoms',
+                    'atom_counts', 'box', 'density', 'time']
+
+
+# function returns the value of a csv cell as an int, float, bool or string
+def grid_value(text):
+    text = text.strip()
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    if text in ['True', 'False']:
+        return text == 'True'
+    return text
+
+
+# function returns True if a column is named by an oxide formula (e.g. SiO2), rather than a keyword
+def is_formula(column):
+    return column[:1].isupper() and 'O' in column and all(c.isalnum() for c in column)
+
+
+# function reads the jobs of a sweep from a csv or yaml file, returns a list of dicts
+def read_sweep_grid(grid):
+    if not isinstance(grid, str):
+        return [dict(job) for job in grid]
+    if not os.path.isfile(grid):
+        print(">>> ERROR  <<< The sweep grid " + str(grid) + " does not exist")
+        sys.exit()
+
+    if grid.endswith('.yaml') or grid.endswith('.yml'):
+        try:
+            import yaml
+        except ImportError:
+            print(">>> ERROR  <<< PyYAML is needed to read " + str(grid) + ", install it or use a csv grid")
+            sys.exit()
+        infile = open(grid, 'r')
+        jobs = yaml.safe_load(infile)
+        infile.close()
+        if isinstance(jobs, dict):
+            # every combination of the lists of values
+            keys = list(jobs)
+            values = [v if isinstance(v, list) else [v] for v in jobs.values()]
+            jobs = [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+        return [dict(job) for job in jobs]
+
+    infile = open(grid, 'r', newline='')
+    jobs = [{key.strip(): grid_value(value) for key, value in row.items() if value is not None and value.strip()}
+            for row in csv.DictReader(infile)]
+    infile.close()
+    return jobs
+
+
+# function returns the generator, keyword arguments and output directory name of a job
+def sweep_job(job, index, generator):
+    job = dict(job)
+    generator = job.pop('generator', generator)
+    if generator not in sweep_generators:
+        print(">>> ERROR  <<< Unknown generator " + str(generator) + " in job " + str(index) +
+              ", expected one of: " + ", ".join(sweep_generators))
+        sys.exit()
+    name = str(job.pop('name', 'job_' + str(index).zfill(4)))
+    kwargs = {}
+    composition = {}
+    unknown = []
+    for key, value in job.items():
+        if generator == 'oxide' and is_formula(key):
+            composition[key] = value
+            continue
+        # the fixed composition generators take the number of formula units as num_<formula>
+        keyword = 'num_' + key if is_formula(key) else key
+        # a formula or keyword the generator does not take would be ignored, and the default used
+        if keyword not in sweep_keywords[generator]:
+            unknown.append(key)
+        kwargs[keyword] = value
+    if composition:
+        kwargs['composition'] = composition
+
+    if unknown:
+        print(">>> ERROR  <<< Job " + str(index) + " (" + name + "): the " + str(generator) + " generator does not " +
+              "take: " + ", ".join(unknown))
+        print("  (it takes: " + ", ".join(sweep_keywords[generator]) + ", and the formula columns of " +
+              ("any oxide" if generator == 'oxide' else
+               ", ".join(key[4:] for key in sweep_keywords[generator] if key[:4] == 'num_')) + ")")
+        sys.exit()
+    return generator, kwargs, name
+
+
+# function returns the number of atoms of each type, the box and the density [kg/m^3] of a data file
+def data_file_summary(filename):
+    lattice = read_lammps_data(filename)
+    amu = 1.660538921E-27  # in kg
+    masses = {int(t): float(m) for t, m, _ in lattice['masses']}
+    types, counts = np.unique(lattice['atoms']['type'], return_counts=True)
+    names = lattice['count_comments'].get('atom types', '').split()
+    labels = [names[t - 1] if t <= len(names) else str(t) for t in types]
+    box = lattice['box'][:, 1] - lattice['box'][:, 0]
+    mass = sum(masses[t] * n for t, n in zip(types, counts)) * amu
+    density = mass / (np.prod(box) * 1e-30)
+    return {'atoms': int(counts.sum()),
+            'atom_counts': " ".join(label + ":" + str(n) for label, n in zip(labels, counts)),
+            'box': " ".join(str(round(b, 6)) for b in box),
+            'density': round(density, 6)}
+
+
+# worker, generates one job of the sweep and returns its row of the manifest
+def _run_sweep_job(args):
+    index, generator, kwargs, name, filename = args
+    row = {'job': index, 'name': name, 'generator': generator, 'filename': filename, 'seed': kwargs['seed'],
+           'parameters': " ".join(str(k) + "=" + str(v) for k, v in kwargs.items() if k != 'seed')}
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    start_time = time.time()
+    try:
+        sweep_generators[generator](forced=True, filename=filename, **kwargs)
+        row.update(data_file_summary(filename))
+        row['status'] = 'done'
+    except SystemExit as error:
+        # the generator stopped (e.g. the packing stalled), the sweep goes on
+        row['status'] = 'failed (exit ' + str(error.code) + ')'
+    row['time'] = round(time.time() - start_time, 3)
+    return row
+
+
+# function generates a data file for every job of a sweep grid, and writes the manifest
+def lammps_sweep_glass_compositions(**kwargs):
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)
+    grid = kwargs.get('grid', 'sweep.csv')
+    generator = kwargs.get('generator', 'oxide')
+    output_dir = kwargs.get('output_dir', 'sweep')
+    filename = kwargs.get('filename', 'lammps.lattice.dat')
+    seed = kwargs.get('seed', None)  # random seed of the sweep
+    processes = kwargs.get('processes', 1)  # worker processes
+    manifest = kwargs.get('manifest', 'manifest.csv')
+
+    # Welcome
+    if verbose:
+        print("  +------------------------------------------+")
+        print("  |   Sweep of random glass lattices over a  |")
+        print("  |     grid of compositions and densities   |")
+        print("  +------------------------------------------+")
+        print("   ")
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    jobs = []
+    names = []
+    for index, job in enumerate(read_sweep_grid(grid)):
+        job_generator, job_kwargs, name = sweep_job(job, index, generator)
+        if name in names:
+            print(">>> ERROR  <<< Two jobs have the same name: " + str(name))
+            sys.exit()
+        names.append(name)
+        job_kwargs.setdefault('seed', [seed, index])
+        jobs.append((index, job_generator, job_kwargs, name, os.path.join(output_dir, name, filename)))
+
+    if verbose:
+        print(">  Sweep grid: " + str(grid))
+        print(">  Number of jobs: " + str(len(jobs)))
+        print(">  Output directory: " + str(output_dir))
+        print(">  Random seed of the sweep: " + str(seed))
+        print(">  Worker processes: " + str(processes))
+
+    os.makedirs(output_dir, exist_ok=True)
+    if processes == 1 or len(jobs) <= 1:
+        rows = [_run_sweep_job(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(processes=processes)
+        try:
+            rows = pool.map(_run_sweep_job, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    # Write the manifest
+    manifest = os.path.join(output_dir, manifest)
+    file = open(manifest, 'w', newline='')
+    writer = csv.DictWriter(file, fieldnames=manifest_columns)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+    file.close()
+
+    if verbose:
+        for row in rows:
+            print("  " + str(row['name']) + ": " + str(row['status']) + ", " + str(row.get('atoms', 0)) +
+                  " atoms, density " + str(row.get('density', '')) + " kg/m^3, " + str(row['time']) + " s")
+        print("Manifest written to: " + str(manifest))
+        print("COMPLETED sweep !!")
+    return rows
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Read the grid, and optionally the number of worker processes, from the command-line, e.g.
+    # lammps_sweep_glass_compositions.py sweep.csv 8
+    if len(sys.argv) < 2:
+        print("Usage: lammps_sweep_glass_compositions.py grid.csv|grid.yaml [processes]")
+        sys.exit()
+
+    my_processes = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    # call the sweep function
+    lammps_sweep_glass_compositions(verbose=True,
+                                    grid=sys.argv[1],
+                                    processes=my_processes)
@@ -16,6 +16,8 @@
 import sys
 import os
 import math
+import numpy as np
+from lammps_data_file import open_data_file, write_atoms
 
 
 def lammps_gen_bnc_tersoff(**kwargs):
@@ -79,7 +81,7 @@ def lammps_gen_bnc_tersoff(**kwargs):
 
     # create lattice file
     if gen_file:
-        file = open(filename, 'w+')
+        file = open_data_file(filename, 'w')
         if verbose:
             print("Opened file: " + str(file.name))
 
@@ -97,31 +99,18 @@ def lammps_gen_bnc_tersoff(**kwargs):
         file.write("2 14.0067\n\n")
         file.write("Atoms # atomic\n\n")
 
-        # ID mol x y z
-        count = 1
-        for x in range(0, cells[0]):
-            x_shift = x * math.sqrt(3) * a_const
-            for y in range(0, cells[1]):
-                y_shift = y * a_const
-                z_shift = z_height / 2.0
-
-                file.write(str(count) + "  1  " +
-                           str(x_shift) + "  " +
-                           str(y_shift) + "  " +
-                           str(z_shift) + "\n")
-                file.write(str(count + 1) + "  2  " +
-                           str(x_shift + a_const * 2.0 / math.sqrt(3)) + "  " +
-                           str(y_shift) + "  " +
-                           str(z_shift) + "\n")
-                file.write(str(count + 2) + "  2  " +
-                           str(x_shift + a_const * math.sqrt(3) / 6.0) + "  " +
-                           str(y_shift + a_const / 2.0) + "  " +
-                           str(z_shift) + "\n")
-                file.write(str(count + 3) + "  1  " +
-                           str(x_shift + a_const * math.sqrt(3) / 2.0) + "  " +
-                           str(y_shift + a_const / 2.0) + "  " +
-                           str(z_shift) + "\n")
-                count = count + 4
+        # ID type x y z, the unit cell basis atoms are B N N B
+        basis = np.array([[0.0, 0.0],
+                          [a_const * 2.0 / math.sqrt(3), 0.0],
+                          [a_const * math.sqrt(3) / 6.0, a_const / 2.0],
+                          [a_const * math.sqrt(3) / 2.0, a_const / 2.0]])
+        ix, iy, b = np.meshgrid(np.arange(cells[0]), np.arange(cells[1]), np.arange(4), indexing='ij')
+        positions = np.empty((tot_atoms, 3))
+        positions[:, 0] = ix.ravel() * math.sqrt(3) * a_const + basis[b.ravel(), 0]
+        positions[:, 1] = iy.ravel() * a_const + basis[b.ravel(), 1]
+        positions[:, 2] = z_height / 2.0
+        types = np.tile([1, 2, 2, 1], cells[0] * cells[1])
+        write_atoms(file, 'atomic', np.arange(1, tot_atoms + 1), types, positions, sep="  ")
 
         file.close()
 
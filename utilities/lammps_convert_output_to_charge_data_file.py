@@ -17,6 +17,8 @@
 import sys
 import os
 import gzip
+import numpy as np
+from lammps_data_file import write_columns
 
 
 # Self contained function converts a given lammps dump file to a lammps data file (atomic format).
@@ -562,18 +564,12 @@ def lammps_convert_output_to_charge_data_file(filename, **kwargs):
     outputfile.write("\n")
     outputfile.write("Atoms # charge\n")
     outputfile.write("\n")
-    for i in range(1, atoms + 1):
-        outputfile.write(str(i) + "   ")
-
-        outputfile.write(str(atom_type[i]) + "    ")
-
-        outputfile.write(str(atom_q[i]) + "    ")
-
-        outputfile.write(str(atom_x_pos[i]) + "    ")
-        outputfile.write(str(atom_y_pos[i]) + "    ")
-        outputfile.write(str(atom_z_pos[i]) + "    ")
-
-        outputfile.write("\n")
+    write_columns(outputfile, [np.arange(1, atoms + 1),
+                                np.asarray(atom_type[1:], dtype=int),
+                                np.asarray(atom_q[1:], dtype=float),
+                                np.asarray(atom_x_pos[1:], dtype=float),
+                                np.asarray(atom_y_pos[1:], dtype=float),
+                                np.asarray(atom_z_pos[1:], dtype=float)], sep="    ")
 
     # All done, close output file
     outputfile.close()
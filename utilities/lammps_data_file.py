@@ -0,0 +1,487 @@
+#!/usr/bin/env python
+
+# Functions for reading and writing lammps data files.
+
+# read_lammps_data(filename) parses the header (title, comments, atom/type counts, box and tilt
+# factors), the Masses section and the Atoms section.  The Atoms section is read in a single pass
+# into a numpy structured array with the correct column types for the atom style given in the
+# 'Atoms # style' line, e.g. atomic  = id type x y z  (id and type are integers, x y z are floats).
+# Any trailing image flags are read into ix iy iz columns.
+# If there is no style comment (or atom_style keyword), the style is guessed from the number of columns,
+# a 6 (or 9) column section is molecular if the third column is a whole number >= 1 in every row, else charge.
+# All other sections (Velocities, Bonds, Pair Coeffs, ...) are kept as lists of raw lines.
+# Compressed (.gz) files can be read and written.
+
+# The data is held in a dict:
+#   lattice['title']          first line of the file
+#   lattice['comments']       list of comment lines in the header
+#   lattice['counts']         dict of header counts, e.g. {'atoms': 240, 'atom types': 1}
+#   lattice['count_comments'] dict of trailing comments on the count lines, e.g. {'atom types': 'C'}
+#   lattice['box']            (3, 2) array of [lo, hi] for x, y, z
+#   lattice['tilt']           [xy, xz, yz] array, or None for an orthogonal box
+#   lattice['masses']         list of [type, mass, comment]
+#   lattice['atom_style']     atom style of the Atoms section
+#   lattice['atoms']          structured array of the Atoms section
+#   lattice['sections']       dict of any other sections, each a list of raw lines
+
+# write_atoms() writes the Atoms section rows from arrays (id, type, [mol], [q], positions), and is
+# used by the lattice generators.
+
+# write_lammps_data(filename, lattice) writes the dict back to disk.  The Atoms section is
+# formatted in large blocks of rows at a time, integers are written as integers and floats with
+# the shortest representation that round trips.
+
+# imported modules
+import sys
+import gzip
+import numpy as np
+
+
+# Column names of the Atoms section for each supported atom style
+atom_style_columns = {
+    'atomic': ['id', 'type', 'x', 'y', 'z'],
+    'charge': ['id', 'type', 'q', 'x', 'y', 'z'],
+    'molecular': ['id', 'mol', 'type', 'x', 'y', 'z'],
+    'bond': ['id', 'mol', 'type', 'x', 'y', 'z'],
+    'angle': ['id', 'mol', 'type', 'x', 'y', 'z'],
+    'full': ['id', 'mol', 'type', 'q', 'x', 'y', 'z'],
+}
+
+# Integer columns, all other columns are floats
+integer_columns = ['id', 'mol', 'type', 'ix', 'iy', 'iz']
+
+# Header count keywords, in the order they are written
+header_counts = ['atoms', 'ellipsoids', 'lines', 'triangles', 'bodies', 'bonds', 'angles', 'dihedrals', 'impropers',
+                 'atom types', 'bond types', 'angle types', 'dihedral types', 'improper types',
+                 'extra bond per atom', 'extra angle per atom', 'extra dihedral per atom',
+                 'extra improper per atom', 'extra special per atom']
+
+# Sections of the data file, and the header count giving the number of lines in each
+section_counts = {
+    'Atoms': 'atoms',
+    'Velocities': 'atoms',
+    'Ellipsoids': 'ellipsoids',
+    'Lines': 'lines',
+    'Triangles': 'triangles',
+    'Bodies': 'bodies',
+    'Masses': 'atom types',
+    'Bonds': 'bonds',
+    'Angles': 'angles',
+    'Dihedrals': 'dihedrals',
+    'Impropers': 'impropers',
+    'Pair Coeffs': 'atom types',
+    'Bond Coeffs': 'bond types',
+    'Angle Coeffs': 'angle types',
+    'Dihedral Coeffs': 'dihedral types',
+    'Improper Coeffs': 'improper types',
+    'BondBond Coeffs': 'angle types',
+    'BondAngle Coeffs': 'angle types',
+    'MiddleBondTorsion Coeffs': 'dihedral types',
+    'EndBondTorsion Coeffs': 'dihedral types',
+    'AngleTorsion Coeffs': 'dihedral types',
+    'AngleAngleTorsion Coeffs': 'dihedral types',
+    'BondBond13 Coeffs': 'dihedral types',
+    'AngleAngle Coeffs': 'improper types',
+}
+
+# Number of rows formatted in one go when writing
+write_block_rows = 100000
+
+
+# Compression level of written .gz files (the gzip default, level 9 is several times slower for little gain)
+gzip_compress_level = 6
+
+
+# function opens a data file for reading or writing, compressed if the filename ends in .gz
+def open_data_file(filename, mode='r'):
+    if str(filename)[-3:] == '.gz':
+        return gzip.open(filename, mode + 't', compresslevel=gzip_compress_level)
+    return open(filename, mode)
+
+
+# function returns the numpy dtype of the Atoms section for the given columns
+def atoms_dtype(columns):
+    return np.dtype([(c, np.int64) if c in integer_columns else (c, np.float64) for c in columns])
+
+
+# function returns the Atoms section columns for a given atom style and number of columns
+# If the style is not known, it is guessed from the number of columns
+# (6 or 9 columns, id type q x y z  or  id mol type x y z, are read as charge, see guess_charge_or_molecular)
+def atom_style_for_columns(atom_style, ncols):
+    if atom_style is None:
+        if ncols in (5, 8):
+            atom_style = 'atomic'
+        elif ncols in (7, 10):
+            atom_style = 'full'
+        else:
+            atom_style = 'charge'
+
+    if atom_style not in atom_style_columns:
+        print(">>> ERROR  <<< Atom style not supported: " + str(atom_style))
+        sys.exit()
+
+    columns = list(atom_style_columns[atom_style])
+    if ncols == len(columns) + 3:
+        columns = columns + ['ix', 'iy', 'iz']
+    elif ncols != len(columns):
+        print(">>> ERROR  <<< Atoms section has " + str(ncols) + " columns, expected " +
+              str(len(columns)) + " for atom style " + str(atom_style))
+        sys.exit()
+    return atom_style, columns
+
+
+# function decides if atoms read as charge (id type q x y z) are molecular (id mol type x y z)
+# The atoms are molecular if the third column is a whole number >= 1 (a valid atom type) in every row,
+# so a charge file with q = 0 (or any fractional charge) stays charge.  Returns the atom style and atoms.
+def guess_charge_or_molecular(atoms):
+    third = atoms['q']
+    if len(atoms) == 0 or not np.all((third >= 1) & (third == np.floor(third))):
+        return 'charge', atoms
+    columns = ['id', 'mol', 'type'] + list(atoms.dtype.names[3:])
+    molecular = np.empty(len(atoms), dtype=atoms_dtype(columns))
+    for old, new in zip(atoms.dtype.names, columns):
+        molecular[new] = atoms[old]
+    return 'molecular', molecular
+
+
+# function returns the first non blank line of an open file, split into words (comments removed)
+def first_data_line(infile):
+    while True:
+        fileline = infile.readline()
+        if not fileline:
+            print(">>> ERROR  <<< End of file reached before the section data")
+            sys.exit()
+        words = fileline.split('#')[0].split()
+        if len(words) > 0:
+            return words
+
+
+# function reads a section of n lines from an open file in chunks of (at most) chunk_rows lines
+# Each chunk is a structured array, the first int_cols columns are integers and the rest floats
+# (all integer if int_cols is None).  Columns are named c0, c1, ... unless names are given.
+def iter_section_chunks(infile, n, chunk_rows=None, int_cols=None, names=None, first_line=None):
+    if n == 0:
+        return
+    if first_line is None:
+        first_line = first_data_line(infile)
+    if names is None:
+        names = ['c' + str(i) for i in range(len(first_line))]
+        if int_cols is None:
+            int_cols = len(first_line)
+        dtype = np.dtype([(c, np.int64) if i < int_cols else (c, np.float64) for i, c in enumerate(names)])
+    else:
+        dtype = atoms_dtype(names)
+    if chunk_rows is None:
+        chunk_rows = n
+
+    # The first line has already been read, parse it into the first chunk
+    rows = min(n, chunk_rows)
+    chunk = np.empty(rows, dtype=dtype)
+    chunk[0] = tuple(int(v) if np.issubdtype(dtype[i], np.integer) else float(v) for i, v in enumerate(first_line))
+    if rows > 1:
+        chunk[1:] = np.loadtxt(infile, dtype=dtype, comments='#', max_rows=rows - 1, ndmin=1)
+    yield chunk
+    done = rows
+
+    while done < n:
+        rows = min(n - done, chunk_rows)
+        yield np.loadtxt(infile, dtype=dtype, comments='#', max_rows=rows, ndmin=1)
+        done += rows
+
+
+# function reads the Atoms section (n lines) from an open file in chunks of (at most) chunk_rows atoms
+# returns the atom style and a generator of structured arrays
+# If the style is not known and the section has 6 (or 9) columns, every row is needed to tell charge from
+# molecular, so the section must fit in a single chunk (or the atom style must be given).
+def iter_atoms_section(infile, n, atom_style=None, chunk_rows=None):
+    first_line = first_data_line(infile)
+    guess = atom_style is None and len(first_line) in (6, 9)
+    atom_style, columns = atom_style_for_columns(atom_style, len(first_line))
+    if not guess:
+        return atom_style, iter_section_chunks(infile, n, chunk_rows=chunk_rows, names=columns,
+                                               first_line=first_line)
+
+    if chunk_rows is not None and chunk_rows < n:
+        print(">>> ERROR  <<< The atom style of the " + str(len(first_line)) + " column Atoms section "
+              "(charge or molecular) is not given, and the section is too large to guess it in one chunk")
+        print("  (add the style to the Atoms line, e.g. 'Atoms # charge', or give the atom_style)")
+        sys.exit()
+    atom_style, atoms = guess_charge_or_molecular(next(iter_section_chunks(infile, n, names=columns,
+                                                                           first_line=first_line)))
+    return atom_style, iter([atoms])
+
+
+# function reads the Atoms section (n lines) from an open file into a structured array
+def read_atoms_section(infile, n, atom_style=None):
+    atom_style, chunks = iter_atoms_section(infile, n, atom_style)
+    return atom_style, next(chunks)
+
+
+# function returns a new, empty, lattice dict
+def new_lattice(atom_style=None):
+    return {'title': '',
+            'comments': [],
+            'counts': {},
+            'count_comments': {},
+            'box': np.array([[0.0, 0.0], [0.0, 0.0], [0.0, 0.0]]),
+            'tilt': None,
+            'masses': [],
+            'atom_style': atom_style,
+            'atoms': None,
+            'sections': {}}
+
+
+# function finds the next section keyword in an open file
+# returns the section name and any comment on that line, or None at the end of the file
+def next_section(infile):
+    while True:
+        fileline = infile.readline()
+        if not fileline:
+            return None, ''
+        fileline_split = fileline.split('#', 1)
+        words = fileline_split[0].split()
+        if len(words) > 0:
+            section = ' '.join(words)
+            if section not in section_counts:
+                print(">>> ERROR  <<< Unknown section in lammps data file: " + str(section))
+                sys.exit()
+            return section, fileline_split[1].strip() if len(fileline_split) > 1 else ''
+
+
+# function reads the header of an open data file into the lattice dict
+# returns the first section name and its comment (None if there are no sections)
+def read_header(infile, lattice):
+
+    # The first line is always the title
+    lattice['title'] = infile.readline().rstrip('\n')
+
+    # Read the header, stop at the first section keyword
+    while True:
+        fileline = infile.readline()
+        if not fileline:
+            return None, ''
+
+        # split off any comment
+        fileline_split = fileline.split('#', 1)
+        words = fileline_split[0].split()
+        comment = fileline_split[1].strip() if len(fileline_split) > 1 else ''
+
+        if len(words) == 0:
+            if len(comment) > 0:
+                lattice['comments'].append(fileline.rstrip('\n'))
+            continue
+
+        # box and tilt
+        if len(words) == 4 and words[2][1:] == 'lo' and words[3][1:] == 'hi':
+            dim = 'xyz'.index(words[2][0])
+            lattice['box'][dim] = [float(words[0]), float(words[1])]
+            continue
+        if len(words) == 6 and words[3:] == ['xy', 'xz', 'yz']:
+            lattice['tilt'] = np.array([float(words[0]), float(words[1]), float(words[2])])
+            continue
+
+        # header counts
+        keyword = ' '.join(words[1:])
+        if keyword in header_counts:
+            lattice['counts'][keyword] = int(words[0])
+            if len(comment) > 0:
+                lattice['count_comments'][keyword] = comment
+            continue
+
+        # Otherwise we have reached the first section
+        section = ' '.join(words)
+        if section not in section_counts:
+            print(">>> ERROR  <<< Unknown line in lammps data file header: " + str(fileline))
+            sys.exit()
+        return section, comment
+
+
+# function reads n non blank lines of a section from an open file
+def read_section_lines(infile, n):
+    lines = []
+    while len(lines) < n:
+        fileline = infile.readline()
+        if not fileline:
+            break
+        if len(fileline.strip()) > 0:
+            lines.append(fileline.rstrip('\n'))
+    return lines
+
+
+# function reads n bodies of the Bodies section from an open file, returns a list of the lines of each body
+# Each body is a line 'atom-ID Ninteger Ndouble', then Ninteger integers and Ndouble floats on any number of lines
+def read_body_lines(infile, n):
+    bodies = []
+    for _ in range(n):
+        lines = read_section_lines(infile, 1)
+        if len(lines) == 0:
+            break
+        words = lines[0].split('#')[0].split()
+        values = int(words[1]) + int(words[2])
+        while values > 0:
+            line = read_section_lines(infile, 1)
+            if len(line) == 0:
+                break
+            values -= len(line[0].split('#')[0].split())
+            lines += line
+        bodies.append(lines)
+    return bodies
+
+
+# function reads the raw lines of a section (any section but Atoms and Masses) from an open file
+def read_raw_section(infile, section, n):
+    if section == 'Bodies':
+        return [line for body in read_body_lines(infile, n) for line in body]
+    return read_section_lines(infile, n)
+
+
+# function reads a lammps data file, returns a dict (see top of file)
+def read_lammps_data(filename, **kwargs):
+    atom_style = kwargs.get('atom_style', None)
+
+    lattice = new_lattice(atom_style)
+    infile = open_data_file(filename, 'r')
+    section, section_comment = read_header(infile, lattice)
+
+    # Read the sections
+    while section is not None:
+        n = lattice['counts'].get(section_counts[section], 0)
+
+        if section == 'Atoms':
+            if lattice['atom_style'] is None and len(section_comment) > 0:
+                lattice['atom_style'] = section_comment.split()[0]
+            lattice['atom_style'], lattice['atoms'] = read_atoms_section(infile, n, lattice['atom_style'])
+        elif section == 'Masses':
+            for line in read_section_lines(infile, n):
+                line_split = line.split('#', 1)
+                words = line_split[0].split()
+                lattice['masses'].append([int(words[0]), float(words[1]),
+                                          line_split[1].strip() if len(line_split) > 1 else ''])
+        else:
+            lattice['sections'][section] = read_raw_section(infile, section, n)
+
+        section, section_comment = next_section(infile)
+
+    infile.close()
+
+    # Check the number of atoms is as expected
+    if lattice['atoms'] is None:
+        lattice['atoms'] = np.empty(0, dtype=atoms_dtype(atom_style_columns.get(lattice['atom_style'],
+                                                                                 atom_style_columns['atomic'])))
+    if lattice['counts'].get('atoms', 0) != len(lattice['atoms']):
+        print(">>> WARNING: atoms field at the top of the file does NOT match "
+              "with the actual number of atom records in the file")
+
+    return lattice
+
+
+# function returns the row format string, %d for integer columns, %s for floats (shortest repr)
+def row_format(arrays, sep, float_format):
+    fmts = []
+    for a in arrays:
+        if np.issubdtype(a.dtype, np.integer):
+            fmts.append('%d')
+        else:
+            fmts.append(float_format)
+    return sep.join(fmts) + '\n'
+
+
+# function writes columns of data (list of 1D arrays of equal length) to an open file
+# Rows are formatted a block at a time with a single string format call per block
+def write_columns(outfile, arrays, sep=' ', float_format='%s'):
+    arrays = [np.asarray(a) for a in arrays]
+    if len(arrays) == 0 or len(arrays[0]) == 0:
+        return
+    fmt = row_format(arrays, sep, float_format)
+    n = len(arrays[0])
+    for start in range(0, n, write_block_rows):
+        stop = min(n, start + write_block_rows)
+        block = np.empty((stop - start, len(arrays)), dtype=object)
+        for j, a in enumerate(arrays):
+            # tolist() gives python ints and floats, so %s writes the shortest round trip repr
+            block[:, j] = a[start:stop].tolist()
+        outfile.write((fmt * (stop - start)) % tuple(block.ravel().tolist()))
+
+
+# function writes the rows of an Atoms section to an open file, from arrays of the atom data
+# atom_style = atomic (id type x y z), charge (id type q x y z), molecular (id mol type x y z) or full
+# ids = (N,) array, positions = (N, 3) array, types, mol and q are (N,) arrays or single values for all atoms
+# (mol and q are only needed by the atom styles that have them)
+def write_atoms(outfile, atom_style, ids, types, positions, mol=None, q=None, sep=' ', float_format='%s'):
+    if atom_style not in atom_style_columns:
+        print(">>> ERROR  <<< Atom style not supported: " + str(atom_style))
+        sys.exit()
+    positions = np.asarray(positions).reshape(-1, 3)
+    n = len(positions)
+    data = {'id': ids, 'type': types, 'mol': mol, 'q': q,
+            'x': positions[:, 0], 'y': positions[:, 1], 'z': positions[:, 2]}
+    columns = []
+    for c in atom_style_columns[atom_style]:
+        if data[c] is None:
+            print(">>> ERROR  <<< Atom style " + str(atom_style) + " needs the " + str(c) + " of each atom")
+            sys.exit()
+        columns.append(np.broadcast_to(np.asarray(data[c]), (n,)))
+    write_columns(outfile, columns, sep=sep, float_format=float_format)
+
+
+# function writes the header and Masses section of a lammps data file to an open file
+def write_header(outfile, lattice):
+    counts = lattice.get('counts', {})
+
+    outfile.write(str(lattice.get('title', '')) + "\n")
+    for line in lattice.get('comments', []):
+        outfile.write(line + "\n")
+
+    for keyword in header_counts:
+        if keyword == 'atom types':
+            outfile.write("\n")
+        if keyword in counts:
+            line = str(counts[keyword]) + " " + keyword
+            if keyword in lattice.get('count_comments', {}):
+                line = line + " # " + lattice['count_comments'][keyword]
+            outfile.write(line + "\n")
+
+    box = lattice['box']
+    outfile.write("\n")
+    outfile.write(repr(float(box[0][0])) + " " + repr(float(box[0][1])) + " xlo xhi\n")
+    outfile.write(repr(float(box[1][0])) + " " + repr(float(box[1][1])) + " ylo yhi\n")
+    outfile.write(repr(float(box[2][0])) + " " + repr(float(box[2][1])) + " zlo zhi\n")
+    if lattice.get('tilt') is not None:
+        tilt = lattice['tilt']
+        outfile.write(repr(float(tilt[0])) + " " + repr(float(tilt[1])) + " " + repr(float(tilt[2])) +
+                      " xy xz yz\n")
+
+    # Masses
+    if len(lattice.get('masses', [])) > 0:
+        outfile.write("\nMasses\n\n")
+        for mass in lattice['masses']:
+            line = str(mass[0]) + " " + str(mass[1])
+            if len(mass) > 2 and len(mass[2]) > 0:
+                line = line + " # " + mass[2]
+            outfile.write(line + "\n")
+
+
+# function writes a lammps data file from a dict (see top of file)
+def write_lammps_data(filename, lattice, **kwargs):
+    sep = kwargs.get('sep', ' ')
+    float_format = kwargs.get('float_format', '%s')
+
+    atoms = lattice['atoms']
+    header = dict(lattice)
+    header['counts'] = dict(lattice.get('counts', {}))
+    header['counts']['atoms'] = len(atoms)
+
+    outfile = open_data_file(filename, 'w')
+    write_header(outfile, header)
+
+    # Atoms
+    outfile.write("\nAtoms # " + str(lattice['atom_style']) + "\n\n")
+    write_columns(outfile, [atoms[c] for c in atoms.dtype.names], sep=sep, float_format=float_format)
+
+    # Any other sections
+    for section, lines in lattice.get('sections', {}).items():
+        outfile.write("\n" + section + "\n\n")
+        for line in lines:
+            outfile.write(line + "\n")
+
+    outfile.close()
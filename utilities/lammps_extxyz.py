@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+
+# Functions for reading and writing extended xyz files (single or multi-frame).
+
+# Each frame is an atom count line, a comment line of key=value pairs and one line per atom.
+# The Properties key gives the columns of the atom lines, as name:type:ncols triplets, e.g.
+#   Properties=species:S:1:pos:R:3:charges:R:1:forces:R:3
+# where the type is S (string), R (real), I (integer) or L (logical, T/F).
+# If Properties is missing, the columns are assumed to be species:S:1:pos:R:3.
+
+# read_extxyz(filename) returns a list of frames, iter_extxyz(filename) yields them one at a time.
+# The atom lines of each frame are read in a single pass into a numpy structured array, with one
+# field per property.  Properties with more than one column (pos, forces, ...) are (N, ncols) fields.
+# Each frame is a dict:
+#   frame['atoms']       structured array of the atom lines, e.g. frame['atoms']['pos']
+#   frame['properties']  list of [name, type, ncols]
+#   frame['lattice']     (3, 3) array of lattice vectors (one per row), or None
+#   frame['info']        dict of all other key=value pairs of the comment line
+# Compressed (.gz) files can be read and written.
+
+# imported modules
+import sys
+import shlex
+import numpy as np
+from lammps_data_file import open_data_file, write_columns
+
+
+# numpy types of the extended xyz property types
+property_dtypes = {
+    'S': 'U32',
+    'R': np.float64,
+    'I': np.int64,
+    'L': 'U5',
+}
+
+# Default columns when the comment line has no Properties key
+default_properties = [['species', 'S', 1], ['pos', 'R', 3]]
+
+
+# function converts a key=value string to an int, float, bool or array where possible
+def parse_info_value(value):
+    words = value.split()
+    if len(words) == 0:
+        return value
+    if len(words) > 1:
+        if all(w in ['T', 'F'] for w in words):
+            return np.array([w == 'T' for w in words])
+        try:
+            return np.array([int(w) for w in words])
+        except ValueError:
+            pass
+        try:
+            return np.array([float(w) for w in words])
+        except ValueError:
+            return value
+    if value in ['T', 'True', 'true']:
+        return True
+    if value in ['F', 'False', 'false']:
+        return False
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+# function parses the comment line of a frame into a dict of key=value pairs
+# quoted values may contain spaces, keys without a value are set to True
+def parse_comment_line(line):
+    info = {}
+    try:
+        words = shlex.split(line)
+    except ValueError:
+        words = line.split()
+    for word in words:
+        if '=' in word:
+            key, value = word.split('=', 1)
+            info[key] = value
+        else:
+            info[word] = True
+    return info
+
+
+# function parses a Properties string into a list of [name, type, ncols]
+def parse_properties(properties):
+    fields = properties.split(':')
+    if len(fields) % 3 != 0:
+        print(">>> ERROR  <<< Could not parse Properties=" + str(properties))
+        sys.exit()
+    return [[fields[i], fields[i + 1], int(fields[i + 2])] for i in range(0, len(fields), 3)]
+
+
+# function returns the structured dtype of the atom lines for a list of properties
+def properties_dtype(properties):
+    dtype = []
+    for name, ptype, ncols in properties:
+        if ptype not in property_dtypes:
+            print(">>> ERROR  <<< Unknown property type " + str(ptype) + " for property " + str(name))
+            sys.exit()
+        if ncols == 1:
+            dtype.append((name, property_dtypes[ptype]))
+        else:
+            dtype.append((name, property_dtypes[ptype], (ncols,)))
+    return np.dtype(dtype)
+
+
+# function reads the next frame from an open file, returns None at the end of the file
+def read_frame(infile):
+    fileline = infile.readline()
+    while fileline and len(fileline.split()) == 0:
+        fileline = infile.readline()
+    if not fileline:
+        return None
+    try:
+        natoms = int(fileline)
+    except ValueError:
+        print(">>> ERROR  <<< Something went wrong reading the number of atoms from the xyz file")
+        print("The line read was:")
+        print(fileline)
+        sys.exit()
+
+    info = parse_comment_line(infile.readline())
+
+    # lattice vectors, one per row
+    lattice = None
+    if 'Lattice' in info:
+        lattice = np.array([float(v) for v in info.pop('Lattice').split()]).reshape(3, 3)
+
+    if 'Properties' in info:
+        properties = parse_properties(info.pop('Properties'))
+    else:
+        properties = [list(p) for p in default_properties]
+
+    for key in info:
+        if not isinstance(info[key], bool):
+            info[key] = parse_info_value(info[key])
+
+    # read all atom lines in one pass
+    dtype = properties_dtype(properties)
+    atoms = np.loadtxt(infile, dtype=dtype, comments=None, max_rows=natoms, ndmin=1)
+    if len(atoms) != natoms:
+        print(">>> ERROR  <<< Expected " + str(natoms) + " atoms in frame, but read " + str(len(atoms)))
+        sys.exit()
+
+    # logical columns are read as strings, convert to bool
+    logical = [p[0] for p in properties if p[1] == 'L']
+    if len(logical) > 0:
+        final_dtype = np.dtype([(n, np.bool_, dtype[n].shape) if n in logical else (n, dtype[n])
+                                for n in dtype.names])
+        converted = np.empty(natoms, dtype=final_dtype)
+        for n in dtype.names:
+            if n in logical:
+                converted[n] = np.char.upper(np.char.strip(atoms[n])).astype('U1') == 'T'
+            else:
+                converted[n] = atoms[n]
+        atoms = converted
+
+    return {'atoms': atoms, 'properties': properties, 'lattice': lattice, 'info': info}
+
+
+# function yields the frames of an extended xyz file one at a time
+def iter_extxyz(filename):
+    infile = open_data_file(filename, 'r')
+    try:
+        while True:
+            frame = read_frame(infile)
+            if frame is None:
+                break
+            yield frame
+    finally:
+        infile.close()
+
+
+# function reads all frames of an extended xyz file, or a single frame if index is given
+def read_extxyz(filename, index=None):
+    if index is None:
+        return list(iter_extxyz(filename))
+    for i, frame in enumerate(iter_extxyz(filename)):
+        if i == index:
+            return frame
+    print(">>> ERROR  <<< Frame " + str(index) + " not found in file: " + str(filename))
+    sys.exit()
+
+
+# function returns the extended xyz type letter of a numpy array
+def property_type(a):
+    if np.issubdtype(a.dtype, np.bool_):
+        return 'L'
+    if np.issubdtype(a.dtype, np.integer):
+        return 'I'
+    if np.issubdtype(a.dtype, np.floating):
+        return 'R'
+    return 'S'
+
+
+# function formats a value of the info dict for the comment line
+def format_info_value(value):
+    if isinstance(value, (bool, np.bool_)):
+        return 'T' if value else 'F'
+    if isinstance(value, np.ndarray) and value.dtype == np.bool_:
+        return '"' + ' '.join('T' if v else 'F' for v in value.ravel().tolist()) + '"'
+    if isinstance(value, np.ndarray):
+        return '"' + ' '.join(str(v) for v in value.ravel().tolist()) + '"'
+    value = str(value)
+    if ' ' in value or '=' in value or len(value) == 0:
+        return '"' + value + '"'
+    return value
+
+
+# function writes one frame to an open file
+def write_frame(outfile, frame):
+    atoms = frame['atoms']
+
+    # properties string and the list of columns to write
+    properties = []
+    columns = []
+    for name in atoms.dtype.names:
+        a = atoms[name]
+        ncols = 1 if a.ndim == 1 else a.shape[1]
+        properties.append(name + ':' + property_type(a) + ':' + str(ncols))
+        for col in ([a] if a.ndim == 1 else a.T):
+            if np.issubdtype(col.dtype, np.bool_):
+                col = np.where(col, 'T', 'F')
+            columns.append(col)
+
+    comment = []
+    if frame.get('lattice') is not None:
+        comment.append('Lattice=' + format_info_value(np.asarray(frame['lattice'], dtype=np.float64)))
+    comment.append('Properties=' + ':'.join(properties))
+    for key, value in frame.get('info', {}).items():
+        comment.append(key + '=' + format_info_value(value))
+
+    outfile.write(str(len(atoms)) + '\n')
+    outfile.write(' '.join(comment) + '\n')
+    write_columns(outfile, columns)
+
+
+# function writes a frame, or list of frames, to an extended xyz file
+def write_extxyz(filename, frames, append=False):
+    if isinstance(frames, dict):
+        frames = [frames]
+    outfile = open_data_file(filename, 'a' if append else 'w')
+    for frame in frames:
+        write_frame(outfile, frame)
+    outfile.close()
+
+
+# function builds a frame from species and positions, any extra per-atom arrays are added as properties
+def new_frame(species, positions, lattice=None, info=None, **properties):
+    species = np.asarray(species)
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    dtype = [('species', 'U' + str(max(1, max([len(s) for s in species.tolist()] + [1])))),
+             ('pos', np.float64, (3,))]
+    extra = {}
+    for name, values in properties.items():
+        values = np.asarray(values)
+        extra[name] = values
+        dtype.append((name, values.dtype) if values.ndim == 1 else (name, values.dtype, values.shape[1:]))
+    atoms = np.empty(len(positions), dtype=dtype)
+    atoms['species'] = species
+    atoms['pos'] = positions
+    for name, values in extra.items():
+        atoms[name] = values
+    return {'atoms': atoms,
+            'properties': [[n, property_type(atoms[n]), 1 if atoms[n].ndim == 1 else atoms[n].shape[1]]
+                           for n in atoms.dtype.names],
+            'lattice': None if lattice is None else np.asarray(lattice, dtype=np.float64).reshape(3, 3),
+            'info': {} if info is None else dict(info)}
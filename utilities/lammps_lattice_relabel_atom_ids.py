@@ -3,11 +3,18 @@
 # This function reads a lammps lattice input file and relabels the atom IDs so that
 # they are sequential.  The script also checks that the correct number of atoms are present
 
+# The file is streamed, so very large files can be relabelled without holding them in memory.
+# The Atoms section is read in chunks of chunk_rows atoms, each chunk is sorted by id and saved to a
+# temporary file, then the sorted chunks are merged and written out with the new ids (external merge sort).
+# Atom ids are read as 64 bit integers.  The atom ids in the Velocities, Ellipsoids, Lines, Triangles, Bodies,
+# Bonds, Angles, Dihedrals and Impropers sections are relabelled to match.  All other sections are copied unchanged.
+
 # Keyword arguments:
 # verbose    = True  , prints some comments to the screen.
 # overwrite  = True  , will overwrite the existing file.
 # overwrite  = False , will create a new file with the current date-time appended to the filename
 # filename = lammps.lattice.dat  , the lammps lattice file to read
+# chunk_rows = 10000000          , number of atoms sorted in memory at once
 
 #  Kenny Jolley, May 2019
 
@@ -15,7 +22,88 @@
 import sys
 import os
 import datetime
+import shutil
+import tempfile
 import numpy as np
+from lammps_data_file import (open_data_file, new_lattice, read_header, next_section, write_header,
+                              section_counts, iter_atoms_section, iter_section_chunks, read_section_lines,
+                              read_body_lines, write_columns)
+
+# Columns of each section that hold atom ids, columns are numbered from 0
+atom_id_columns = {
+    'Velocities': [0],
+    'Ellipsoids': [0],
+    'Lines': [0],
+    'Triangles': [0],
+    'Bodies': [0],
+    'Bonds': [2, 3],
+    'Angles': [2, 3, 4],
+    'Dihedrals': [2, 3, 4, 5],
+    'Impropers': [2, 3, 4, 5],
+}
+
+
+# function sorts each chunk of atoms by id, returns the list of sorted runs
+# If there is more than one chunk, the runs are saved in tmp_dir and opened as memory maps
+def sort_atom_chunks(chunks, tmp_dir):
+    runs = []
+    run_files = []
+    for chunk in chunks:
+        chunk = chunk[np.argsort(chunk['id'], kind='stable')]
+        if len(runs) == 0:
+            runs.append(chunk)
+            continue
+        # more than one chunk, move everything to disk
+        if len(run_files) == 0:
+            run_files.append(os.path.join(tmp_dir, 'run_0.npy'))
+            np.save(run_files[0], runs[0])
+        run_files.append(os.path.join(tmp_dir, 'run_' + str(len(runs)) + '.npy'))
+        np.save(run_files[-1], chunk)
+        runs.append(None)
+    if len(run_files) > 0:
+        runs = [np.load(f, mmap_mode='r') for f in run_files]
+    return runs
+
+
+# function merges sorted runs of atoms, yields sorted blocks of atoms
+# Each step takes a block from every run, and outputs all atoms with an id no larger than the
+# smallest last id of the blocks that do not reach the end of their run.
+def merge_atom_runs(runs, block_rows):
+    pos = [0 for _ in runs]
+    while True:
+        active = [i for i in range(len(runs)) if pos[i] < len(runs[i])]
+        if len(active) == 0:
+            return
+        blocks = [runs[i][pos[i]:pos[i] + block_rows] for i in active]
+
+        limits = [b['id'][-1] for i, b in zip(active, blocks) if pos[i] + len(b) < len(runs[i])]
+        take = []
+        for b in blocks:
+            if len(limits) == 0:
+                take.append(len(b))
+            else:
+                take.append(int(np.searchsorted(b['id'], min(limits), side='right')))
+
+        merged = np.concatenate([np.asarray(b[:t]) for b, t in zip(blocks, take)])
+        for i, t in zip(active, take):
+            pos[i] += t
+        yield merged[np.argsort(merged['id'], kind='stable')]
+
+
+# Sections with an integer atom id followed by float columns, the other sections are all integers
+# (in the Bodies section only the atom id of each body is relabelled)
+float_sections = ['Velocities', 'Ellipsoids', 'Lines', 'Triangles']
+
+
+# function maps old atom ids to new ids, using the sorted list of old ids
+def relabel_ids(old_ids, sorted_ids):
+    new_ids = np.searchsorted(sorted_ids, old_ids)
+    found = new_ids < len(sorted_ids)
+    found[found] = np.asarray(sorted_ids[new_ids[found]]) == old_ids[found]
+    if not np.all(found):
+        print(">>> ERROR  <<< atom ids not found in the Atoms section: " + str(old_ids[~found][:10]))
+        sys.exit()
+    return new_ids + 1
 
 
 # function reads a lammps lattice input file and relabels the atom IDs
@@ -25,6 +113,7 @@ def lammps_lattice_relabel_atom_ids(**kwargs):
     verbose = kwargs.get('verbose', False)
     filename = kwargs.get('filename', 'lammps.lattice.dat')
     overwrite = kwargs.get('overwrite', False)
+    chunk_rows = kwargs.get('chunk_rows', 10000000)
 
     # Welcome
     if verbose:
@@ -45,69 +134,106 @@ def lammps_lattice_relabel_atom_ids(**kwargs):
                        x.strftime("%d") + x.strftime("%H") +
                        x.strftime("%M") + x.strftime("%S") + "_lammps.lattice.dat")
 
-    # Open input file
-    infile = open(filename, 'r')
-    row_count = 0
-    if verbose:
-        print("Opened file: " + str(infile.name))
-
-    # Create output file
-    outfile = open(output_filename, 'w+')
-    if verbose:
-        print("Opened file: " + str(outfile.name))
+    infile = open_data_file(filename, 'r')
+    outfile = open_data_file(output_filename, 'w')
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_filename)))
+
+    try:
+        # Read and write the header
+        lattice = new_lattice()
+        section, section_comment = read_header(infile, lattice)
+        write_header(outfile, lattice)
+        atoms = lattice['counts'].get('atoms', 0)
+
+        sorted_ids = None
+        atoms_read = 0
+        while section is not None:
+            n = lattice['counts'].get(section_counts[section], 0)
+
+            # section keyword line
+            outfile.write("\n" + section)
+            if len(section_comment) > 0:
+                outfile.write(" # " + section_comment)
+            outfile.write("\n\n")
+
+            if section == 'Atoms':
+                # sort chunks of atoms by id
+                if len(section_comment) > 0:
+                    atom_style = section_comment.split()[0]
+                else:
+                    atom_style = None
+                atom_style, chunks = iter_atoms_section(infile, n, atom_style, chunk_rows=chunk_rows)
+                runs = sort_atom_chunks(chunks, tmp_dir)
+                if verbose:
+                    print("Atoms sorted in " + str(len(runs)) + " chunk(s)")
+
+                # the sorted old ids are kept to relabel the other sections
+                if len(runs) == 1:
+                    sorted_ids = runs[0]['id']
+                else:
+                    sorted_ids = np.lib.format.open_memmap(os.path.join(tmp_dir, 'ids.npy'), mode='w+',
+                                                           dtype=np.int64, shape=(n,))
+
+                # merge the sorted chunks, write atoms with new ids starting at 1
+                duplicates = 0
+                last_id = None
+                for block in merge_atom_runs(runs, max(1, chunk_rows // len(runs))):
+                    if len(runs) > 1:
+                        sorted_ids[atoms_read:atoms_read + len(block)] = block['id']
+                    duplicates += int(np.count_nonzero(block['id'][1:] == block['id'][:-1]))
+                    if last_id is not None and block['id'][0] == last_id:
+                        duplicates += 1
+                    last_id = block['id'][-1]
+
+                    block['id'] = np.arange(atoms_read + 1, atoms_read + len(block) + 1)
+                    write_columns(outfile, [block[c] for c in block.dtype.names])
+                    atoms_read += len(block)
+
+                if duplicates > 0:
+                    print(">>> WARNING: " + str(duplicates) + " duplicate atom ids found in the Atoms section")
+
+            elif section in atom_id_columns:
+                # relabel the atom ids in this section
+                if sorted_ids is None:
+                    print(">>> ERROR  <<< The Atoms section must come before the " + str(section) + " section")
+                    sys.exit()
+                if section == 'Bodies':
+                    # the atom id is the first value of the first line of each body, the other lines are copied
+                    for body in read_body_lines(infile, n):
+                        words = body[0].split()
+                        words[0] = str(relabel_ids(np.array([int(words[0])]), sorted_ids)[0])
+                        for line in [" ".join(words)] + body[1:]:
+                            outfile.write(line + "\n")
+                else:
+                    int_cols = 1 if section in float_sections else None
+                    for chunk in iter_section_chunks(infile, n, chunk_rows=chunk_rows, int_cols=int_cols):
+                        names = chunk.dtype.names
+                        for col in atom_id_columns[section]:
+                            chunk[names[col]] = relabel_ids(chunk[names[col]], sorted_ids)
+                        write_columns(outfile, [chunk[c] for c in names])
 
-    # Read and write the header, stop after reading the 'Atoms' line
-    atoms = 0
-    while True:
-        fileline = infile.readline()
-        outfile.write(str(fileline))
-        row_count = row_count + 1
-        fileline_split = fileline.split()
-        
-        # Save the number of atoms
-        if len(fileline_split) > 1:
-            if fileline_split[1] == 'atoms':
-                atoms = int(fileline_split[0])
-
-        # Stopping criteria
-        if len(fileline_split) > 0:
-            if fileline_split[0] == 'Atoms':
-                # Write the next blank line and exit
-                fileline = infile.readline()
-                row_count = row_count + 1
-                outfile.write(str(fileline))
-                break
-    infile.close()
-
-    # Now we need to read in all the data lines to a numpy array
-    data = np.loadtxt(filename, skiprows=row_count)
-    # print(data)
+            else:
+                # copy any other section
+                for line in read_section_lines(infile, n):
+                    outfile.write(line + "\n")
+
+            section, section_comment = next_section(infile)
+    finally:
+        infile.close()
+        outfile.close()
+        sorted_ids = None
+        runs = None
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
     # Test if no. atoms are as expected
     if verbose:
         print("\nAtoms expected in file: " + str(atoms))
-        print("Atoms actually read   : " + str(data.shape[0]))
-    if atoms != data.shape[0]:
+        print("Atoms actually read   : " + str(atoms_read))
+    if atoms != atoms_read:
         print(">>> WARNING: atoms field at the top of the file does NOT match "
               "with the actual number of atom records in the file")
-        print("\nAtoms expected in file: " + str(atoms))
-        print("Atoms actually read   : " + str(data.shape[0]))
-
-    # Sort atom data into order by first column
-    data = data[data[:, 0].argsort()]
-    # print(data)
-
-    # Print sorted data to file, relabel ids starting at 1
-    for i in range(data.shape[0]):
-        outfile.write(str(i+1) + " ")
-        for j in range(data.shape[1]-1):
-            d = data[i][j+1]
-            if int(d) == d:
-                outfile.write(str(int(d)) + " ")
-            else:
-                outfile.write(str(d) + " ")
-        outfile.write("\n")
-    outfile.close()
+    if verbose:
+        print("Written file: " + str(output_filename))
 
     # overwrite existing file if required
     if overwrite:
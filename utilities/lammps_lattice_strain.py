@@ -1,12 +1,22 @@
 #!/usr/bin/env python
 
 # This function reads a lattice from a lammps input data file and applies the strain specified.
+# The strain is applied as a general affine deformation, F = I + strain_tensor/100, to the atom positions
+# and to the (triclinic) box, keeping the lower corner of the box fixed.  Shear strains add tilt factors.
+# If the deformation rotates the cell, it is rotated back so the box stays in the lammps orientation.
+# The atom velocities (if the file has a Velocities section) are rotated with the cell, they are not strained.
+
+# A series of strained files can be generated from one read of the input file, the strain tensor is
+# multiplied by each value in the series, e.g. strain_x = 1 and strain_series = [0, 10, 0.1] gives
+# uniaxial strains of 0 to 10 % in steps of 0.1 %.
 
 # Keyword arguments:
 # verbose    = True  , prints some comments to the screen.
 # strain_x   = 0.0  , percentage strain to apply in the x direction.
 # strain_y   = 0.0  , percentage strain to apply in the y direction.
 # strain_z   = 0.0  , percentage strain to apply in the z direction.
+# strain_tensor = None  , 3x3 percentage strain tensor (overrides strain_x, strain_y, strain_z)
+# strain_series = None  , [start, stop, step] multipliers of the strain tensor, one output file each
 # filename = lammps.lattice.dat  , the lammps lattice file to read
 
 # Kenny Jolley, July 2020
@@ -15,9 +25,45 @@
 import sys
 import datetime
 import numpy as np
+from lammps_data_file import read_lammps_data, write_lammps_data
+
+
+# function returns the box matrix, columns are the lammps cell vectors a, b, c
+# a = (xhi - xlo, 0, 0),  b = (xy, yhi - ylo, 0),  c = (xz, yz, zhi - zlo)
+def box_matrix(box, tilt):
+    if tilt is None:
+        tilt = [0.0, 0.0, 0.0]
+    return np.array([[box[0][1] - box[0][0], tilt[0], tilt[1]],
+                     [0.0, box[1][1] - box[1][0], tilt[2]],
+                     [0.0, 0.0, box[2][1] - box[2][0]]])
+
 
+# function returns the lammps (restricted triclinic) form of a general cell matrix, and the
+# rotation matrix that takes the general cell into the lammps orientation
+def restricted_triclinic(h):
+    a = h[:, 0]
+    b = h[:, 1]
+    c = h[:, 2]
+    ax = np.linalg.norm(a)
+    a_hat = a / ax
+    bx = np.dot(b, a_hat)
+    by = np.linalg.norm(np.cross(a_hat, b))
+    cx = np.dot(c, a_hat)
+    cy = (np.dot(b, c) - bx * cx) / by
+    cz = np.sqrt(np.dot(c, c) - cx * cx - cy * cy)
+    h_lammps = np.array([[ax, bx, cx],
+                         [0.0, by, cy],
+                         [0.0, 0.0, cz]])
+    rotation = h_lammps.dot(np.linalg.inv(h))
+    return h_lammps, rotation
 
-# function reads a lammps log.lammps file, and plots the Total energy vs time.
+
+# function returns the deformation gradient for a strain tensor given in percent
+def deformation_gradient(strain_tensor):
+    return np.identity(3) + np.asarray(strain_tensor, dtype=np.float64) / 100.0
+
+
+# function reads a lattice from a lammps data file and applies the strain (or series of strains) specified.
 def lammps_lattice_strain(**kwargs):
 
     # Default keyword args
@@ -25,8 +71,22 @@ def lammps_lattice_strain(**kwargs):
     strain_x = kwargs.get('strain_x', 0.0)
     strain_y = kwargs.get('strain_y', 0.0)
     strain_z = kwargs.get('strain_z', 0.0)
+    strain_tensor = kwargs.get('strain_tensor', None)
+    strain_series = kwargs.get('strain_series', None)
     filename = kwargs.get('filename', 'lammps.lattice.dat')
 
+    # Build the strain tensor (percent) from the x, y and z strains if not given
+    if strain_tensor is None:
+        strain_tensor = np.diag([float(strain_x), float(strain_y), float(strain_z)])
+    strain_tensor = np.asarray(strain_tensor, dtype=np.float64).reshape(3, 3)
+
+    # List of multipliers applied to the strain tensor, a single file unless a series is requested
+    if strain_series is None:
+        multipliers = [1.0]
+    else:
+        num_steps = int(round((strain_series[1] - strain_series[0]) / strain_series[2])) + 1
+        multipliers = [round(strain_series[0] + i * strain_series[2], 10) for i in range(num_steps)]
+
     # Welcome
     if verbose:
         print("  +------------------------------------------+")
@@ -40,101 +100,102 @@ def lammps_lattice_strain(**kwargs):
         print("   ")
 
         print(">  Lammps input filename: " + str(filename))
-        print(">  Percentage strain to apply: ")
-        print("     Strain in x: " + str(strain_x) + " %")
-        print("     Strain in y: " + str(strain_y) + " %")
-        print("     Strain in z: " + str(strain_z) + " %")
+        print(">  Percentage strain tensor to apply: ")
+        for i in range(3):
+            print("     " + str(strain_tensor[i].tolist()))
+        if strain_series is not None:
+            print(">  Strain series, tensor multiplied by: " + str(strain_series[0]) + " to " +
+                  str(strain_series[1]) + " in steps of " + str(strain_series[2]) +
+                  " (" + str(len(multipliers)) + " files)")
 
-    # convert to multiplier
-    mult_x = (float(strain_x) / 100.0) + 1.0
-    mult_y = (float(strain_y) / 100.0) + 1.0
-    mult_z = (float(strain_z) / 100.0) + 1.0
-
-    # output filename
+    # output filename prefix
     x = datetime.datetime.now()
-    output_filename = (x.strftime("%Y") + x.strftime("%m") +
-                       x.strftime("%d") + x.strftime("%H") +
-                       x.strftime("%M") + x.strftime("%S") + "_lammps.lattice.dat")
+    output_filename_prefix = (x.strftime("%Y") + x.strftime("%m") +
+                              x.strftime("%d") + x.strftime("%H") +
+                              x.strftime("%M") + x.strftime("%S") + "_")
 
-    # Open input file
-    infile = open(filename, 'r')
-    row_count = 0
+    # Read the lattice once, every strained file is generated from these arrays
+    lattice = read_lammps_data(filename)
     if verbose:
-        print("Opened input file : " + str(infile.name))
+        print("Read input file : " + str(filename))
 
-    # Create output file
-    outfile = open(output_filename, 'w+')
-    if verbose:
-        print("Opened output file: " + str(outfile.name))
-
-    # Read and write the header, stop after reading the 'Atoms' line
-    # add note to first line
-    fileline = infile.readline()
-    outfile.write(str(fileline[:-1]) + " + strained: " + str(strain_x) + "% x " +
-                  str(strain_y) + "% x " +
-                  str(strain_z) + "%\n")
-    row_count = row_count + 1
-
-    while True:
-        fileline = infile.readline()
-        fileline_split = fileline.split()
-
-        if len(fileline_split) > 3:
-            if fileline_split[2] == 'xlo' and fileline_split[3] == 'xhi':
-                fileline_split[1] = str(float(fileline_split[1]) * mult_x)
-
-        if len(fileline_split) > 3:
-            if fileline_split[2] == 'ylo' and fileline_split[3] == 'yhi':
-                fileline_split[1] = str(float(fileline_split[1]) * mult_y)
-
-        if len(fileline_split) > 3:
-            if fileline_split[2] == 'zlo' and fileline_split[3] == 'zhi':
-                fileline_split[1] = str(float(fileline_split[1]) * mult_z)
-
-        for i in range(len(fileline_split)):
-            outfile.write(str(fileline_split[i]) + " ")
-        outfile.write("\n")
-        row_count = row_count + 1
-
-        # Stopping criteria
-        if len(fileline_split) > 0:
-            if fileline_split[0] == 'Atoms':
-                # Write the next blank line and exit
-                fileline = infile.readline()
-                row_count = row_count + 1
-                outfile.write(str(fileline))
-                break
-    infile.close()
-
-    # Now we need to read in all the data lines to a numpy array
-    data = np.loadtxt(filename, skiprows=row_count)
-    # print(data)
-
-    # Rescale x y z coordinates, these are the last three cols
-    data[:, data.shape[1] - 3] = data[:, data.shape[1] - 3] * mult_x
-    data[:, data.shape[1] - 2] = data[:, data.shape[1] - 2] * mult_y
-    data[:, data.shape[1] - 1] = data[:, data.shape[1] - 1] * mult_z
-
-    # Print atom data to file
-    for i in range(data.shape[0]):
-        for j in range(data.shape[1]):
-            d = data[i][j]
-            if int(d) == d:
-                outfile.write(str(int(d)) + " ")
-            else:
-                outfile.write(str(d) + " ")
-        outfile.write("\n")
-    outfile.close()
+    title = lattice['title']
+    box_lo = lattice['box'][:, 0].copy()
+    h = box_matrix(lattice['box'], lattice['tilt'])
+    atoms = lattice['atoms']
+    positions = np.column_stack((atoms['x'], atoms['y'], atoms['z'])) - box_lo
+    strained = np.empty_like(positions)
+
+    # Velocities (id vx vy vz ...), only the vx vy vz columns are rotated, any other columns are kept
+    velocity_lines = lattice['sections'].get('Velocities')
+    if velocity_lines is not None:
+        velocity_words = [line.split('#')[0].split() for line in velocity_lines]
+        velocities = np.array([[float(v) for v in words[1:4]] for words in velocity_words]).reshape(-1, 3)
+
+    output_filenames = []
+    for multiplier in multipliers:
+        # Deform the cell, then rotate back to the lammps orientation if the strain included rotation
+        f = deformation_gradient(multiplier * strain_tensor)
+        if np.count_nonzero(np.tril(f, -1)) == 0:
+            # upper triangular deformations keep the lammps orientation, no rotation needed
+            h_new = f.dot(h)
+            transform = f
+        else:
+            h_new, rotation = restricted_triclinic(f.dot(h))
+            transform = rotation.dot(f)
+
+        # Move all atoms with a single matrix multiply
+        np.dot(positions, transform.T, out=strained)
+        strained += box_lo
+        atoms['x'] = strained[:, 0]
+        atoms['y'] = strained[:, 1]
+        atoms['z'] = strained[:, 2]
+
+        # Rotate the velocities to the new orientation of the cell (unchanged if the cell is not rotated)
+        if velocity_lines is not None:
+            lattice['sections']['Velocities'] = velocity_lines
+        if velocity_lines is not None and np.count_nonzero(np.tril(f, -1)) > 0:
+            rotated = velocities.dot(rotation.T).tolist()
+            lattice['sections']['Velocities'] = [" ".join([words[0]] + [repr(v) for v in rotated[i]] + words[4:])
+                                                 for i, words in enumerate(velocity_words)]
+
+        # New box, the lower corner is fixed
+        lattice['box'][:, 1] = box_lo + np.diag(h_new)
+        tilt = np.array([h_new[0][1], h_new[0][2], h_new[1][2]])
+        if lattice['tilt'] is not None or np.any(np.abs(tilt) > 1e-12):
+            lattice['tilt'] = tilt
+
+        # add note to first line
+        if np.count_nonzero(strain_tensor - np.diag(np.diag(strain_tensor))) == 0:
+            lattice['title'] = (title + " + strained: " + str(multiplier * strain_tensor[0][0]) + "% x " +
+                                str(multiplier * strain_tensor[1][1]) + "% x " +
+                                str(multiplier * strain_tensor[2][2]) + "%")
+        else:
+            lattice['title'] = (title + " + strained (%): " + str((multiplier * strain_tensor).tolist()))
+
+        # Write the strained lattice
+        if strain_series is None:
+            output_filename = output_filename_prefix + "lammps.lattice.dat"
+        else:
+            output_filename = output_filename_prefix + "strain_" + format(multiplier, 'g') + "_lammps.lattice.dat"
+        write_lammps_data(output_filename, lattice)
+        output_filenames.append(output_filename)
+        if verbose:
+            print("Written output file: " + str(output_filename))
 
     if verbose:
         print(">  Done ")
 
+    return output_filenames
+
 
 # If we are running this script interactively, call the function safely
 if __name__ == '__main__':
 
     my_strain = [0, 0, 0]
     my_filename = 'lammps.lattice.dat'
+    my_tensor = None
+    my_series = None
 
     # Read number of lattice cells from the command-line, or supply interactively
     if len(sys.argv) > 1:
@@ -149,15 +210,30 @@ if __name__ == '__main__':
             my_strain[0] = float(sys.argv[2])
             my_strain[1] = float(sys.argv[3])
             my_strain[2] = float(sys.argv[4])
+        # filename, strain direction, then a series of strains
+        elif len(sys.argv) == 8:
+            my_filename = str(sys.argv[1])
+            my_strain[0] = float(sys.argv[2])
+            my_strain[1] = float(sys.argv[3])
+            my_strain[2] = float(sys.argv[4])
+            my_series = [float(sys.argv[5]), float(sys.argv[6]), float(sys.argv[7])]
+        # filename, then full strain tensor
+        elif len(sys.argv) == 11:
+            my_filename = str(sys.argv[1])
+            my_tensor = [float(v) for v in sys.argv[2:11]]
         else:
             print(">>> ERROR  <<<")
-            print("  User must pass either 3 or 4 command-line arguments")
-            print("   1st param should be the filename to read (this is optional) ")
+            print("  User must pass either 3, 4, 7 or 10 command-line arguments")
+            print("   1st param should be the filename to read (this is optional for 3 params) ")
             print("   Then 3 params = strain_x, strain_y, strain_z  (floats, percentage strain)")
+            print("   Optionally followed by 3 params = start, stop, step  multipliers of the strain")
+            print("   Or 9 params = percentage strain tensor  exx exy exz eyx eyy eyz ezx ezy ezz")
             print("    examples")
             print("   lammps_lattice_strain.py file.dat 1 0 0")
             print("   lammps_lattice_strain.py file.dat 10 5 1")
             print("   lammps_lattice_strain.py 0 0 1")
+            print("   lammps_lattice_strain.py file.dat 1 0 0 0 10 0.1")
+            print("   lammps_lattice_strain.py file.dat 0 2 0 0 0 0 0 0 0")
             sys.exit()
     else:
         # Otherwise, ask user
@@ -190,4 +266,6 @@ if __name__ == '__main__':
                           filename=my_filename,
                           strain_x=my_strain[0],
                           strain_y=my_strain[1],
-                          strain_z=my_strain[2])
+                          strain_z=my_strain[2],
+                          strain_tensor=my_tensor,
+                          strain_series=my_series)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+# Functions for building neighbour lists of atoms in a periodic box.
+
+# periodic_neighbours() finds the n nearest neighbours of every atom within a cutoff, using a
+# scipy cKDTree with periodic boundaries (the boxsize option), so the cost is O(N log N) rather than
+# the O(N^2) of checking every pair of atoms.  The positions can be 2D (e.g. x, y of a graphene layer)
+# or 3D.  If a group is given for each atom (e.g. the layer index), neighbours are only searched for
+# within the same group.  The neighbour ids of each atom are returned in ascending order.
+
+# next_nearest_neighbours() builds the next nearest neighbours of every atom from the nearest
+# neighbour list, i.e. the neighbours of the neighbours, excluding the atom itself.
+
+# cell_list_pairs() finds every pair of atoms closer than a cutoff with a periodic cell list: the atoms
+# are sorted into cells at least the cutoff wide, and each atom is only compared with the atoms of its own
+# and the neighbouring cells, a block of atoms at a time with numpy (e.g. to check for overlapping atoms in
+# a lattice of a million atoms).
+
+# imported modules
+import sys
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+# function returns the first n entries of each row of cand where valid is True, and the number found
+def first_valid(cand, valid, n):
+    order = np.argsort(~valid, axis=1, kind='stable')
+    cand = np.take_along_axis(cand, order, axis=1)[:, :n]
+    return cand, np.count_nonzero(valid, axis=1)
+
+
+# function returns an (N, n_neighbours) array of the ids of the nearest neighbours of each atom
+# positions = (N, d) array, box = [lx, ly, (lz)] periodic box lengths (the box starts at the origin)
+def periodic_neighbours(positions, box, cutoff, n_neighbours, groups=None):
+    positions = np.asarray(positions, dtype=np.float64)
+    box = np.asarray(box, dtype=np.float64)
+    n_atoms = len(positions)
+    if groups is None:
+        groups = np.zeros(n_atoms, dtype=int)
+    groups = np.asarray(groups)
+
+    neighbours = np.zeros((n_atoms, n_neighbours), dtype=int)
+    for group in np.unique(groups):
+        ids = np.nonzero(groups == group)[0]
+
+        # wrap the atoms into the box, the tree needs 0 <= x < box
+        points = np.mod(positions[ids], box)
+        points[points >= box] = 0.0
+        tree = cKDTree(points, boxsize=box)
+
+        # the atom itself is returned by the query, so ask for one extra neighbour
+        k = min(n_neighbours + 1, len(ids))
+        dist, nebs = tree.query(points, k=k, distance_upper_bound=cutoff)
+        nebs = nebs.reshape(len(ids), k)
+        valid = (nebs < len(ids)) & (nebs != np.arange(len(ids))[:, np.newaxis])
+        nebs, found = first_valid(nebs, valid, n_neighbours)
+
+        if np.any(found < n_neighbours):
+            bad = ids[np.nonzero(found < n_neighbours)[0][0]]
+            print(">>> ERROR  <<< Found only " + str(found.min()) + " neighbours within " + str(cutoff) +
+                  " of atom " + str(bad) + ", expected " + str(n_neighbours))
+            print("  (is the lattice too small for the periodic box?)")
+            sys.exit()
+
+        neighbours[ids] = np.sort(ids[nebs], axis=1)
+
+    return neighbours
+
+
+# function returns the next nearest neighbours of each atom (the neighbours of the neighbours,
+# not including the atom itself), in the order of the nearest neighbour list
+def next_nearest_neighbours(atoms_NN):
+    atoms_NN = np.asarray(atoms_NN)
+    n_atoms, n_nn = atoms_NN.shape
+    n_nnn = n_nn * (n_nn - 1)
+
+    cand = atoms_NN[atoms_NN].reshape(n_atoms, n_nn * n_nn)
+    valid = cand != np.arange(n_atoms)[:, np.newaxis]
+    atoms_NNN, found = first_valid(cand, valid, n_nnn)
+    if np.any(found < n_nnn):
+        print(">>> WARNING: the nearest neighbour list is not symmetric, some next nearest neighbours are missing")
+    return atoms_NNN
+
+
+# function returns the (n_pairs, 2) array of the pairs of atoms (i < j) closer than cutoff in a periodic box,
+# found with a cell list.  If a group is given for each atom, only pairs of atoms in different groups are returned
+def cell_list_pairs(positions, box, cutoff, groups=None, block_size=100000):
+    positions = np.asarray(positions, dtype=np.float64)
+    box = np.asarray(box, dtype=np.float64)
+    n_atoms = len(positions)
+    if groups is not None:
+        groups = np.asarray(groups)
+
+    # cells at least the cutoff wide, and the cell of each atom
+    n_cells = np.maximum((box // cutoff).astype(int), 1)
+    points = np.mod(positions, box)
+    cell = np.minimum((points / box * n_cells).astype(int), n_cells - 1)
+    flat = np.ravel_multi_index(cell.T, n_cells)
+    order = np.argsort(flat, kind='stable')
+    count = np.bincount(flat, minlength=np.prod(n_cells))
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+
+    # offsets to the neighbouring cells, each cell only once if there are less than 3 cells along a direction
+    shifts = [np.unique(np.mod([-1, 0, 1], n)) for n in n_cells]
+    offsets = np.array(np.meshgrid(*shifts, indexing='ij')).reshape(len(n_cells), -1).T
+
+    pairs = []
+    for first in range(0, n_atoms, block_size):
+        ids = np.arange(first, min(n_atoms, first + block_size))
+        for offset in offsets:
+            nb_cell = np.ravel_multi_index(np.mod(cell[ids] + offset, n_cells).T, n_cells)
+            n_nb = count[nb_cell]
+            i = np.repeat(ids, n_nb)
+            # index of each neighbour in the sorted atoms, the start of its cell + its place in the cell
+            place = np.arange(len(i)) - np.repeat(np.cumsum(n_nb) - n_nb, n_nb)
+            j = order[np.repeat(start[nb_cell], n_nb) + place]
+            keep = i < j
+            if groups is not None:
+                keep &= groups[i] != groups[j]
+            i, j = i[keep], j[keep]
+            delta = positions[j] - positions[i]
+            delta -= box * np.round(delta / box)
+            close = np.einsum('ij,ij->i', delta, delta) < cutoff * cutoff
+            pairs.append(np.column_stack([i[close], j[close]]))
+
+    if not pairs:
+        return np.zeros((0, 2), dtype=int)
+    return np.concatenate(pairs)
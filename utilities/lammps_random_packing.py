@@ -0,0 +1,450 @@
+#!/usr/bin/env python
+
+# Functions for placing atoms at random in a periodic box, with no two atoms closer than a minimum
+# separation (random sequential addition), used by the random lattice and glass generators.
+
+# The atoms already placed are held in a periodic grid of cells, with sides of at least min_sep, so a
+# trial atom only has to be checked against the atoms in its own and the 26 neighbouring cells, rather
+# than against every atom placed so far.  Trial atoms are generated and checked in batches with numpy.
+# Trial atoms of the same batch that are too close to each other are found with a cKDTree, and are
+# accepted in the order they were generated, so for one species the result is the same as placing the
+# atoms one by one.
+
+# For more than one species, min_sep can be a matrix of the minimum separation of each pair of species
+# (see pair_min_sep_matrix), and the species index of each atom is given in types.  The cells are as wide
+# as the largest separation.  The atoms are placed in the order given (within a batch, the atoms of a
+# species keep their order, and the species are interleaved as they are accepted).  The packing fraction
+# counts the cross pairs too: each atom of species i is a sphere whose diameter cubed is the mean of
+# min_sep[i, j] ** 3 over the species j of all the atoms.
+
+# Near the jamming limit almost every trial position is rejected.  A packing fraction above the jamming
+# limit is rejected at the start, or (on_stall='relax') min_sep is reduced until it is below the limit.
+# The acceptance rate is tracked, and if it falls too low, or the remaining atoms would need too many
+# trials at the current rate, the packing either stops with a report of how far it got, or
+# (on_stall='relax') reduces the minimum separations a little at a time until the atoms fit.  A row of
+# progress (atoms placed, acceptance rate, packing fraction, ...) can be written to a csv stream after each
+# percent of the atoms.
+
+# Alternatively, poisson_disk_packing chooses the atoms from a periodic Poisson-disk sample (Bridson's
+# algorithm: new points are tried in a shell around the active points, until no more fit), with the disk
+# radius set by the density rather than by min_sep.  This gives a more even (blue noise) spread of atoms.
+# It is for one species only.
+
+# imported modules
+import sys
+import time
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+# offsets of the neighbouring cells in each direction
+_offsets = np.array([-1, 0, 1])
+
+# packing fraction at which random sequential addition of spheres jams
+jamming_fraction = 0.38
+
+# columns of the progress stream
+progress_columns = ['placed', 'n_atoms', 'trials', 'accept_rate', 'window_accept', 'packing_fraction',
+                    'min_sep_scale', 'time']
+
+# points per radius^3 of a maximal Poisson-disk sample (10 candidates per active point)
+poisson_disk_saturation = 0.52
+
+
+# function returns the (n_species, n_species) matrix of minimum separations
+# species = list of names, e.g. ['Si', 'O'], min_sep = separation of any pair not in pair_min_sep,
+# pair_min_sep = dict of separations of named pairs, e.g. {'Si-O': 1.4, 'O-O': 2.2}
+def pair_min_sep_matrix(species, min_sep, pair_min_sep=None):
+    matrix = np.full((len(species), len(species)), float(min_sep))
+    for pair, sep in (pair_min_sep or {}).items():
+        names = pair.split('-')
+        if len(names) != 2 or names[0] not in species or names[1] not in species:
+            print(">>> ERROR  <<< Unknown pair " + str(pair) + " in the minimum separations, species are: " +
+                  ", ".join(species))
+            sys.exit()
+        i = species.index(names[0])
+        j = species.index(names[1])
+        matrix[i, j] = matrix[j, i] = float(sep)
+    return matrix
+
+
+# function returns a new empty grid of cells for a periodic box
+# min_sep = (n_species, n_species) matrix of minimum separations, the cells are at least as wide as the largest
+def new_packing_grid(box, min_sep, n_atoms):
+    box = np.asarray(box, dtype=np.float64)
+    n_cells = np.maximum((box / min_sep.max()).astype(int), 1)
+    return {'box': box,
+            'min_sep2': min_sep ** 2,
+            'max_sep': float(min_sep.max()),
+            'n_cells': n_cells,
+            'cell_size': box / n_cells,
+            'positions': np.zeros((n_atoms, 3)),
+            'types': np.zeros(n_atoms, dtype=int),
+            'n_atoms': 0,
+            'cell_atoms': np.full((int(np.prod(n_cells)), 4), -1, dtype=int),
+            'cell_count': np.zeros(int(np.prod(n_cells)), dtype=int)}
+
+
+# function returns the cell index (i, j, k) of each position
+def packing_cells(grid, positions):
+    cells = (positions / grid['cell_size']).astype(int)
+    return np.minimum(cells, grid['n_cells'] - 1)
+
+
+# function returns True for each trial position that is far enough from all placed atoms
+def packing_clear(grid, trial, trial_types):
+    n_cells = grid['n_cells']
+    cells = packing_cells(grid, trial)
+
+    # flat index of the 27 neighbouring cells of each trial position, with periodic wrap
+    nx = np.mod(cells[:, 0, np.newaxis] + _offsets, n_cells[0]) * (n_cells[1] * n_cells[2])
+    ny = np.mod(cells[:, 1, np.newaxis] + _offsets, n_cells[1]) * n_cells[2]
+    nz = np.mod(cells[:, 2, np.newaxis] + _offsets, n_cells[2])
+    nebs = nx[:, :, np.newaxis, np.newaxis] + ny[:, np.newaxis, :, np.newaxis] + nz[:, np.newaxis, np.newaxis, :]
+    atoms = grid['cell_atoms'][nebs.reshape(len(trial), 27)].reshape(len(trial), -1)
+
+    # minimum image separations from the atoms in the neighbouring cells (only the filled slots)
+    trial_id, slot = np.nonzero(atoms >= 0)
+    atom_id = atoms[trial_id, slot]
+    d = grid['positions'][atom_id] - trial[trial_id]
+    d -= grid['box'] * np.round(d / grid['box'])
+    too_close = np.einsum('ij,ij->i', d, d) < grid['min_sep2'][trial_types[trial_id], grid['types'][atom_id]]
+    clear = np.ones(len(trial), dtype=bool)
+    clear[trial_id[too_close]] = False
+    return clear
+
+
+# function adds positions (of atoms of the given species) to the grid
+def packing_add(grid, positions, types):
+    n = len(positions)
+    ids = np.arange(grid['n_atoms'], grid['n_atoms'] + n)
+    grid['positions'][ids] = positions
+    grid['types'][ids] = types
+    grid['n_atoms'] += n
+
+    # slot of each atom in its cell, atoms in the same cell take the next free slots in turn
+    cells = packing_cells(grid, positions)
+    cells = np.ravel_multi_index((cells[:, 0], cells[:, 1], cells[:, 2]), grid['n_cells'])
+    order = np.argsort(cells, kind='stable')
+    sorted_cells = cells[order]
+    first = np.searchsorted(sorted_cells, sorted_cells, side='left')
+    slots = np.empty(n, dtype=int)
+    slots[order] = np.arange(n) - first
+    slots += grid['cell_count'][cells]
+
+    # more atoms in a cell than slots, so add more slots
+    if n > 0 and slots.max() >= grid['cell_atoms'].shape[1]:
+        cell_atoms = grid['cell_atoms']
+        extra = np.full((len(cell_atoms), slots.max() + 1), -1, dtype=int)
+        extra[:, :cell_atoms.shape[1]] = cell_atoms
+        grid['cell_atoms'] = extra
+
+    grid['cell_atoms'][cells, slots] = ids
+    np.add.at(grid['cell_count'], cells, 1)
+
+
+# function returns which of the trial positions (that are clear of the placed atoms) are accepted,
+# a trial position is rejected if it is too close to an earlier accepted position in the batch
+def packing_accept_batch(grid, trial, trial_types, clear):
+    accept = clear.copy()
+    pairs = cKDTree(trial, boxsize=grid['box']).query_pairs(grid['max_sep'], output_type='ndarray')
+    pairs = pairs[clear[pairs[:, 0]] & clear[pairs[:, 1]]]
+    if len(pairs) == 0:
+        return accept
+
+    # separations of the pairs, for their species
+    d = trial[pairs[:, 0]] - trial[pairs[:, 1]]
+    d -= grid['box'] * np.round(d / grid['box'])
+    too_close = np.einsum('ij,ij->i', d, d) < grid['min_sep2'][trial_types[pairs[:, 0]], trial_types[pairs[:, 1]]]
+    pairs = pairs[too_close]
+
+    # accept the trial positions in order, in rounds: a position is accepted once all of its earlier
+    # neighbours in the batch have been rejected, and rejected once an earlier neighbour is accepted
+    pairs = np.sort(pairs, axis=1)
+    undecided = np.zeros(len(trial), dtype=bool)
+    undecided[pairs[:, 1]] = True
+    while len(pairs) > 0:
+        rejected = pairs[accept[pairs[:, 0]] & ~undecided[pairs[:, 0]], 1]
+        accept[rejected] = False
+        undecided[rejected] = False
+        pairs = pairs[undecided[pairs[:, 1]]]
+
+        blocked = np.zeros(len(trial), dtype=bool)
+        blocked[pairs[undecided[pairs[:, 0]], 1]] = True
+        undecided[~blocked] = False
+        pairs = pairs[undecided[pairs[:, 1]]]
+    return accept
+
+
+# function returns the first `quota` entries of each species that are True in accept
+def first_of_species(accept, trial_types, quota):
+    accept = accept.copy()
+    ids = np.nonzero(accept)[0]
+    order = np.argsort(trial_types[ids], kind='stable')
+    sorted_types = trial_types[ids][order]
+    rank = np.empty(len(ids), dtype=int)
+    rank[order] = np.arange(len(ids)) - np.searchsorted(sorted_types, sorted_types, side='left')
+    accept[ids[rank >= quota[trial_types[ids]]]] = False
+    return accept
+
+
+# function writes a row of the progress stream (csv) of random_packing
+def packing_progress(progress, event, status):
+    if progress is None:
+        return
+    progress.write(event + "," + ",".join(str(status[c]) for c in progress_columns) + "\n")
+    progress.flush()
+
+
+# function prints the state of a stalled packing and exits
+def packing_stalled(status):
+    print(">>> ERROR  <<< Random packing stalled, placed " + str(status['placed']) + " of " +
+          str(status['n_atoms']) + " atoms")
+    print("  Acceptance rate over the last " + str(status['window_trials']) + " trials: " +
+          str(status['window_accept']) + ", the remaining atoms need about " +
+          str(int((status['n_atoms'] - status['placed']) / max(status['window_accept'], 1e-12))) + " more trials")
+    print("  Packing fraction (spheres of diameter min_sep): " + str(round(status['packing_fraction'], 4)) +
+          ", random packing jams at about " + str(jamming_fraction))
+    print("  min_sep scaled by: " + str(status['min_sep_scale']))
+    print("  Reduce the density or min_sep, or use on_stall='relax' to reduce min_sep as needed")
+    sys.exit(1)
+
+
+# function returns an (n_atoms, 3) array of random positions in the periodic box [0, box),
+# with no two atoms closer than min_sep (if use_min_sep), rng is the numpy random Generator of the caller
+# min_sep = a single separation, or a matrix of separations of each pair of species (then types gives the
+# species index of each atom, 0, 1, ...)
+# on_stall = 'fail' or 'relax', what to do if the acceptance rate over stall_trials trials falls below
+#            stall_accept, or at that rate the remaining atoms need more than stall_ratio * n_atoms trials:
+#            exit with a report, or scale min_sep by relax_factor (down to min_relax) and go on
+#            (also if the packing fraction is above jamming_fraction at the start)
+# progress = csv file (name or open file) for a row of progress after each percent of the atoms are placed
+# stats = dict, if given it is updated with the final state (acceptance rate, packing fraction, min_sep scale, ...)
+def random_packing(n_atoms, box, min_sep, rng, use_min_sep=True, batch_size=10000, verbose=False, types=None,
+                   on_stall='fail', stall_trials=100000, stall_accept=1e-4, stall_ratio=100.0, relax_factor=0.95,
+                   min_relax=0.5, progress=None, stats=None):
+    box = np.asarray(box, dtype=np.float64)
+    if not use_min_sep or n_atoms == 0:
+        return rng.uniform(0.0, box, size=(n_atoms, 3))
+    min_sep = np.array(min_sep, dtype=np.float64, ndmin=2)
+    if types is None:
+        types = np.zeros(n_atoms, dtype=int)
+    types = np.asarray(types, dtype=int)
+    if np.any(box <= 0.0) or np.any(min_sep <= 0.0):
+        print(">>> ERROR  <<< The box and min_sep must be greater than zero")
+        sys.exit()
+    if len(types) != n_atoms or types.min() < 0 or types.max() >= len(min_sep) or \
+            min_sep.shape[0] != min_sep.shape[1] or np.any(min_sep != min_sep.T):
+        print(">>> ERROR  <<< min_sep must be a symmetric matrix with a row for the species of each atom")
+        sys.exit()
+
+    if on_stall not in ['fail', 'relax']:
+        print(">>> ERROR  <<< on_stall must be 'fail' or 'relax', got " + str(on_stall))
+        sys.exit()
+
+    grid = new_packing_grid(box, min_sep, n_atoms)
+    placed_atom = np.zeros(n_atoms, dtype=int)
+    pending = np.arange(n_atoms)
+    status = {'placed': 0, 'n_atoms': n_atoms, 'trials': 0, 'accept_rate': 1.0, 'window_trials': 0,
+              'window_accept': 1.0, 'packing_fraction': 0.0, 'min_sep_scale': 1.0, 'time': 0.0}
+
+    # packing fraction of spheres of diameter min_sep, the sphere of each species has the mean diameter
+    # cubed of its pairs with all of the atoms (so unlike pairs count as well as like pairs)
+    fraction = np.bincount(types, minlength=len(min_sep)) / float(n_atoms)
+    sphere_volume = np.pi / 6.0 * (min_sep ** 3).dot(fraction) / np.prod(box)
+    target_fraction = float(np.sum(sphere_volume[types]))
+
+    # above the jamming limit the atoms can never all be placed, so fail now, or reduce min_sep (by whole
+    # relax_factor steps) until the packing fraction is below the limit
+    if target_fraction > jamming_fraction:
+        steps = int(np.ceil(np.log(jamming_fraction / target_fraction) / (3.0 * np.log(relax_factor))))
+        if on_stall == 'fail' or relax_factor ** steps < min_relax:
+            print(">>> ERROR  <<< Packing fraction (spheres of diameter min_sep) of " + str(round(target_fraction, 4)) +
+                  " is above the " + str(jamming_fraction) + " at which random packing jams")
+            print("  Reduce the density or min_sep" + ("" if on_stall == 'relax' else
+                                                       ", or use on_stall='relax' to reduce min_sep as needed"))
+            sys.exit(1)
+        status['min_sep_scale'] = relax_factor ** steps
+        grid['min_sep2'] = (min_sep * status['min_sep_scale']) ** 2
+        print(">>> WARNING: packing fraction of " + str(round(target_fraction, 4)) + " is above the " +
+              str(jamming_fraction) + " at which random packing jams, min_sep scaled by " +
+              str(round(status['min_sep_scale'], 4)))
+    placed_volume = 0.0
+    window_trials = 0
+    window_accepted = 0
+    start_time = time.time()
+    if isinstance(progress, str):
+        progress = open(progress, 'w')
+        close_progress = True
+    else:
+        close_progress = False
+    if progress is not None:
+        progress.write("event," + ",".join(progress_columns) + "\n")
+
+    reported = 0
+    while len(pending) > 0:
+        # the next atoms to place, and enough trial positions (given in turn to each of the atoms) to
+        # place them at the current acceptance rate
+        atoms = pending[:batch_size]
+        repeats = int(max(min(round(1.0 / max(status['accept_rate'], 1e-3)), batch_size // len(atoms)), 1))
+        n_trial = max(len(atoms) * repeats, min(64, batch_size))
+        trial_types = np.resize(types[atoms], n_trial)
+        trial = rng.uniform(0.0, box, size=(n_trial, 3))
+        trial[trial >= box] = 0.0
+
+        # accepted trial positions go to the next atoms of the same species, in order
+        quota = np.bincount(types[atoms], minlength=len(min_sep))
+        clear = first_of_species(packing_clear(grid, trial, trial_types), trial_types, quota)
+        accept = packing_accept_batch(grid, trial, trial_types, clear)
+        accept = first_of_species(accept, trial_types, quota)
+        accepted = np.nonzero(accept)[0]
+        packing_add(grid, trial[accepted], trial_types[accepted])
+
+        placed = np.zeros(len(atoms), dtype=bool)
+        for species in np.unique(trial_types[accepted]):
+            n_species = np.count_nonzero(trial_types[accepted] == species)
+            slots = np.nonzero(types[atoms] == species)[0][:n_species]
+            placed[slots] = True
+            placed_atom[grid['n_atoms'] - len(accepted) +
+                        np.nonzero(trial_types[accepted] == species)[0]] = atoms[slots]
+        pending = np.concatenate([atoms[~placed], pending[batch_size:]])
+
+        status['placed'] = grid['n_atoms']
+        status['trials'] += n_trial
+        status['accept_rate'] = max(len(accepted), 1) / n_trial
+        placed_volume += float(np.sum(sphere_volume[trial_types[accepted]]))
+        status['packing_fraction'] = placed_volume * status['min_sep_scale'] ** 3
+        status['time'] = round(time.time() - start_time, 3)
+        window_trials += n_trial
+        window_accepted += len(accepted)
+
+        # stalled, if too few of the trial positions have been accepted over the last stall_trials trials,
+        # or at that rate the remaining atoms would need more than stall_ratio trials per atom of the packing
+        if window_trials >= stall_trials:
+            status['window_trials'] = window_trials
+            status['window_accept'] = window_accepted / window_trials
+            too_slow = status['window_accept'] * stall_ratio * n_atoms < len(pending)
+            if (status['window_accept'] < stall_accept or too_slow) and len(pending) > 0:
+                if on_stall == 'fail' or status['min_sep_scale'] * relax_factor < min_relax:
+                    packing_progress(progress, 'stalled', status)
+                    packing_stalled(status)
+                status['min_sep_scale'] *= relax_factor
+                grid['min_sep2'] = (min_sep * status['min_sep_scale']) ** 2
+                status['packing_fraction'] = placed_volume * status['min_sep_scale'] ** 3
+                status['accept_rate'] = 1.0
+                packing_progress(progress, 'relax', status)
+                if verbose:
+                    print("  packing stalled at " + str(grid['n_atoms']) + " atoms, min_sep scaled by " +
+                          str(round(status['min_sep_scale'], 4)))
+            window_trials = 0
+            window_accepted = 0
+
+        percent = 100 * grid['n_atoms'] // n_atoms
+        if percent > reported:
+            packing_progress(progress, 'progress', status)
+            if verbose and percent // 10 > reported // 10:
+                print("  placed " + str(grid['n_atoms']) + " atoms (" + str(percent - percent % 10) +
+                      " %), acceptance rate " + str(round(status['accept_rate'], 4)) +
+                      ", packing fraction " + str(round(status['packing_fraction'], 4)))
+                sys.stdout.flush()
+            reported = percent
+
+    packing_progress(progress, 'done', status)
+    if close_progress:
+        progress.close()
+    if stats is not None:
+        stats.update(status)
+
+    positions = np.empty((n_atoms, 3))
+    positions[placed_atom] = grid['positions']
+    return positions
+
+
+# function returns the positions of a maximal Poisson-disk sample of a periodic box (Bridson's algorithm),
+# no two points are closer than radius, and no more points can be added
+# candidates = number of trial points around each active point before it is retired
+def poisson_disk_sample(box, radius, rng, candidates=30, batch_size=10000):
+    box = np.asarray(box, dtype=np.float64)
+    # no more than close packed spheres of diameter radius can fit in the box
+    max_points = int(np.prod(box) / radius ** 3 * np.sqrt(2.0)) + 1
+    grid = new_packing_grid(box, np.array([[radius]]), max_points)
+
+    first = rng.uniform(0.0, box, size=(1, 3))
+    packing_add(grid, first, [0])
+    active = np.array([0])
+    while len(active) > 0:
+        # candidates in the spherical shell between radius and 2 * radius around a batch of active points
+        n_active = max(min(len(active), batch_size // candidates), 1)
+        chosen = rng.choice(len(active), size=n_active, replace=False)
+        centres = np.repeat(active[chosen], candidates)
+        direction = rng.normal(size=(len(centres), 3))
+        direction /= np.linalg.norm(direction, axis=1)[:, np.newaxis]
+        r = radius * np.cbrt(rng.uniform(1.0, 8.0, size=len(centres)))
+        trial = np.mod(grid['positions'][centres] + direction * r[:, np.newaxis], box)
+        trial[trial >= box] = 0.0
+
+        trial_types = np.zeros(len(trial), dtype=int)
+        accept = packing_accept_batch(grid, trial, trial_types, packing_clear(grid, trial, trial_types))
+        new_points = np.arange(grid['n_atoms'], grid['n_atoms'] + np.count_nonzero(accept))
+        packing_add(grid, trial[accept], trial_types[accept])
+
+        # active points with no accepted candidates are retired
+        productive = np.zeros(len(active), dtype=bool)
+        productive[chosen[np.unique(np.nonzero(accept)[0] // candidates)]] = True
+        retired = np.zeros(len(active), dtype=bool)
+        retired[chosen] = ~productive[chosen]
+        active = np.concatenate([active[~retired], new_points])
+
+    return grid['positions'][:grid['n_atoms']]
+
+
+# function returns an (n_atoms, 3) array of random positions in the periodic box [0, box), no two atoms closer
+# than min_sep, chosen at random from a Poisson-disk sample with as large a radius as the density allows
+# (so the atoms are spread more evenly than by random_packing, with fewer close pairs and no holes)
+# the radius is set from the density of a maximal sample, and reduced by relax_factor until the sample has
+# enough points, it is not reduced below min_sep unless on_stall='relax' (then down to min_relax * min_sep)
+# stats = dict, if given it is updated with the final radius, min_sep scale, ...
+def poisson_disk_packing(n_atoms, box, min_sep, rng, candidates=10, batch_size=100000, verbose=False,
+                         on_stall='fail', relax_factor=0.95, min_relax=0.5, stats=None):
+    box = np.asarray(box, dtype=np.float64)
+    if np.any(box <= 0.0) or min_sep <= 0.0:
+        print(">>> ERROR  <<< The box and min_sep must be greater than zero")
+        sys.exit()
+    if on_stall not in ['fail', 'relax']:
+        print(">>> ERROR  <<< on_stall must be 'fail' or 'relax', got " + str(on_stall))
+        sys.exit()
+    if n_atoms == 0:
+        return np.zeros((0, 3))
+
+    start_time = time.time()
+    min_sep_scale = 1.0
+    radius = max(min_sep, np.cbrt(poisson_disk_saturation * np.prod(box) / (1.05 * n_atoms)))
+    samples = 0
+    while True:
+        points = poisson_disk_sample(box, radius, rng, candidates, batch_size)
+        samples += 1
+        if verbose:
+            print("  Poisson-disk sample with radius " + str(round(radius, 4)) + ": " + str(len(points)) +
+                  " points for " + str(n_atoms) + " atoms")
+            sys.stdout.flush()
+        if len(points) >= n_atoms:
+            break
+
+        # not enough points, so reduce the radius (and min_sep if allowed)
+        if radius > min_sep * min_sep_scale:
+            radius = max(radius * relax_factor, min_sep * min_sep_scale)
+        elif on_stall == 'fail' or min_sep_scale * relax_factor < min_relax:
+            print(">>> ERROR  <<< Poisson-disk sample of radius min_sep (" + str(radius) + ") has only " +
+                  str(len(points)) + " points for " + str(n_atoms) + " atoms")
+            print("  Reduce the density or min_sep, or use on_stall='relax' to reduce min_sep as needed")
+            sys.exit(1)
+        else:
+            min_sep_scale *= relax_factor
+            radius = min_sep * min_sep_scale
+
+    if stats is not None:
+        stats.update({'placed': n_atoms, 'n_atoms': n_atoms, 'points': len(points), 'samples': samples,
+                      'radius': radius, 'min_sep_scale': min_sep_scale,
+                      'packing_fraction': n_atoms * np.pi / 6.0 * radius ** 3 / np.prod(box),
+                      'time': round(time.time() - start_time, 3)})
+    return points[rng.choice(len(points), size=n_atoms, replace=False)]
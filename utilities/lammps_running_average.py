@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+
+# This function reads the output file of a lammps 'fix ave/time' command (e.g. Running_average.txt)
+# and reports block averaged means, with standard errors, of every column in the file.
+
+# The file is read into a numpy structured array, the TimeStep column is stored as an integer and
+# all other columns as floats.  Column names are taken from the '# TimeStep ...' header line.
+# If the file was written with 'ave running', each row is the cumulative mean of all previous
+# samples. These are converted back to the individual sample means before the statistics are computed.
+
+# The standard error of each mean is estimated using the Flyvbjerg-Petersen blocking method,
+# (J. Chem. Phys. 91, 461 (1989)), which accounts for the correlation between successive samples.
+# The start of the equilibrated region is detected automatically by choosing the first sample that
+# maximises the number of uncorrelated samples in the remaining data (Chodera, JCTC 12, 1799 (2016)).
+
+# When several files or run directories are given, these are analysed in parallel and a summary csv
+# file is written, one row per file.
+
+# Keyword arguments:
+# verbose     = True   , prints some comments to the screen.
+# filename    = Running_average.txt  , the fix ave/time file(s) or run directories to read
+# running     = True   , the file was written with 'ave running'
+# equilibrate = True   , discard the samples before the detected equilibration point
+# processes   = None   , number of worker processes (default, one per cpu)
+# summary_file = running_average_summary.csv  , output csv file when more than one file is read
+
+# imported modules
+import sys
+import os
+import glob
+import multiprocessing
+import numpy as np
+
+
+# function reads a fix ave/time file into a structured numpy array
+def read_running_average(filename):
+
+    # Find the column names, these are on the last comment line before the data
+    names = []
+    skip_rows = 0
+    infile = open(filename, 'r')
+    while True:
+        fileline = infile.readline()
+        if not fileline:
+            break
+        fileline_split = fileline.split()
+
+        # title lines and comments
+        if len(fileline_split) == 0 or fileline_split[0][0] == "#":
+            if len(fileline_split) > 1 and fileline_split[0] == "#":
+                names = fileline_split[1:]
+            skip_rows += 1
+            continue
+
+        # title line written without a leading '#' (title1 keyword)
+        try:
+            float(fileline_split[0])
+        except ValueError:
+            skip_rows += 1
+            continue
+        break
+    infile.close()
+
+    if len(names) == 0:
+        print(">>> ERROR  <<< Could not find the column names in file: " + str(filename))
+        sys.exit()
+
+    # TimeStep is an integer, everything else is a float
+    dtype = [(name, np.int64) if name == "TimeStep" else (name, np.float64) for name in names]
+    data = np.loadtxt(filename, dtype=dtype, skiprows=skip_rows, comments="#", ndmin=1)
+
+    return data
+
+
+# function converts cumulative (ave running) averages back to the mean of each sample block
+def running_to_block_means(values):
+    values = np.asarray(values, dtype=np.float64)
+    k = np.arange(1, len(values) + 1, dtype=np.float64)
+    cumulative_sum = values * k
+    block_means = np.empty_like(values)
+    block_means[0] = cumulative_sum[0]
+    block_means[1:] = cumulative_sum[1:] - cumulative_sum[:-1]
+    return block_means
+
+
+# Flyvbjerg-Petersen blocking analysis
+# returns an array with one row per blocking level: samples, standard error, error on the standard error
+def blocking_levels(values):
+    x = np.asarray(values, dtype=np.float64)
+    levels = []
+    while len(x) >= 2:
+        n = len(x)
+        sem = np.sqrt(x.var() / (n - 1))
+        levels.append([n, sem, sem / np.sqrt(2.0 * (n - 1))])
+        # pairwise average of neighbouring samples, drop the last sample if n is odd
+        x = 0.5 * (x[0:n - 1:2] + x[1:n:2])
+    return np.asarray(levels).reshape(-1, 3)
+
+
+# function returns the mean and blocked standard error of the data
+# The standard error is taken at the first blocking level where the estimate has reached a plateau,
+# ie the next level agrees within the error bar.  If no plateau is found, the largest estimate is used.
+def block_average(values):
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < 2:
+        return float(np.mean(x)), float("nan"), False
+
+    levels = blocking_levels(x)
+    for i in range(len(levels) - 1):
+        if abs(levels[i + 1, 1] - levels[i, 1]) < levels[i, 2]:
+            return float(x.mean()), float(levels[i, 1]), True
+    return float(x.mean()), float(levels[:, 1].max()), False
+
+
+# function returns the statistical inefficiency g of the data (g = 1 for uncorrelated samples)
+def statistical_inefficiency(values):
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    dx = x - x.mean()
+    var = np.dot(dx, dx) / n
+    if n < 3 or var == 0.0:
+        return 1.0
+
+    # autocorrelation function via fft, zero padded to avoid wrap around
+    f = np.fft.rfft(dx, 2 * n)
+    acf = np.fft.irfft(f * np.conjugate(f))[:n] / (var * np.arange(n, 0, -1))
+
+    # integrate the acf until it first becomes negative
+    t = np.arange(1, n)
+    negative = np.nonzero(acf[1:] <= 0.0)[0]
+    stop = negative[0] if len(negative) > 0 else n - 1
+    g = 1.0 + 2.0 * np.sum(acf[1:stop + 1] * (1.0 - t[:stop] / n))
+    return max(1.0, g)
+
+
+# function returns the index of the first equilibrated sample, and the statistical inefficiency after it
+# candidate start points are tested on a grid of at most 'max_candidates' points
+def detect_equilibration(values, max_candidates=100):
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n < 4:
+        return 0, 1.0
+
+    candidates = np.unique(np.linspace(0, n - 4, min(max_candidates, n - 3)).astype(int))
+    best_t0 = 0
+    best_g = 1.0
+    best_neff = 0.0
+    for t0 in candidates:
+        g = statistical_inefficiency(x[t0:])
+        neff = (n - t0) / g
+        if neff > best_neff:
+            best_t0, best_g, best_neff = int(t0), float(g), neff
+    return best_t0, best_g
+
+
+# function analyses every column of a fix ave/time file
+# returns a dict keyed by column name, each holding a dict of the statistics
+def analyse_running_average(filename, running=True, equilibrate=True):
+    data = read_running_average(filename)
+    results = {}
+    for name in data.dtype.names:
+        if name == "TimeStep":
+            continue
+        values = data[name]
+        if running:
+            values = running_to_block_means(values)
+
+        t0 = 0
+        g = 1.0
+        if equilibrate:
+            t0, g = detect_equilibration(values)
+        mean, sem, converged = block_average(values[t0:])
+
+        results[name] = {"mean": mean,
+                         "sem": sem,
+                         "converged": converged,
+                         "samples": len(values) - t0,
+                         "equil_step": int(data["TimeStep"][t0]) if "TimeStep" in data.dtype.names else t0,
+                         "g": g}
+    return results
+
+
+# worker for the process pool (must be defined at module level so it can be pickled)
+def _analyse_file(args):
+    filename, running, equilibrate = args
+    return filename, analyse_running_average(filename, running=running, equilibrate=equilibrate)
+
+
+# function analyses many fix ave/time files (e.g. one per run directory) in parallel
+def analyse_running_averages(filenames, running=True, equilibrate=True, processes=None):
+    jobs = [(f, running, equilibrate) for f in filenames]
+    if len(jobs) == 1 or processes == 1:
+        return [_analyse_file(job) for job in jobs]
+    pool = multiprocessing.Pool(processes=processes)
+    try:
+        results = pool.map(_analyse_file, jobs)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+# function reads fix ave/time file(s), prints the statistics and writes a summary csv for several files
+def lammps_running_average(**kwargs):
+
+    # Default keyword args
+    verbose = kwargs.get('verbose', False)
+    filename = kwargs.get('filename', 'Running_average.txt')
+    running = kwargs.get('running', True)
+    equilibrate = kwargs.get('equilibrate', True)
+    processes = kwargs.get('processes', None)
+    summary_file = kwargs.get('summary_file', 'running_average_summary.csv')
+
+    # Welcome
+    if verbose:
+        print("  +------------------------------------------+")
+        print("  |   Reads lammps fix ave/time output and   |")
+        print("  |  computes block averaged means & errors  |")
+        print("  +------------------------------------------+")
+        print("   ")
+
+    # Build the list of files, directories are searched for Running_average.txt
+    if isinstance(filename, str):
+        filename = [filename]
+    filenames = []
+    for name in filename:
+        for match in sorted(glob.glob(name)):
+            if os.path.isdir(match):
+                match = os.path.join(match, 'Running_average.txt')
+            if os.path.isfile(match) and match not in filenames:
+                filenames.append(match)
+
+    if len(filenames) == 0:
+        print(">>> ERROR  <<< No fix ave/time files found: " + str(filename))
+        sys.exit()
+
+    if verbose:
+        print(">  Reading " + str(len(filenames)) + " file(s)")
+        print(">  Running averages: " + str(running))
+        print(">  Detect equilibration: " + str(equilibrate))
+
+    results = analyse_running_averages(filenames, running=running, equilibrate=equilibrate,
+                                       processes=processes)
+
+    # Print the results for each file
+    if verbose:
+        for name, stats in results:
+            print("\n" + str(name))
+            print("  {:<20s} {:>22s} {:>14s} {:>8s} {:>12s}".format("column", "mean", "std err",
+                                                                    "samples", "equil step"))
+            for col, s in stats.items():
+                print("  {:<20s} {:>22.12g} {:>14.6g} {:>8d} {:>12d}{}".format(
+                    col, s["mean"], s["sem"], s["samples"], s["equil_step"],
+                    "" if s["converged"] else "  (blocking not converged)"))
+
+    # Write a summary csv file if we have more than one file
+    if len(results) > 1:
+        columns = []
+        for name, stats in results:
+            for col in stats:
+                if col not in columns:
+                    columns.append(col)
+
+        file = open(summary_file, 'w')
+        line = "file"
+        for col in columns:
+            line = line + "," + col + "," + col + "_err"
+        file.write(line + "\n")
+        for name, stats in results:
+            line = str(name)
+            for col in columns:
+                if col in stats:
+                    line = line + "," + repr(stats[col]["mean"]) + "," + repr(stats[col]["sem"])
+                else:
+                    line = line + ",,"
+            file.write(line + "\n")
+        file.close()
+        if verbose:
+            print("\n>  Summary written to: " + str(summary_file))
+
+    return results
+
+
+# If we are running this script interactively, call the function safely
+if __name__ == '__main__':
+
+    # Get the filename(s) or directories from commandline, if present
+    if len(sys.argv) > 1:
+        lammps_running_average(verbose=True, filename=sys.argv[1:])
+    else:
+        # call the function safely (use default filename)
+        lammps_running_average(verbose=True)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+# Functions for choosing random sites (atom ids) for defects, without choosing sites close to
+# defects that have already been placed.
+
+# A pool holds the ids of the sites that can still be chosen, in a dict:
+#   pool['sites']  array of site ids, the first pool['size'] entries are still available
+#   pool['index']  position of each site id in pool['sites'], or -1 if it is not available
+#   pool['size']   number of available sites
+# Sites are removed by swapping them with the last available site (swap-remove), so picking a
+# random site is O(1) and excluding the k sites around a defect is O(k), rather than rebuilding a
+# list of all of the remaining sites for every defect.
+
+# imported modules
+import sys
+import numpy as np
+
+
+# function returns a new pool of the given site ids, n_sites is the total number of sites (atoms)
+def new_site_pool(ids, n_sites):
+    sites = np.array(ids, dtype=int).ravel()
+    index = np.full(n_sites, -1, dtype=int)
+    index[sites] = np.arange(len(sites))
+    return {'sites': sites, 'index': index, 'size': len(sites)}
+
+
+# function removes site ids from the pool, ids that are not in the pool are ignored
+def site_pool_remove(pool, ids):
+    sites = pool['sites']
+    index = pool['index']
+    for site in np.asarray(ids, dtype=int).ravel().tolist():
+        i = index[site]
+        if i < 0:
+            continue
+        # swap with the last available site
+        last = pool['size'] - 1
+        last_site = sites[last]
+        sites[i] = last_site
+        index[last_site] = i
+        sites[last] = site
+        index[site] = -1
+        pool['size'] = last
+
+
+# function returns a random site from the pool (the site is not removed)
+# rng is the numpy random Generator of the caller
+def site_pool_random(pool, rng):
+    if pool['size'] == 0:
+        print(">>> ERROR  <<< No valid sites left to place the defect, reduce the number of defects")
+        sys.exit()
+    return int(pool['sites'][rng.integers(pool['size'])])